@@ -30,7 +30,7 @@ from threading import Thread
 from hifiberrydsp.hardware.adau145x import Adau145x
 from hifiberrydsp.filtering.volume import percent2amplification, amplification2percent
 from hifiberrydsp import datatools
-from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.hardware.spi import PRIORITY_POLL
 
 DIRECTION_TO_DSP = 1
 DIRECTION_TO_ALSA = 2
@@ -73,7 +73,6 @@ class AlsaSync(Thread):
         self.volume_register_length = self.dsp.WORD_LENGTH
         self.finished = False
         self.pollinterval = 1000  # milliseconds
-        self.spi = SpiHandler
         self.dspdata = None
         self.dspvol = None
         self.alsavol = None
@@ -145,7 +144,7 @@ class AlsaSync(Thread):
         # write multiplier to DSP
         dspdata = datatools.int_data(self.dsp.decimal_repr(volume),
                                      self.volume_register_length)
-        self.spi.write(self.volume_register, dspdata)
+        self.dsp.write_memory(self.volume_register, dspdata)
 
         self.dspdata = dspdata
         self.dspvol = value
@@ -177,8 +176,10 @@ class AlsaSync(Thread):
             self.dspvol = None
             return False
 
-        dspdata = self.spi.read(
-            self.volume_register, self.volume_register_length)
+        # Served from the shadow copy of the data memory if enabled
+        dspdata = self.dsp.read_memory(
+            self.volume_register, self.volume_register_length,
+            priority=PRIORITY_POLL)
 
         if dspdata != self.dspdata:
 
@@ -1,9 +1,30 @@
 import json
 import math
 import cmath
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from hifiberrydsp.filtering.biquad import Biquad
 
+# Magnitude in dB used for a filter with zero response
+MIN_DB = -120
+# Magnitude in dB used for a filter with a pole on the unit circle
+MAX_DB = 120
+
+NEUTRAL_COEFFICIENTS = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Frequency responses of the last filter chains, keyed by the filter
+# definitions, sample rate and frequencies. The lists are stored as tuples,
+# every caller gets its own copy.
+RESPONSE_CACHE_SIZE = 32
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
 class Filter:
     def __init__(self, **kwargs):
         self.params = kwargs
@@ -47,6 +68,32 @@ class Filter:
             return coeffs
         raise NotImplementedError("Subclasses must implement this method")
 
+    def normalizedCoefficients(self, fs):
+        """
+        Normalized biquad coefficients of the filter
+        
+        Args:
+            fs: Sample rate in Hz
+            
+        Returns:
+            Tuple (b0, b1, b2, 1.0, a1, a2), neutral coefficients if the 
+            filter doesn't implement biquadCoefficients
+        """
+        try:
+            coeffs = self.biquadCoefficients(fs)
+        except NotImplementedError:
+            return NEUTRAL_COEFFICIENTS
+        if not coeffs:
+            return NEUTRAL_COEFFICIENTS
+        return tuple(float(c) for c in Filter.normalize_biquad(*coeffs))
+
+    def cacheKey(self):
+        """
+        Returns:
+            String that identifies the filter definition
+        """
+        return json.dumps(self.params, sort_keys=True, default=str)
+
     def frequencyResponse(self, f, fs):
         """
         Calculate the complex frequency response of the filter at a specific frequency
@@ -118,23 +165,150 @@ class Filter:
                         If not provided, uses logarithmic scale from 20Hz to 20kHz
                         
         Returns:
-            Dictionary with 'frequencies' and 'response' keys
+            Dictionary with 'frequencies', 'response' (magnitude in dB), 
+            'phase' (unwrapped, in degrees) and 'groupDelay' (in ms) keys
         """
         # Generate default frequencies if not provided
         if frequencies is None:
             frequencies = Filter.logspace_frequencies(20, 20000, 8)
         
-        # Initialize the response array with zeros (0 dB is neutral)
-        response = [0] * len(frequencies)
+        key = (tuple(filter_obj.cacheKey() for filter_obj in filters), fs,
+               tuple(frequencies))
+        with _response_cache_lock:
+            result = _response_cache.get(key)
+            if result is not None:
+                _response_cache.move_to_end(key)
+                return {name: list(values) for name, values in result.items()}
+        
+        # Coefficients are calculated only once for all frequencies
+        coefficients = [filter_obj.normalizedCoefficients(fs) for filter_obj in filters]
+        response = Filter.cascadeResponse(coefficients, frequencies, fs)
+        
+        # NaN and Infinity can't be serialized to JSON, they are returned
+        # for poles on the unit circle
+        result = {
+            'frequencies': tuple(frequencies),
+            'response': tuple(Filter.finite(v, MIN_DB, MAX_DB)
+                              for v in response['response']),
+            'phase': tuple(Filter.finite(v, 0.0) for v in response['phase']),
+            'groupDelay': tuple(Filter.finite(v, 0.0)
+                                for v in response['groupDelay'])
+        }
+        
+        with _response_cache_lock:
+            _response_cache[key] = result
+            while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                _response_cache.popitem(last=False)
+        
+        return {name: list(values) for name, values in result.items()}
+    
+    @staticmethod
+    def finite(value, default, limit=None):
+        """
+        Replace a non-finite value
+        
+        Args:
+            value: Float value
+            default: Value used for NaN, and for infinite values if no 
+                     limit is given
+            limit: Infinite values are replaced by +/- limit
+            
+        Returns:
+            Finite float value
+        """
+        if math.isfinite(value):
+            return value
+        if limit is None or math.isnan(value):
+            return default
+        return math.copysign(limit, value)
+    
+    @staticmethod
+    def cascadeResponse(coefficients, frequencies, fs):
+        """
+        Calculate the response of a cascade of biquads. Uses numpy if 
+        available.
+        
+        Args:
+            coefficients: List of normalized (b0, b1, b2, 1.0, a1, a2) tuples
+            frequencies: List of frequencies in Hz
+            fs: Sample rate in Hz
+            
+        Returns:
+            Dictionary with 'response', 'phase' and 'groupDelay' lists
+        """
+        if numpy is not None:
+            return Filter._cascadeResponseNumpy(coefficients, frequencies, fs)
+        
+        response = []
+        phase = []
+        group_delay = []
+        for f in frequencies:
+            # z = e^(-j*omega), the response is evaluated for z^-1
+            z = cmath.rect(1, -2 * math.pi * f / fs)
+            z2 = z * z
+            db = 0
+            h_total = complex(1, 0)
+            delay = 0
+            for (b0, b1, b2, a0, a1, a2) in coefficients:
+                numerator = b0 + b1 * z + b2 * z2
+                denominator = a0 + a1 * z + a2 * z2
+                if denominator == 0:
+                    # pole on the unit circle
+                    db += math.inf
+                    delay = math.nan
+                    # undefined phase, treated as 0 like in the numpy version
+                    h_total = complex(0, 0)
+                    continue
+                h = numerator / denominator
+                magnitude = abs(h)
+                db += 20 * math.log10(magnitude) if magnitude > 0 else MIN_DB
+                h_total *= h
+                # group delay of B/A in samples: Re(z B'/B) - Re(z A'/A)
+                if numerator != 0:
+                    delay += ((b1 * z + 2 * b2 * z2) / numerator).real
+                delay -= ((a1 * z + 2 * a2 * z2) / denominator).real
+            response.append(db)
+            phase.append(cmath.phase(h_total))
+            group_delay.append(delay * 1000 / fs)
+        
+        # unwrap the phase
+        for i in range(1, len(phase)):
+            step = phase[i] - phase[i - 1]
+            if abs(step) > math.pi:
+                phase[i] -= 2 * math.pi * round(step / (2 * math.pi))
+        
+        return {
+            'response': response,
+            'phase': [math.degrees(p) for p in phase],
+            'groupDelay': group_delay
+        }
+    
+    @staticmethod
+    def _cascadeResponseNumpy(coefficients, frequencies, fs):
+        c = numpy.asarray(coefficients, dtype=numpy.float64).reshape(-1, 6)
+        z = numpy.exp(-2j * numpy.pi * numpy.asarray(frequencies, dtype=numpy.float64) / fs)
+        powers = numpy.vstack([numpy.ones_like(z), z, z * z])
+        # derivatives multiplied by z
+        dpowers = numpy.vstack([z, 2 * z * z])
         
-        # Calculate the combined response at each frequency
-        for filter_obj in filters:
-            for i, freq in enumerate(frequencies):
-                response[i] += filter_obj.frequencyResponseDb(freq, fs)
+        # one row per filter, one column per frequency
+        numerator = c[:, 0:3] @ powers
+        denominator = c[:, 3:6] @ powers
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            h = numerator / denominator
+            magnitude = numpy.abs(h)
+            db = numpy.where(magnitude > 0, 20 * numpy.log10(magnitude), MIN_DB)
+            delay_numerator = numpy.where(numerator != 0,
+                                          (c[:, 1:3] @ dpowers) / numerator, 0)
+            delay = delay_numerator.real - ((c[:, 4:6] @ dpowers) / denominator).real
+            h_total = numpy.prod(h, axis=0)
         
+        # an undefined phase would propagate through the unwrapping
+        phase = numpy.unwrap(numpy.nan_to_num(numpy.angle(h_total)))
         return {
-            'frequencies': frequencies,
-            'response': response
+            'response': db.sum(axis=0).tolist(),
+            'phase': numpy.degrees(phase).tolist(),
+            'groupDelay': (delay.sum(axis=0) * 1000 / fs).tolist()
         }
     
     @staticmethod
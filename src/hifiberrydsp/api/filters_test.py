@@ -0,0 +1,153 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import copy
+import json
+import math
+import unittest
+
+from hifiberrydsp.api import filters
+from hifiberrydsp.api.filters import Filter
+
+FS = 48000
+
+FILTERS = [
+    {"type": "PeakingEq", "f": 100, "db": -6.0, "q": 2.0},
+    {"type": "HighPass", "f": 30, "db": 0, "q": 0.707},
+    {"type": "HighShelf", "f": 8000, "slope": 1.0, "gain": 3.0, "db": 3.0},
+    {"type": "Volume", "db": -3.0},
+    {"type": "Bypass"},
+]
+
+
+def create_filters():
+    return [Filter.fromJSON(json.dumps(f)) for f in FILTERS]
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        filters._response_cache.clear()
+
+    def assertListAlmostEqual(self, first, second, places=6):
+        self.assertEqual(len(first), len(second))
+        for a, b in zip(first, second):
+            self.assertAlmostEqual(a, b, places=places)
+
+    def testMagnitude(self):
+        frequencies = Filter.logspace_frequencies(20, 20000, 12)
+        chain = create_filters()
+        result = Filter.getFrequencyResponse(FS, chain, frequencies)
+        expected = [sum(f.frequencyResponseDb(freq, FS) for f in chain)
+                    for freq in frequencies]
+        self.assertEqual(result["frequencies"], frequencies)
+        self.assertListAlmostEqual(result["response"], expected)
+
+    def testPurePython(self):
+        if filters.numpy is None:
+            self.skipTest("numpy not installed")
+        frequencies = Filter.logspace_frequencies(20, 20000, 24)
+        coefficients = [f.normalizedCoefficients(FS)
+                        for f in create_filters()]
+        vectorized = Filter.cascadeResponse(coefficients, frequencies, FS)
+        saved = filters.numpy
+        try:
+            filters.numpy = None
+            python = Filter.cascadeResponse(coefficients, frequencies, FS)
+        finally:
+            filters.numpy = saved
+        for key in ["response", "phase", "groupDelay"]:
+            self.assertListAlmostEqual(vectorized[key], python[key])
+
+    def testGroupDelay(self):
+        # group delay is the negative derivative of the phase
+        chain = create_filters()
+        delta = 0.01
+        for f in [25, 100, 1000, 8000]:
+            result = Filter.getFrequencyResponse(FS, chain,
+                                                 [f - delta, f, f + delta])
+            phase = [math.radians(p) for p in result["phase"]]
+            derivative = (phase[2] - phase[0]) / (2 * delta * 2 * math.pi)
+            self.assertAlmostEqual(result["groupDelay"][1],
+                                   -derivative * 1000, places=4)
+
+    def testCache(self):
+        calls = []
+        saved = Filter.cascadeResponse
+
+        def count_calls(coefficients, frequencies, fs):
+            calls.append(fs)
+            return saved(coefficients, frequencies, fs)
+
+        try:
+            Filter.cascadeResponse = staticmethod(count_calls)
+            first = Filter.getFrequencyResponse(FS, create_filters())
+            second = Filter.getFrequencyResponse(FS, create_filters())
+            self.assertEqual(first, second)
+            self.assertEqual(calls, [FS])
+
+            Filter.getFrequencyResponse(96000, create_filters())
+            Filter.getFrequencyResponse(FS, create_filters()[1:])
+            self.assertEqual(calls, [FS, 96000, FS])
+        finally:
+            Filter.cascadeResponse = saved
+
+    def testCachedCopies(self):
+        first = Filter.getFrequencyResponse(FS, create_filters(), [100, 1000])
+        expected = copy.deepcopy(first)
+        first["response"][0] = 99
+        first["phase"].append(1)
+        first["frequencies"].clear()
+        self.assertEqual(
+            Filter.getFrequencyResponse(FS, create_filters(), [100, 1000]),
+            expected)
+
+    def testPoleOnUnitCircle(self):
+        # pole at z = 1, the response at 0 Hz is infinite
+        chain = [Filter.fromJSON(json.dumps(
+            {"type": "GenericBiquad", "a0": 1.0, "a1": -2.0, "a2": 1.0,
+             "b0": 1.0, "b1": 0.0, "b2": 0.0}))]
+        implementations = [None]
+        if filters.numpy is not None:
+            implementations.append(filters.numpy)
+        saved = filters.numpy
+        try:
+            for implementation in implementations:
+                filters._response_cache.clear()
+                filters.numpy = implementation
+                result = Filter.getFrequencyResponse(FS, chain, [0, 100, 1000])
+                self.assertEqual(result["response"][0], filters.MAX_DB)
+                self.assertEqual(result["groupDelay"][0], 0)
+                for key in ["response", "phase", "groupDelay"]:
+                    self.assertTrue(all(math.isfinite(v) for v in result[key]))
+                json.dumps(result, allow_nan=False)
+        finally:
+            filters.numpy = saved
+
+    def testEmptyChain(self):
+        result = Filter.getFrequencyResponse(FS, [], [100, 1000])
+        self.assertEqual(result["response"], [0, 0])
+        self.assertEqual(result["groupDelay"], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import gzip
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+
+from flask import Response
+
+# Bodies smaller than this are never compressed
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Added to the entity tag of the gzip compressed representation, it needs
+# its own strong validator
+GZIP_SUFFIX = "-gzip"
+
+MAX_ENTRIES = 32
+
+
+def make_etag(*parts):
+    """
+    Create a strong entity tag from the values that identify a response
+
+    Returns:
+        str: unquoted entity tag
+    """
+    hasher = hashlib.sha1()
+    for part in parts:
+        hasher.update(repr(part).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def file_state(path):
+    """
+    Returns:
+        tuple: (path, modification time in ns, size) or None if the file 
+        doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+class CachedBody:
+    """
+    Serialized body of a response together with its entity tag. The gzip
+    compressed version is created on the first request that accepts it.
+    """
+
+    def __init__(self, etag, body, content_type):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.etag = etag
+        self.body = body
+        self.content_type = content_type
+        self.gzipped = None
+
+    def compressed(self):
+        if self.gzipped is None:
+            self.gzipped = gzip.compress(self.body, GZIP_LEVEL)
+        return self.gzipped
+
+
+class ResponseCache:
+    """
+    Pre-serialized bodies of GET responses that only change with the DSP 
+    program or the profile files. 
+
+    Every entry is stored under a key (endpoint and query parameters) 
+    together with the entity tag of the state it was created from. 
+    Requests with a matching If-None-Match header are answered with 
+    304 Not Modified, other requests get the cached body as long as the 
+    entity tag hasn't changed. The gzip compressed body is sent with the
+    entity tag followed by GZIP_SUFFIX, both forms are accepted in 
+    If-None-Match.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(self, request, key, etag, build, content_type):
+        """
+        Create the response for a GET request
+
+        Args:
+            request: the Flask request
+            key: cache key of the response
+            etag: entity tag of the current state
+            build: function that returns the body (str or bytes) if it 
+                isn't cached
+            content_type: content type of the body
+
+        Returns:
+            flask.Response
+        """
+        for matching in [etag, etag + GZIP_SUFFIX]:
+            if request.if_none_match.contains(matching):
+                with self.lock:
+                    self.not_modified += 1
+                response = Response(status=304)
+                response.set_etag(matching)
+                response.headers["Vary"] = "Accept-Encoding"
+                return response
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.etag == etag:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                entry = None
+
+        if entry is None:
+            entry = CachedBody(etag, build(), content_type)
+            with self.lock:
+                self.misses += 1
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            logging.debug("response cache miss for %s", key)
+
+        body = entry.body
+        response = Response(content_type=entry.content_type)
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in request.accept_encodings:
+            body = entry.compressed()
+            etag = etag + GZIP_SUFFIX
+            response.headers["Content-Encoding"] = "gzip"
+        response.set_data(body)
+        response.set_etag(etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        # clients have to revalidate, but can use their copy after a 304
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "notModified": self.not_modified
+            }
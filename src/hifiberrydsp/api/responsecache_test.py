@@ -0,0 +1,113 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import gzip
+import unittest
+
+from flask import Flask, request
+
+from hifiberrydsp.api.responsecache import ResponseCache, make_etag
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=2)
+        self.state = "a"
+        self.builds = 0
+        app = Flask(__name__)
+
+        @app.route('/data/<name>')
+        def data(name):
+            def build():
+                self.builds += 1
+                return name * 2000
+
+            return self.cache.respond(request, name,
+                                      make_etag(self.state), build,
+                                      "text/plain")
+
+        self.client = app.test_client()
+
+    def testEtag(self):
+        self.assertEqual(make_etag("a", 1), make_etag("a", 1))
+        self.assertNotEqual(make_etag("a", 1), make_etag("a", "1"))
+        self.assertNotEqual(make_etag("a", 1), make_etag(("a", 1)))
+
+    def testConditionalGet(self):
+        response = self.client.get('/data/x')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b"x" * 2000)
+        etag = response.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        response = self.client.get('/data/x',
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        response = self.client.get('/data/x')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.builds, 1)
+
+        # a new state creates a new body and entity tag
+        self.state = "b"
+        response = self.client.get('/data/x',
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(self.builds, 2)
+        self.assertEqual(self.cache.stats(), {"entries": 1, "hits": 1,
+                                              "misses": 2,
+                                              "notModified": 1})
+
+    def testGzip(self):
+        response = self.client.get('/data/x',
+                                   headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data), b"x" * 2000)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        gzip_etag = response.headers["ETag"]
+
+        response = self.client.get('/data/x',
+                                   headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        etag = response.headers["ETag"]
+
+        # each representation has its own strong validator
+        self.assertEqual(gzip_etag, etag[:-1] + '-gzip"')
+        for tag in [etag, gzip_etag]:
+            response = self.client.get('/data/x',
+                                       headers={"If-None-Match": tag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers["ETag"], tag)
+
+    def testEviction(self):
+        for name in ["x", "y", "x", "z", "x", "y"]:
+            self.client.get('/data/' + name)
+        # x stays cached because it has been used recently
+        self.assertEqual(self.builds, 4)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
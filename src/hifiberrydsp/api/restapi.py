@@ -28,8 +28,10 @@ import time
 import requests
 from flask import Flask, jsonify, request
 from hifiberrydsp.parser.xmlprofile import XmlProfile, get_default_dspprofile_path
+from hifiberrydsp.parser.profilecatalog import get_profile_catalog
 from hifiberrydsp.api.filters import Filter
 from hifiberrydsp.api.settings_store import SettingsStore
+from hifiberrydsp.api.responsecache import ResponseCache, make_etag, file_state
 from hifiberrydsp import __version__
 from waitress import serve
 from hifiberrydsp.hardware.adau145x import Adau145x
@@ -46,20 +48,19 @@ settings_store = SettingsStore(PROFILES_DIR)
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
 
-# Cache for XML profile
+# Cache for XML profile, only valid for the program generation it was
+# read for. Program checksums are cached by Adau145x.program_identity()
 _xml_profile_cache = {
     "profile": None,
     "path": None,
     "metadata": None,
-    "valid": None
+    "valid": None,
+    "generation": None
 }
 
-# Cache for current DSP program checksum
-_checksum_cache = {
-    "md5": None,       # MD5 checksum (signature-based)
-    "sha1": None,      # SHA-1 checksum (length-based)
-    "program_length": None,  # Program length for cache validation
-}
+# Serialized bodies of GET responses that only change with the program or
+# the profile files, revalidated with entity tags
+_response_cache = ResponseCache()
 
 
 def isBiquad(value):
@@ -110,7 +111,8 @@ def get_xml_profile():
     # Check if we need to refresh the cache
     cache_valid = (
         _xml_profile_cache["profile"] is not None and
-        _xml_profile_cache["path"] == profile_path
+        _xml_profile_cache["path"] == profile_path and
+        _xml_profile_cache["generation"] == Adau145x.program_generation()
     )
     
     # If we have a cached profile, check if it's valid or invalid
@@ -123,6 +125,7 @@ def get_xml_profile():
     
     # Cache miss - read from disk
     logging.debug("XML profile cache miss - reading from disk")
+    generation = Adau145x.program_generation()
     try:
         xml_profile = XmlProfile(profile_path)
         
@@ -186,6 +189,7 @@ def get_xml_profile():
         _xml_profile_cache["path"] = profile_path
         _xml_profile_cache["metadata"] = None  # Reset metadata cache
         _xml_profile_cache["valid"] = profile_valid
+        _xml_profile_cache["generation"] = generation
         
         # Return profile if valid, None if invalid
         if profile_valid:
@@ -209,7 +213,8 @@ def get_profile_metadata():
     
     try:
         # Check if we have cached metadata
-        if _xml_profile_cache["metadata"] is not None:
+        if _xml_profile_cache["metadata"] is not None and \
+                _xml_profile_cache["generation"] == Adau145x.program_generation():
             logging.debug("Using cached metadata")
             return _xml_profile_cache["metadata"]
         
@@ -251,14 +256,39 @@ def get_profile_metadata():
         return {"error": str(e)}
 
 
+def get_profile_etag(*parts):
+    """
+    Entity tag of responses that are created from the active DSP profile.
+    It is derived from the checksum of the running program and the 
+    modification time and size of the profile file.
+
+    Args:
+        parts: additional values that identify the response, e.g. query 
+            parameters
+
+    Returns:
+        str: unquoted entity tag
+    """
+    snapshot = Adau145x.get_program_snapshot()
+    if snapshot is not None:
+        program = snapshot.checksum("signature", "md5")
+    else:
+        # program memory can't be read, the generation changes at least
+        # when a program is installed by this process
+        program = Adau145x.program_generation()
+    return make_etag(program, file_state(get_default_dspprofile_path()),
+                     *parts)
+
+
 def invalidate_cache():
     """
     Invalidate the XML profile cache and checksum cache
     """
-    global _xml_profile_cache, _checksum_cache
+    global _xml_profile_cache
     _xml_profile_cache["profile"] = None
     _xml_profile_cache["metadata"] = None
     _xml_profile_cache["valid"] = None
+    _response_cache.clear()
     
     # Also clear the checksum cache when invalidating
     clear_checksum_cache()
@@ -314,42 +344,21 @@ def get_current_profile_name():
 
 def clear_checksum_cache():
     """
-    Clear the cached checksums and program length. This should be called when a new DSP program is installed.
+    Clear the cached checksums and program memory. This should be called when a new DSP program is installed.
     """
-    global _checksum_cache
-    _checksum_cache["md5"] = None
-    _checksum_cache["sha1"] = None
-    _checksum_cache["program_length"] = None
+    Adau145x.clear_checksum_cache()
     logging.debug("Checksum cache cleared")
 
 
 def is_checksum_cache_valid():
     """
-    Check if the checksum cache is still valid by comparing current program length
-    with the cached program length.
+    Check if the cached checksums are still valid by comparing the current program length
+    with the program length of the cached program snapshot.
     
     Returns:
-        bool: True if cache is valid, False if it should be invalidated
+        bool: True if checksums are cached and valid
     """
-    global _checksum_cache
-    
-    # If no cached program length, consider invalid
-    if _checksum_cache["program_length"] is None:
-        return False
-    
-    try:
-        # Get current program length
-        current_length = Adau145x.get_program_len()
-        
-        # Compare with cached length
-        if current_length != _checksum_cache["program_length"]:
-            logging.debug(f"Program length changed: cached={_checksum_cache['program_length']}, current={current_length}")
-            return False
-        
-        return True
-    except Exception as e:
-        logging.error(f"Error checking program length for cache validation: {str(e)}")
-        return False
+    return Adau145x.program_identity().probe()
 
 
 def get_current_program_checksum():
@@ -359,75 +368,27 @@ def get_current_program_checksum():
     Returns:
         str: Profile MD5 checksum or None if not found
     """
-    global _checksum_cache
-    
-    # Check if cache is valid and we have cached MD5 checksum
-    if _checksum_cache["md5"] is not None and is_checksum_cache_valid():
-        logging.debug("Using cached MD5 checksum")
-        return _checksum_cache["md5"]
-    
-    # Clear invalid cache
-    if not is_checksum_cache_valid():
-        logging.debug("Cache invalidated due to program length change")
-        clear_checksum_cache()
-    
-    try:
-        # Get current program length for cache validation
-        program_length = Adau145x.get_program_len()
-        
-        # Calculate MD5 checksum (signature-based)
-        checksum_bytes = Adau145x.calculate_program_checksum(cached=True)
-        if checksum_bytes:
-            checksum_hex = binascii.hexlify(checksum_bytes).decode('utf-8').upper()
-            _checksum_cache["md5"] = checksum_hex
-            _checksum_cache["program_length"] = program_length
-            logging.debug(f"Calculated and cached MD5 checksum: {checksum_hex} (program length: {program_length})")
-            return checksum_hex
-        else:
-            logging.warning("Could not calculate MD5 checksum")
-            return None
-    except Exception as e:
-        logging.error(f"Error calculating MD5 checksum: {str(e)}")
+    snapshot = Adau145x.get_program_snapshot()
+    if snapshot is None:
+        logging.warning("Could not calculate MD5 checksum")
         return None
+    return snapshot.checksum("signature", "md5")
 
 
 def get_current_program_checksum_sha1():
     """
-    Get the SHA-1 checksum of the currently active DSP profile (length-based, for internal use)
+    Get the SHA-1 checksum of the currently active DSP profile, used as the key of the 
+    settings store
     
     Returns:
         str: Profile SHA-1 checksum or None if not found
     """
-    global _checksum_cache
-    
-    # Check if cache is valid and we have cached SHA-1 checksum
-    if _checksum_cache["sha1"] is not None and is_checksum_cache_valid():
-        logging.debug("Using cached SHA-1 checksum")
-        return _checksum_cache["sha1"]
-    
-    # Clear invalid cache
-    if not is_checksum_cache_valid():
-        logging.debug("Cache invalidated due to program length change")
-        clear_checksum_cache()
-    
-    try:
-        # Get current program length for cache validation
-        program_length = Adau145x.get_program_len()
-        
-        # Calculate SHA-1 checksum (length-based)
-        checksums = Adau145x.calculate_program_checksums(cached=True)
-        if checksums and "sha1" in checksums:
-            checksum_hex = checksums["sha1"]
-            _checksum_cache["sha1"] = checksum_hex
-            _checksum_cache["program_length"] = program_length
-            logging.debug(f"Calculated and cached SHA-1 checksum: {checksum_hex} (program length: {program_length})")
-            return checksum_hex
-        else:
-            logging.warning("Could not calculate SHA-1 checksum")
-            return None
-    except Exception as e:
-        logging.error(f"Error calculating SHA-1 checksum: {str(e)}")
+    snapshot = Adau145x.get_program_snapshot()
+    if snapshot is None:
+        logging.warning("Could not calculate SHA-1 checksum")
         return None
+    # signature mode, like the checksums of existing settings store entries
+    return snapshot.checksum("signature", "sha1")
 
 
 @app.route('/version', methods=['GET'])
@@ -497,15 +458,22 @@ def list_dsp_profiles():
         
         # Get all XML files in the directory
         try:
-            files = os.listdir(PROFILES_DIR)
-            xml_files = [f for f in files if f.lower().endswith('.xml')]
-            xml_files.sort()  # Sort alphabetically
-            
-            return jsonify({
-                "profiles": xml_files,
-                "count": len(xml_files),
-                "directory": PROFILES_DIR
-            })
+            # Adding or removing a file changes the directory mtime
+            etag = make_etag(file_state(PROFILES_DIR))
+
+            def build():
+                files = os.listdir(PROFILES_DIR)
+                xml_files = [f for f in files if f.lower().endswith('.xml')]
+                xml_files.sort()  # Sort alphabetically
+
+                return jsonify({
+                    "profiles": xml_files,
+                    "count": len(xml_files),
+                    "directory": PROFILES_DIR
+                }).get_data()
+
+            return _response_cache.respond(request, "profiles", etag, build,
+                                           "application/json")
             
         except PermissionError:
             return jsonify({"error": f"Permission denied accessing {PROFILES_DIR}"}), 403
@@ -529,51 +497,49 @@ def get_all_profiles_metadata():
         if not os.path.exists(PROFILES_DIR):
             return jsonify({"error": f"Profiles directory {PROFILES_DIR} does not exist"}), 404
         
-        # Get all XML files in the directory
+        # Metadata is read from the profile catalog, only new or changed 
+        # profiles are parsed
         try:
-            files = os.listdir(PROFILES_DIR)
-            xml_files = [f for f in files if f.lower().endswith('.xml')]
-            
-            profiles_metadata = {}
-            
-            for filename in xml_files:
-                filepath = os.path.join(PROFILES_DIR, filename)
-                try:
-                    # Load the XML profile
-                    xml_profile = XmlProfile(filepath)
-                    
-                    # Extract metadata
-                    metadata = {}
-                    for key in xml_profile.get_meta_keys():
-                        metadata[key] = xml_profile.get_meta(key)
-                    
-                    # Add system metadata
+            if not os.access(PROFILES_DIR, os.R_OK | os.X_OK):
+                raise PermissionError()
+            profiles = get_profile_catalog(PROFILES_DIR).profiles()
+            etag = make_etag(PROFILES_DIR,
+                             [(filename, entry.get("mtime"), entry.get("size"))
+                              for filename, entry in profiles.items()])
+
+            def build():
+                profiles_metadata = {}
+
+                for filename, entry in profiles.items():
+                    filepath = os.path.join(PROFILES_DIR, filename)
+                    if "error" in entry:
+                        profiles_metadata[filename] = {
+                            "error": f"Failed to parse profile: {entry['error']}",
+                            "_system": {
+                                "filename": filename,
+                                "filepath": filepath
+                            }
+                        }
+                        continue
+
+                    metadata = dict(entry["metadata"])
                     metadata["_system"] = {
-                        "profileName": xml_profile.get_meta("profileName") or "Unknown Profile",
-                        "profileVersion": xml_profile.get_meta("profileVersion") or "Unknown Version",
-                        "sampleRate": xml_profile.samplerate(),
+                        "profileName": entry.get("profileName") or "Unknown Profile",
+                        "profileVersion": entry.get("profileVersion") or "Unknown Version",
+                        "sampleRate": entry.get("samplerate"),
                         "filename": filename,
                         "filepath": filepath
                     }
-                    
                     profiles_metadata[filename] = metadata
-                    
-                except Exception as e:
-                    # If we can't parse a profile, include error info
-                    logging.warning(f"Error parsing profile {filename}: {str(e)}")
-                    profiles_metadata[filename] = {
-                        "error": f"Failed to parse profile: {str(e)}",
-                        "_system": {
-                            "filename": filename,
-                            "filepath": filepath
-                        }
-                    }
-            
-            return jsonify({
-                "profiles": profiles_metadata,
-                "count": len(xml_files),
-                "directory": PROFILES_DIR
-            })
+
+                return jsonify({
+                    "profiles": profiles_metadata,
+                    "count": len(profiles),
+                    "directory": PROFILES_DIR
+                }).get_data()
+
+            return _response_cache.respond(request, "profiles/metadata", etag,
+                                           build, "application/json")
             
         except PermissionError:
             return jsonify({"error": f"Permission denied accessing {PROFILES_DIR}"}), 403
@@ -594,38 +560,50 @@ def get_metadata():
         start (str): Optional parameter to filter metadata keys that start with this string
         filter (str): Optional parameter to filter metadata by type (e.g., 'biquad')
     """
-    metadata = get_profile_metadata()
-    
     # Get start parameter with empty string as default
     start_filter = request.args.get('start', '')
     # Get filter type parameter
     filter_type = request.args.get('filter', '')
-    
-    # Apply filters
-    filtered_metadata = {}
-    
-    for key, value in metadata.items():
-        # Skip system metadata unless copying to final result
-        if key == "_system":
-            continue
-            
-        # Apply start filter
-        if start_filter and not key.startswith(start_filter):
-            continue
-            
-        # Apply type filter if specified
-        if filter_type == 'biquad':
-            if isinstance(value, str) and isBiquad(value):
+
+    # The entity tag has to be calculated first, it detects program 
+    # changes that invalidate the cached metadata
+    etag = get_profile_etag(start_filter, filter_type)
+    metadata = get_profile_metadata()
+
+    def build():
+        # Apply filters
+        filtered_metadata = {}
+
+        for key, value in metadata.items():
+            # Skip system metadata unless copying to final result
+            if key == "_system":
+                continue
+
+            # Apply start filter
+            if start_filter and not key.startswith(start_filter):
+                continue
+
+            # Apply type filter if specified
+            if filter_type == 'biquad':
+                if isinstance(value, str) and isBiquad(value):
+                    filtered_metadata[key] = value
+            elif not filter_type:  # No filter type specified, include all items passing start filter
                 filtered_metadata[key] = value
-        elif not filter_type:  # No filter type specified, include all items passing start filter
-            filtered_metadata[key] = value
-        # Future filter types can be added here with additional elif clauses
-    
-    # Always include system metadata if it exists
-    if "_system" in metadata:
-        filtered_metadata["_system"] = metadata["_system"]
-    
-    return jsonify(filtered_metadata)
+            # Future filter types can be added here with additional elif clauses
+
+        # Always include system metadata if it exists
+        if "_system" in metadata:
+            filtered_metadata["_system"] = metadata["_system"]
+
+        return jsonify(filtered_metadata).get_data()
+
+    if "error" in metadata:
+        # don't cache errors, the profile might be installed later
+        return build(), 200, {'Content-Type': 'application/json'}
+
+    return _response_cache.respond(request,
+                                   f"metadata?start={start_filter}&filter={filter_type}",
+                                   etag, build, "application/json")
 
 
 def split_to_bytes(value, byte_count):
@@ -753,6 +731,10 @@ def memory_read(address, length):
             if output_format not in ['hex', 'int', 'float']:
                 return jsonify({"error": "Invalid format. Supported values are 'hex', 'int', 'float'"}), 400
 
+            if output_format == 'float':
+                values_32bit = [float(v) for v in Adau145x.decimal_val_array(bytes_data)]
+                return jsonify({"address": hex(address), "values": values_32bit})
+
             # Concatenate 4 bytes to form 32-bit values
             values_32bit = []
             for i in range(0, len(bytes_data), 4):
@@ -761,8 +743,6 @@ def memory_read(address, length):
                     values_32bit.append(hex(value))
                 elif output_format == 'int':
                     values_32bit.append(value)
-                elif output_format == 'float':
-                    values_32bit.append(Adau145x.decimal_val(value))
 
             return jsonify({"address": hex(address), "values": values_32bit})
         except Exception as e:
@@ -1084,6 +1064,22 @@ def get_frequency_response():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/connections', methods=['GET'])
+def get_connections():
+    """
+    API endpoint to get the SigmaTCP connection limits and the counters of
+    all connected clients (requests, bytes, SPI time)
+    """
+    try:
+        # Import here to avoid circular imports
+        from hifiberrydsp.server.sigmatcp import SigmaTCPHandler
+
+        return jsonify(SigmaTCPHandler.clients.stats())
+    except Exception as e:
+        logging.error(f"Error getting connection statistics: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/cache/clear', methods=['POST'])
 def clear_cache():
     """API endpoint to clear the XML profile cache"""
@@ -1099,7 +1095,8 @@ def clear_cache():
 def get_cache_status():
     """API endpoint to get information about the current cache status"""
     try:
-        global _xml_profile_cache, _checksum_cache
+        global _xml_profile_cache
+        snapshot = Adau145x.program_identity().cached()
         
         # Create response with cache information
         cache_info = {
@@ -1112,11 +1109,14 @@ def get_cache_status():
                 "cached": _xml_profile_cache["metadata"] is not None
             },
             "checksum": {
-                "cached": is_checksum_cache_valid(),
-                "md5": _checksum_cache["md5"],
-                "sha1": _checksum_cache["sha1"],
-                "program_length": _checksum_cache["program_length"]
-            }
+                "cached": snapshot is not None,
+                "md5": snapshot.checksum("signature", "md5") if snapshot else None,
+                "sha1": snapshot.checksum("signature", "sha1") if snapshot else None,
+                "program_length": snapshot.program_length if snapshot else None
+            },
+            "program": Adau145x.program_identity().stats(),
+            "shadow": Adau145x.shadow_stats(),
+            "responses": _response_cache.stats()
         }
         
         # Add profile name if available
@@ -1159,16 +1159,18 @@ def get_xml_profile_data():
     """
     if request.method == 'GET':
         try:
+            etag = get_profile_etag()
+
             # Get the XML profile from cache or disk
             xml_profile = get_xml_profile()
             if not xml_profile:
                 return jsonify({"error": "DSP profile file not found or invalid"}), 404
             
-            # Get the raw XML data as string
-            xml_data = str(xml_profile)
-            
-            # Return the XML data with the correct content type
-            return xml_data, 200, {'Content-Type': 'application/xml'}
+            # The XML data is only serialized again if the program or the 
+            # profile file changed
+            return _response_cache.respond(request, "dspprofile", etag,
+                                           lambda: str(xml_profile),
+                                           "application/xml")
             
         except Exception as e:
             logging.error(f"Error retrieving XML profile: {str(e)}")
@@ -1287,7 +1289,8 @@ def get_xml_profile_data():
                     "status": "success",
                     "message": f"Profile from {source_type} successfully written to EEPROM",
                     "checksums": checksum_info,
-                    "match": checksums_match
+                    "match": checksums_match,
+                    "timing": Adau145x.eeprom_timing
                 })
                 
             except Exception as e:
@@ -1328,6 +1331,137 @@ def resolve_address_from_metadata(key):
         return None
 
 
+def prepare_biquad(data, sample_rate):
+    """
+    Resolve the address of a biquad filter request and calculate its 
+    coefficients without writing them to the DSP.
+    
+    Args:
+        data (dict): Filter request with address, offset and filter (see /biquad)
+        sample_rate (int): Sample rate used for filter specifications
+        
+    Returns:
+        tuple: (address, Biquad, result) if the filter is valid, result is
+        the response of /biquad. (None, None, error) otherwise, error 
+        contains the message and the HTTP status code
+    """
+    if not isinstance(data, dict) or 'address' not in data or 'filter' not in data:
+        return None, None, {"error": "Address and filter are required in the request body", "status": 400}
+        
+    # Get offset (default to 0)
+    try:
+        offset = int(data.get('offset', 0))
+    except (ValueError, TypeError):
+        return None, None, {"error": f"Invalid offset: {data.get('offset')}", "status": 400}
+    
+    # Resolve address
+    raw_address = data['address']
+    base_address = None
+    
+    # Check if address is a direct hex or integer value
+    if isinstance(raw_address, (int, float)) or (isinstance(raw_address, str) and 
+                                               (raw_address.startswith('0x') or raw_address.isdigit())):
+        try:
+            if isinstance(raw_address, str):
+                base_address = int(raw_address, 0)
+            else:
+                base_address = int(raw_address)
+        except ValueError:
+            return None, None, {"error": f"Invalid address format: {raw_address}", "status": 400}
+    else:
+        # Try to resolve from metadata
+        base_address = resolve_address_from_metadata(raw_address)
+        if base_address is None:
+            return None, None, {"error": f"Could not resolve address from metadata key: {raw_address}", "status": 404}
+            
+    # Calculate actual address with offset
+    actual_address = base_address + (offset * 5)
+    
+    # Check if address is valid
+    if not Adau145x.is_valid_memory_address(actual_address) or not Adau145x.is_valid_memory_address(actual_address + 4):
+        return None, None, {"error": f"Invalid memory address range: {hex(actual_address)} to {hex(actual_address + 4)}", "status": 400}
+        
+    # Process filter parameters
+    filter_data = data['filter']
+    
+    try:
+        if isinstance(filter_data, dict) and all(k in filter_data for k in ['a0', 'a1', 'a2', 'b0', 'b1', 'b2']):
+            # Direct coefficients provided
+            a0 = float(filter_data['a0'])
+            a1 = float(filter_data['a1'])
+            a2 = float(filter_data['a2'])
+            b0 = float(filter_data['b0'])
+            b1 = float(filter_data['b1'])
+            b2 = float(filter_data['b2'])
+            
+            bq = Biquad(a0, a1, a2, b0, b1, b2, "Custom biquad")
+            
+            return actual_address, bq, {
+                "status": "success", 
+                "address": hex(actual_address),
+                "sampleRate": sample_rate,
+                "coefficients": {
+                    "a0": a0, "a1": a1, "a2": a2,
+                    "b0": b0, "b1": b1, "b2": b2
+                }
+            }
+            
+        elif isinstance(filter_data, dict) and 'type' in filter_data:
+            # This is a filter specification, create a Filter object
+            filter_json = json.dumps(filter_data)
+            filter_obj = Filter.fromJSON(filter_json)
+            
+            # Calculate biquad coefficients
+            coeffs = filter_obj.biquadCoefficients(sample_rate)
+            
+            if not coeffs or len(coeffs) != 6:
+                return None, None, {"error": "Invalid coefficients returned from filter", "status": 500}
+            
+            # Extract coefficients
+            b0, b1, b2, a0, a1, a2 = coeffs
+            
+            # Create a Biquad object
+            description = f"{filter_data.get('type', 'Filter')} at {filter_data.get('f', '')}Hz"
+            bq = Biquad(a0, a1, a2, b0, b1, b2, description)
+            
+            return actual_address, bq, {
+                "status": "success", 
+                "address": hex(actual_address),
+                "sampleRate": sample_rate,
+                "filter": filter_data,
+                "coefficients": {
+                    "a0": a0, "a1": a1, "a2": a2,
+                    "b0": b0, "b1": b1, "b2": b2
+                }
+            }
+        else:
+            return None, None, {"error": "Invalid filter format. Expected direct coefficients or filter specification", "status": 400}
+            
+    except Exception as e:
+        logging.error(f"Error processing filter parameters: {str(e)}")
+        return None, None, {"error": f"Error processing filter: {str(e)}", "status": 500}
+
+
+def get_request_samplerate(data):
+    """
+    Get the sample rate of a filter request: the sampleRate parameter if 
+    given, otherwise the sample rate from the profile or the guessed one
+    
+    Returns:
+        int: The sample rate or None if the sampleRate parameter is invalid
+    """
+    if 'sampleRate' in data:
+        try:
+            sample_rate = int(data['sampleRate'])
+            logging.debug(f"Using provided sample rate: {sample_rate}")
+            if sample_rate:
+                return sample_rate
+        except (ValueError, TypeError):
+            return None
+    
+    return get_or_guess_samplerate()
+
+
 @app.route('/biquad', methods=['POST'])
 def set_biquad_filter():
     """
@@ -1343,127 +1477,156 @@ def set_biquad_filter():
         data = request.json
         if not data or 'address' not in data or 'filter' not in data:
             return jsonify({"error": "Address and filter are required in the request body"}), 400
-            
-        # Get offset (default to 0)
-        offset = int(data.get('offset', 0))
-        
-        # Resolve address
-        raw_address = data['address']
-        base_address = None
-        
-        # Check if address is a direct hex or integer value
-        if isinstance(raw_address, (int, float)) or (isinstance(raw_address, str) and 
-                                                   (raw_address.startswith('0x') or raw_address.isdigit())):
-            try:
-                base_address = int(raw_address, 0)
-            except ValueError:
-                return jsonify({"error": f"Invalid address format: {raw_address}"}), 400
-        else:
-            # Try to resolve from metadata
-            base_address = resolve_address_from_metadata(raw_address)
-            if base_address is None:
-                return jsonify({"error": f"Could not resolve address from metadata key: {raw_address}"}), 404
-                
-        # Calculate actual address with offset
-        actual_address = base_address + (offset * 5)
-        
-        # Check if address is valid
-        if not Adau145x.is_valid_memory_address(actual_address) or not Adau145x.is_valid_memory_address(actual_address + 4):
-            return jsonify({"error": f"Invalid memory address range: {hex(actual_address)} to {hex(actual_address + 4)}"}), 400
-            
-        # Process filter parameters
-        filter_data = data['filter']
         
         # Override sample rate if provided, otherwise get from profile or guess
-        sample_rate = None
-        if 'sampleRate' in data:
-            try:
-                sample_rate = int(data['sampleRate'])
-                logging.debug(f"Using provided sample rate: {sample_rate}")
-            except (ValueError, TypeError):
-                return jsonify({"error": "Invalid sample rate value"}), 400
+        sample_rate = get_request_samplerate(data)
+        if sample_rate is None:
+            return jsonify({"error": "Invalid sample rate value"}), 400
         
-        # If sample rate wasn't provided or was invalid, get it from profile or guess
-        if not sample_rate:
-            sample_rate = get_or_guess_samplerate()
+        address, bq, result = prepare_biquad(data, sample_rate)
+        if address is None:
+            status = result.pop("status")
+            return jsonify(result), status
         
         try:
-            if isinstance(filter_data, dict) and all(k in filter_data for k in ['a0', 'a1', 'a2', 'b0', 'b1', 'b2']):
-                # Direct coefficients provided
-                a0 = float(filter_data['a0'])
-                a1 = float(filter_data['a1'])
-                a2 = float(filter_data['a2'])
-                b0 = float(filter_data['b0'])
-                b1 = float(filter_data['b1'])
-                b2 = float(filter_data['b2'])
-                
-                # Create a Biquad object and write it to DSP memory
-                bq = Biquad(a0, a1, a2, b0, b1, b2, "Custom biquad")
-                Adau145x.write_biquad(actual_address, bq)
-                
-                # Store the filter in the filter store using checksum
-                checksum = get_current_program_checksum_sha1()
-                if checksum:
-                    settings_store.store_filter(checksum, raw_address, offset, filter_data)
-                
-                return jsonify({
-                    "status": "success", 
-                    "address": hex(actual_address),
-                    "sampleRate": sample_rate,
-                    "coefficients": {
-                        "a0": a0, "a1": a1, "a2": a2,
-                        "b0": b0, "b1": b1, "b2": b2
-                    }
-                })
-                
-            elif isinstance(filter_data, dict) and 'type' in filter_data:
-                # This is a filter specification, create a Filter object
-                filter_json = json.dumps(filter_data)
-                filter_obj = Filter.fromJSON(filter_json)
-                
-                # Calculate biquad coefficients
-                coeffs = filter_obj.biquadCoefficients(sample_rate)
-                
-                if not coeffs or len(coeffs) != 6:
-                    return jsonify({"error": "Invalid coefficients returned from filter"}), 500
-                
-                # Extract coefficients
-                b0, b1, b2, a0, a1, a2 = coeffs
-                
-                # Create a Biquad object
-                description = f"{filter_data.get('type', 'Filter')} at {filter_data.get('f', '')}Hz"
-                bq = Biquad(a0, a1, a2, b0, b1, b2, description)
-                
-                # Write the biquad to DSP memory
-                Adau145x.write_biquad(actual_address, bq)
-                
-                # Store the filter in the filter store using checksum
-                checksum = get_current_program_checksum_sha1()
-                if checksum:
-                    settings_store.store_filter(checksum, raw_address, offset, filter_data)
-                
-                return jsonify({
-                    "status": "success", 
-                    "address": hex(actual_address),
-                    "sampleRate": sample_rate,
-                    "filter": filter_data,
-                    "coefficients": {
-                        "a0": a0, "a1": a1, "a2": a2,
-                        "b0": b0, "b1": b1, "b2": b2
-                    }
-                })
-            else:
-                return jsonify({"error": "Invalid filter format. Expected direct coefficients or filter specification"}), 400
-                
+            # Write the biquad to DSP memory
+            Adau145x.write_biquad(address, bq, safeload=True)
+            
+            # Store the filter in the filter store using checksum
+            checksum = get_current_program_checksum_sha1()
+            if checksum:
+                settings_store.store_filter(checksum, data['address'], int(data.get('offset', 0)), data['filter'])
         except Exception as e:
             logging.error(f"Error processing filter parameters: {str(e)}")
             return jsonify({"error": f"Error processing filter: {str(e)}"}), 500
+        
+        return jsonify(result)
                 
     except Exception as e:
         logging.error(f"Error setting biquad filter: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/biquads', methods=['POST'])
+def set_biquad_filters():
+    """
+    API endpoint to set multiple biquad filters, e.g. all bands of one or 
+    more filter banks
+    
+    The request body should contain:
+    - filters: Array of filter requests as used by /biquad. Instead of a 
+      single filter, an entry can contain a "filters" array that is written 
+      to consecutive offsets starting at its offset.
+    - sampleRate: (optional) Override the sample rate for filter calculation
+    - safeload: (optional, default true) Update the coefficients using safeload
+    - store: (optional, default true) Store the filters in the settings store
+    
+    All coefficients are calculated first. The valid filters are written to 
+    the DSP in a single coalesced SPI batch and stored with a single write 
+    of the settings store. Invalid filters are reported in the results and 
+    skipped.
+    """
+    try:
+        data = request.json
+        if not data or not isinstance(data.get('filters'), list):
+            return jsonify({"error": "Filters array is required in the request body"}), 400
+        
+        sample_rate = get_request_samplerate(data)
+        if sample_rate is None:
+            return jsonify({"error": "Invalid sample rate value"}), 400
+        
+        safeload = data.get('safeload', True)
+        store = data.get('store', True)
+        if not isinstance(safeload, bool) or not isinstance(store, bool):
+            return jsonify({"error": "safeload and store must be true or false"}), 400
+        
+        # Expand filter banks to single filters
+        filter_requests = []
+        for entry in data['filters']:
+            if isinstance(entry, dict) and isinstance(entry.get('filters'), list) and 'filter' not in entry:
+                try:
+                    offset = int(entry.get('offset', 0))
+                except (ValueError, TypeError):
+                    filter_requests.append(entry)
+                    continue
+                for i, filter_data in enumerate(entry['filters']):
+                    filter_requests.append({
+                        "address": entry.get('address'),
+                        "offset": offset + i,
+                        "filter": filter_data
+                    })
+            else:
+                filter_requests.append(entry)
+        
+        results = []
+        writes = []
+        store_entries = []
+        for index, filter_request in enumerate(filter_requests):
+            address, bq, result = prepare_biquad(filter_request, sample_rate)
+            if address is not None:
+                # convert before the batch is opened, a filter that fails
+                # here must not leave the others partially written
+                try:
+                    memory = Adau145x.biquad_data(bq)
+                except Exception as e:
+                    logging.error(f"Error converting filter {index}: {str(e)}")
+                    address = None
+                    result = {"error": f"Error processing filter: {str(e)}", "status": 500}
+            result["index"] = index
+            results.append(result)
+            if address is None:
+                result["code"] = result.pop("status")
+                result["status"] = "error"
+                continue
+            result["offset"] = int(filter_request.get('offset', 0))
+            writes.append((address, memory))
+            store_entries.append({
+                "address": filter_request['address'],
+                "offset": result["offset"],
+                "filter": filter_request['filter']
+            })
+        
+        if writes:
+            try:
+                # One SPI batch, the coefficients of adjacent filters are
+                # written as a single burst
+                with Adau145x.batch(safeload=safeload):
+                    for address, memory in writes:
+                        Adau145x.write_memory(address, memory)
+            except Exception as e:
+                logging.error(f"Error writing biquad filters: {str(e)}")
+                return jsonify({"error": f"Error writing filters: {str(e)}", "results": results}), 500
+        
+        stored = False
+        checksum = None
+        if store and store_entries:
+            checksum = get_current_program_checksum_sha1()
+            if checksum:
+                stored = settings_store.store_filters(checksum, store_entries)
+        
+        if len(writes) == len(filter_requests):
+            status = "success"
+        elif writes:
+            status = "partial"
+        else:
+            status = "error"
+        
+        return jsonify({
+            "status": status,
+            "sampleRate": sample_rate,
+            "safeload": safeload,
+            "written": len(writes),
+            "total": len(filter_requests),
+            "stored": stored,
+            "checksum": checksum,
+            "results": results
+        })
+        
+    except Exception as e:
+        logging.error(f"Error setting biquad filters: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/filters', methods=['GET'])
 def get_filters():
     """
@@ -2019,7 +2182,7 @@ def apply_filter_bypass_to_dsp(checksum, address, offset, bypassed):
             
             # Create bypass biquad and write to DSP
             bq = Biquad(a0, a1, a2, b0, b1, b2, "Bypass filter")
-            Adau145x.write_biquad(actual_address, bq)
+            Adau145x.write_biquad(actual_address, bq, safeload=True)
             
             logging.info(f"Applied bypass filter at address {hex(actual_address)}")
         else:
@@ -2037,7 +2200,7 @@ def apply_filter_bypass_to_dsp(checksum, address, offset, bypassed):
                 
                 # Create and write biquad
                 bq = Biquad(a0, a1, a2, b0, b1, b2, "Restored filter")
-                Adau145x.write_biquad(actual_address, bq)
+                Adau145x.write_biquad(actual_address, bq, safeload=True)
             
             elif 'type' in filter_spec:
                 # Filter specification - calculate coefficients
@@ -2059,7 +2222,7 @@ def apply_filter_bypass_to_dsp(checksum, address, offset, bypassed):
                 # Create and write biquad
                 description = f"{filter_spec.get('type', 'Filter')} at {filter_spec.get('f', '')}Hz"
                 bq = Biquad(a0, a1, a2, b0, b1, b2, description)
-                Adau145x.write_biquad(actual_address, bq)
+                Adau145x.write_biquad(actual_address, bq, safeload=True)
             else:
                 logging.error("Invalid filter format in stored data")
                 return False
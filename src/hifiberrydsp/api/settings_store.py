@@ -329,6 +329,26 @@ class SettingsStore:
             filter_data (dict): The filter data
             bypassed (bool): Whether the filter is currently bypassed
             
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.store_filters(checksum, [{
+            "address": address,
+            "offset": offset,
+            "filter": filter_data,
+            "bypassed": bypassed
+        }])
+
+    def store_filters(self, checksum, filters):
+        """
+        Store multiple filters with a single read and write of the settings 
+        store
+        
+        Args:
+            checksum (str): DSP profile checksum
+            filters (list): Dictionaries with address, offset, filter and 
+                optionally bypassed (see store_filter)
+            
         Returns:
             bool: True if successful, False otherwise
         """
@@ -346,30 +366,36 @@ class SettingsStore:
             if "filters" not in store[checksum]:
                 store[checksum]["filters"] = {}
             
-            # Create a unique key for this filter location
-            # Always include offset suffix for consistency
-            filter_key = f"{address}_{offset}"
-            
-            # Store the filter with timestamp and bypass state
-            filter_entry = {
-                "address": address,
-                "offset": offset,
-                "filter": filter_data,
-                "timestamp": time.time(),
-                "bypassed": bypassed
-            }
-            
-            # If this filter already exists, preserve bypass state unless explicitly overridden
-            if filter_key in store[checksum]["filters"] and "bypassed" in store[checksum]["filters"][filter_key]:
-                # Preserve existing bypass state if not explicitly set
-                existing_bypass = store[checksum]["filters"][filter_key].get("bypassed", False)
-                filter_entry["bypassed"] = existing_bypass
-            
-            store[checksum]["filters"][filter_key] = filter_entry
+            stored_filters = store[checksum]["filters"]
+            timestamp = time.time()
+            for entry in filters:
+                address = entry["address"]
+                offset = entry.get("offset", 0)
+
+                # Create a unique key for this filter location
+                # Always include offset suffix for consistency
+                filter_key = f"{address}_{offset}"
+                
+                # Store the filter with timestamp and bypass state
+                filter_entry = {
+                    "address": address,
+                    "offset": offset,
+                    "filter": entry["filter"],
+                    "timestamp": timestamp,
+                    "bypassed": entry.get("bypassed", False)
+                }
+                
+                # If this filter already exists, preserve bypass state unless explicitly overridden
+                if filter_key in stored_filters and "bypassed" in stored_filters[filter_key]:
+                    # Preserve existing bypass state if not explicitly set
+                    existing_bypass = stored_filters[filter_key].get("bypassed", False)
+                    filter_entry["bypassed"] = existing_bypass
+                
+                stored_filters[filter_key] = filter_entry
             
             return self.save_store(store)
         except Exception as e:
-            logging.error(f"Error storing filter: {str(e)}")
+            logging.error(f"Error storing filters: {str(e)}")
             return False
     
     def store_memory_setting(self, checksum, address, values):
@@ -0,0 +1,70 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from hifiberrydsp.api.settings_store import SettingsStore
+
+CHECKSUM = "BEE7855166254998B4B9F038FD515571325357CE"
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = SettingsStore()
+        self.store.store_file = os.path.join(self.tmpdir, "dspsettings.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testStoreFilters(self):
+        peq = {"type": "PeakingEq", "f": 1000, "db": -3.0, "q": 1.0}
+        self.assertTrue(self.store.store_filter(CHECKSUM.lower(), "IIR_L", 1,
+                                                peq, bypassed=True))
+
+        saves = []
+        save_store = self.store.save_store
+
+        def count_saves(data):
+            saves.append(data)
+            return save_store(data)
+
+        self.store.save_store = count_saves
+        filters = [{"address": "IIR_L", "offset": i, "filter": peq}
+                   for i in range(10)]
+        self.assertTrue(self.store.store_filters(CHECKSUM, filters))
+        self.assertEqual(len(saves), 1)
+
+        stored = self.store.load_filters(CHECKSUM)
+        self.assertEqual(len(stored), 10)
+        self.assertEqual(stored["IIR_L_3"]["filter"], peq)
+        # the bypass state of existing filters is kept
+        self.assertTrue(stored["IIR_L_1"]["bypassed"])
+        self.assertFalse(stored["IIR_L_2"]["bypassed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
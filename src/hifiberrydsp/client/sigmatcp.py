@@ -22,108 +22,457 @@ SOFTWARE.
 
 import socket
 import time
+import json
 import os
 import logging
+from collections import deque
 
 
 from hifiberrydsp.datatools import int_data
 from hifiberrydsp import datatools
 
 from hifiberrydsp.server.constants import \
-    COMMAND_READ, COMMAND_WRITE, COMMAND_EEPROM_FILE, COMMAND_CHECKSUM, \
+    COMMAND_READ, COMMAND_READRESPONSE, COMMAND_WRITE, \
+    COMMAND_EEPROM_FILE, COMMAND_CHECKSUM, COMMAND_CHECKSUM_RESPONSE, \
     COMMAND_WRITE_EEPROM_CONTENT, COMMAND_GET_META, \
     COMMAND_META_RESPONSE, COMMAND_GPIO, COMMAND_GPIO_RESPONSE, \
-    DEFAULT_PORT, \
+    COMMAND_PROGMEM_BINARY, COMMAND_PROGMEM_BINARY_RESPONSE, \
+    COMMAND_DATAMEM_BINARY, COMMAND_DATAMEM_BINARY_RESPONSE, \
+    COMMAND_BATCH, COMMAND_BATCH_RESPONSE, \
+    COMMAND_SUBSCRIBE, COMMAND_SUBSCRIBE_RESPONSE, COMMAND_NOTIFY, \
+    COMMAND_UNSUBSCRIBE, COMMAND_STATS, COMMAND_STATS_RESPONSE, \
+    DEFAULT_PORT, DEFAULT_UNIX_SOCKET, \
     HEADER_SIZE, \
     SigmaTCPException
 
 
+# Maximum number of requests that are sent before their responses are read
+DEFAULT_PIPELINE_DEPTH = 16
+
+# Initial size of the receive buffer
+BUFFER_SIZE = 65536
+
+LOCAL_HOSTS = ["localhost", "127.0.0.1", "::1"]
+
+
+class ResponseReader():
+    '''
+    Reads responses from a socket into a reusable buffer. Each recv_into()
+    call reads as much data as available, responses to pipelined requests 
+    are usually received with a single system call.
+    '''
+
+    def __init__(self, sock, size=BUFFER_SIZE):
+        self.socket = sock
+        self.buffer = bytearray(size)
+        self.start = 0
+        self.end = 0
+
+    def fill(self, length):
+        '''
+        Receive until at least length bytes are buffered. If the socket
+        times out, the buffered data is kept for the next call.
+        '''
+        if self.end - self.start < length:
+            self.make_room(length)
+            view = memoryview(self.buffer)
+            while self.end - self.start < length:
+                received = self.socket.recv_into(view[self.end:])
+                if received == 0:
+                    raise SigmaTCPException("Connection closed")
+                self.end += received
+
+    def consume(self, length):
+        data = self.buffer[self.start:self.start + length]
+        self.start += length
+        if self.start == self.end:
+            self.start = self.end = 0
+        return data
+
+    def read_exact(self, length):
+        '''
+        Read exactly length bytes, blocks until they are received
+
+        Returns:
+            bytearray: received data
+        '''
+        self.fill(length)
+        return self.consume(length)
+
+    def read_frame(self):
+        '''
+        Read a response consisting of the header and the number of bytes
+        given by the data length field in the header. Nothing is consumed
+        until the complete response has been received.
+
+        Returns:
+            tuple: (header, data)
+        '''
+        self.fill(HEADER_SIZE)
+        length = int.from_bytes(
+            self.buffer[self.start + 6:self.start + 10], byteorder='big')
+        self.fill(HEADER_SIZE + length)
+        header = self.consume(HEADER_SIZE)
+        return (header, self.consume(length))
+
+    def make_room(self, length):
+        available = self.end - self.start
+        if self.start + length <= len(self.buffer):
+            return
+
+        if length > len(self.buffer):
+            buffer = bytearray(max(length, 2 * len(self.buffer)))
+        else:
+            buffer = self.buffer
+        buffer[0:available] = self.buffer[self.start:self.end]
+        self.buffer = buffer
+        self.start = 0
+        self.end = available
+
+
+class PendingResponse():
+    '''
+    Response to a request that has been sent, but might not have been 
+    received yet
+    '''
+
+    def __init__(self, client, response_code):
+        self.client = client
+        self.response_code = response_code
+        self.header = None
+        self.data = None
+        self.done = False
+
+    def result(self):
+        '''
+        Wait for the response, responses to earlier requests are received 
+        first
+
+        Returns:
+            bytearray: data of the response without the header
+        '''
+        while not self.done:
+            self.client.receive_response()
+        return self.data
+
+    def valid(self):
+        return self.result() is not None and \
+            self.header[0] == self.response_code
+
+
 class SigmaTCPClient():
+    '''
+    Client for the SigmaTCP server
 
-    def __init__(self, dsp, ip, port=DEFAULT_PORT, autoconnect=True):
+    Requests can be pipelined: send_request() returns without waiting for
+    the response, up to pipeline_depth requests can be outstanding. 
+    Responses are matched to requests in order.
+
+    Connections to the default port on localhost use the server's Unix 
+    domain socket if it exists.
+    '''
+
+    def __init__(self, dsp, ip, port=DEFAULT_PORT, autoconnect=True,
+                 pipeline_depth=DEFAULT_PIPELINE_DEPTH,
+                 unix_socket=DEFAULT_UNIX_SOCKET):
         self.ip = ip
         self.port = port
+        self.unix_socket = unix_socket
         self.dsp = dsp
         self.autoconnect = autoconnect
+        self.pipeline_depth = max(1, pipeline_depth)
         self.socket = None
+        self.reader = None
+        self.pending = deque()
+        self.notifications = deque()
 
     def connect(self):
+        self.socket = self.connect_unix()
+        if self.socket is None:
+            try:
+                self.socket = socket.create_connection((self.ip, self.port))
+                self.socket.setsockopt(socket.IPPROTO_TCP,
+                                       socket.TCP_NODELAY, 1)
+            except IOError:
+                self.socket = None
+                raise SigmaTCPException(
+                    "Could not connect to {}:{}".format(self.ip, self.port))
+        self.reader = ResponseReader(self.socket)
+        self.pending.clear()
+        self.notifications.clear()
+
+    def connect_unix(self):
+        '''
+        Connect to the Unix domain socket of a local server
+
+        Returns:
+            socket: the connected socket or None if not available
+        '''
+        if self.unix_socket is None or self.ip not in LOCAL_HOSTS or \
+                self.port != DEFAULT_PORT or \
+                not os.path.exists(self.unix_socket):
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.ip, self.port))
-        except IOError:
-            self.socket = None
-            raise SigmaTCPException(
-                "Could not connect to {}:{}".format(self.ip, self.port))
+            sock.connect(self.unix_socket)
+        except IOError as e:
+            logging.debug("can't connect to %s, using TCP: %s",
+                          self.unix_socket, e)
+            sock.close()
+            return None
+        return sock
 
     def disconnect(self):
         if self.socket is not None:
             self.socket.close()
             self.socket = None
+            self.reader = None
+            self.pending.clear()
 
-    def read_memory(self, addr, length):
+    def check_connection(self):
         if self.socket is None:
             if self.autoconnect:
                 self.connect()
             else:
                 raise SigmaTCPException("Not connected")
 
+    def send_request(self, packet, response_code=None):
+        '''
+        Send a request without waiting for the response
+
+        Args:
+            packet: the request
+            response_code: expected response code, None if the server
+                doesn't send a response
+
+        Returns:
+            PendingResponse: the response or None
+        '''
+        self.check_connection()
+
+        response = None
+        if response_code is not None:
+            while len(self.pending) >= self.pipeline_depth:
+                self.receive_response()
+            response = PendingResponse(self, response_code)
+            self.pending.append(response)
+
+        self.socket.sendall(packet)
+        return response
+
+    def receive_frame(self):
+        try:
+            return self.reader.read_frame()
+        except socket.timeout:
+            raise
+        except (IOError, SigmaTCPException):
+            self.disconnect()
+            raise SigmaTCPException("Connection to server lost")
+
+    def receive_response(self):
+        '''
+        Receive the response to the oldest outstanding request.
+        Notifications received in between are queued.
+        '''
+        response = self.pending[0]
+        (header, data) = self.receive_frame()
+        while header[0] == COMMAND_NOTIFY:
+            self.notifications.append(self.parse_notification(header, data))
+            (header, data) = self.receive_frame()
+
+        self.pending.popleft()
+        if header[0] != response.response_code:
+            logging.error("Expected response code %s, but got %s",
+                          response.response_code, header[0])
+        response.header = header
+        response.data = data
+        response.done = True
+
+    def flush(self):
+        '''
+        Receive the responses to all outstanding requests
+        '''
+        while len(self.pending) > 0:
+            self.receive_response()
+
+    def read_memory(self, addr, length):
         packet = self.read_request(addr, length)
-        self.socket.send(packet)
-        data = self.socket.recv(HEADER_SIZE + length)
-        # remove the header
-        data = data[HEADER_SIZE:]
-        return data
+        return self.send_request(packet, COMMAND_READRESPONSE).result()
 
-    def program_checksum(self):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
+    def read_memory_multi(self, blocks):
+        '''
+        Read multiple memory blocks with pipelined requests
+
+        Args:
+            blocks: list of (addr, length) tuples
+
+        Returns:
+            list: data of the blocks
+        '''
+        responses = [self.send_request(self.read_request(addr, length),
+                                       COMMAND_READRESPONSE)
+                     for (addr, length) in blocks]
+        return [response.result() for response in responses]
 
+    def program_checksum(self):
         packet = self.generic_request(COMMAND_CHECKSUM)
-        self.socket.send(packet)
-        data = self.socket.recv(HEADER_SIZE + 16)
-        # remove the header
-        data = data[HEADER_SIZE:]
-        return data
+        return self.send_request(packet, COMMAND_CHECKSUM_RESPONSE).result()
+
+    def server_stats(self):
+        '''
+        Connection statistics of the server
+
+        Returns:
+            dict: limits, connection counters and a list of the connected
+            clients
+        '''
+        packet = self.generic_request(COMMAND_STATS)
+        data = self.send_request(packet, COMMAND_STATS_RESPONSE).result()
+        return json.loads(bytes(data).decode("utf-8"))
+
+    def get_program_memory(self, start=0, length=0):
+        '''
+        Read raw program memory
+
+        Args:
+            start: start address
+            length: number of words, 0 returns the program up to the end
+                signature
+
+        Returns:
+            bytearray: memory content, empty if the range is invalid
+        '''
+        return self.request_memory(COMMAND_PROGMEM_BINARY,
+                                   COMMAND_PROGMEM_BINARY_RESPONSE,
+                                   start, length)
+
+    def get_data_memory(self, start=0, length=0):
+        '''
+        Read raw data memory
+
+        Args:
+            start: start address
+            length: number of words, 0 returns the full data memory
+
+        Returns:
+            bytearray: memory content, empty if the range is invalid
+        '''
+        return self.request_memory(COMMAND_DATAMEM_BINARY,
+                                   COMMAND_DATAMEM_BINARY_RESPONSE,
+                                   start, length)
+
+    def subscribe(self, cells, interval, threshold=0):
+        '''
+        Subscribe to changes of memory cells or registers. The server 
+        polls the cells and sends a notification if a value changed.
+
+        Args:
+            cells: list of (addr, length) tuples, length in bytes
+            interval: polling interval in seconds
+            threshold: minimum change of the integer value of a cell
+
+        Returns:
+            tuple: (subscription id, {addr: data} with the current values)
+        '''
+        packet = self.subscribe_request(cells, interval, threshold)
+        response = self.send_request(packet, COMMAND_SUBSCRIBE_RESPONSE)
+        if not response.valid():
+            raise SigmaTCPException("Subscription failed")
+
+        sid = int.from_bytes(response.header[10:12], byteorder='big')
+        if sid == 0:
+            raise SigmaTCPException("Subscription failed")
+
+        values = {}
+        pos = 0
+        for (addr, length) in cells:
+            values[addr] = response.data[pos:pos + length]
+            pos += length
+        return (sid, values)
+
+    def unsubscribe(self, sid):
+        packet = bytearray(HEADER_SIZE)
+        packet[0] = COMMAND_UNSUBSCRIBE
+        packet[10:12] = datatools.int_data(sid, 2)
+        self.send_request(packet)
+
+    def receive_notification(self, timeout=None):
+        '''
+        Wait for the next notification of a subscription
+
+        Args:
+            timeout: maximum time to wait in seconds, None waits forever
+
+        Returns:
+            tuple: (subscription id, {addr: data} of changed cells) or None
+            if no notification arrived before the timeout
+        '''
+        self.flush()
+        if len(self.notifications) > 0:
+            return self.notifications.popleft()
+
+        self.check_connection()
+        self.socket.settimeout(timeout)
+        try:
+            (header, data) = self.receive_frame()
+        except socket.timeout:
+            return None
+        finally:
+            if self.socket is not None:
+                self.socket.settimeout(None)
+
+        if header[0] != COMMAND_NOTIFY:
+            logging.error("Expected notification, but got %s", header[0])
+            return None
+        return self.parse_notification(header, data)
 
-    def readwrite_gpio(self, rw, pin, value):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
+    @staticmethod
+    def parse_notification(header, data):
+        sid = int.from_bytes(header[10:12], byteorder='big')
+        values = {}
+        pos = 0
+        while pos + 4 <= len(data):
+            addr = int.from_bytes(data[pos:pos + 2], byteorder='big')
+            length = int.from_bytes(data[pos + 2:pos + 4], byteorder='big')
+            values[addr] = data[pos + 4:pos + 4 + length]
+            pos += 4 + length
+        return (sid, values)
+
+    def request_memory(self, request_code, response_code, start, length):
+        packet = self.memory_request(request_code, start, length)
+        return self.send_request(packet, response_code).result()
+
+    def receive_raw(self, length):
+        '''
+        Receive a response that doesn't have a header
+        '''
+        self.flush()
+        try:
+            return self.reader.read_exact(length)
+        except (IOError, SigmaTCPException):
+            self.disconnect()
+            raise SigmaTCPException("Connection to server lost")
 
+    def readwrite_gpio(self, rw, pin, value):
         packet = self.gpio_request(rw, pin, value)
-        self.socket.send(packet)
-        data = self.socket.recv(HEADER_SIZE + 1)
+        self.send_request(packet)
+        data = self.receive_raw(HEADER_SIZE + 1)
         # remove the header
         data = data[HEADER_SIZE:]
         return data
 
-    def write_memory(self, addr, data):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
-
-        packet = self.write_request(addr, data)
-        self.socket.send(packet)
+    def write_memory(self, addr, data, safeload=False):
+        packet = self.write_request(addr, data, safeload)
+        self.send_request(packet)
 
     def write_eeprom_from_file(self, filename):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
+        self.check_connection()
 
         if (os.path.exists(filename)):
             packet = self.write_eeprom_file_request(os.path.abspath(filename))
-            self.socket.send(packet)
-            result = int.from_bytes(self.socket.recv(1),
+            self.send_request(packet)
+            result = int.from_bytes(self.receive_raw(1),
                                     byteorder='big',
                                     signed=False)
             if result == 1:
@@ -134,15 +483,9 @@ class SigmaTCPClient():
             raise IOError("{} does not exist".format(filename))
 
     def write_eeprom_from_xml(self, xmldata):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
-
         packet = self.write_eeprom_content_request(xmldata)
-        self.socket.send(packet)
-        result = int.from_bytes(self.socket.recv(1),
+        self.send_request(packet)
+        result = int.from_bytes(self.receive_raw(1),
                                 byteorder='big',
                                 signed=False)
         if result == 1:
@@ -166,24 +509,27 @@ class SigmaTCPClient():
             length = self.dsp.DECIMAL_LEN
         return self.read_memory(addr, length)
 
-    def write_biquad(self, start_addr, bq):
+    def write_biquad(self, start_addr, bq, safeload=False):
+        # b2, b1, b0, -a2, -a1 starting at start_addr, written as a single
+        # request, with safeload all coefficients change in the same frame
+        self.write_memory(start_addr, self.biquad_data(bq), safeload)
 
+    def biquad_data(self, bq):
         bqn = bq.normalized()
-        bq_params = []
-        bq_params.append(-bqn.a1)
-        bq_params.append(-bqn.a2)
-        bq_params.append(bqn.b0)
-        bq_params.append(bqn.b1)
-        bq_params.append(bqn.b2)
-
-        reg = start_addr + 4
-        for param in bq_params:
-            self.write_decimal(reg, param)
-            reg = reg - 1
-
-        # reset a1/a2 to their original values
-        bq_params[0] = -bq_params[0]
-        bq_params[1] = -bq_params[1]
+        data = bytearray()
+        for param in [bqn.b2, bqn.b1, bqn.b0, -bqn.a2, -bqn.a1]:
+            data += self.get_decimal_repr(param)
+        return data
+
+    def batch(self):
+        '''
+        Create a batch of reads and writes that are sent in a single 
+        request, e.g.
+
+            (volume, mute) = (client.batch().read(0x10, 4)
+                              .write(0x20, data).read(0x11, 4).execute())
+        '''
+        return SigmaTCPBatch(self)
 
     def write_decibel(self, addr, db):
         amplification = pow(10, db / 20)
@@ -223,16 +569,16 @@ class SigmaTCPClient():
         return packet
 
     @staticmethod
-    def write_request(addr, data):
+    def write_request(addr, data, safeload=False):
         length = len(data)
         packet = bytearray(HEADER_SIZE)
         packet[0] = COMMAND_WRITE
+        packet[1] = 1 if safeload else 0
         packet[11] = length & 0xff
         packet[10] = (length >> 8) & 0xff
         packet[13] = addr & 0xff
         packet[12] = (addr >> 8) & 0xff
-        for d in data:
-            packet.append(d)
+        packet += bytes(data)
 
         packet_length = len(packet)
         packet[6] = packet_length & 0xff
@@ -241,59 +587,20 @@ class SigmaTCPClient():
         return packet
 
     def request_generic(self, request_code, response_code=None):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
-
         packet = self.generic_request(request_code)
-        self.socket.send(packet)
-
-        if response_code is not None:
-            # read header and get length field
-            data = self.socket.recv(HEADER_SIZE)
-            length = int.from_bytes(data[6:10], byteorder='big')
+        response = self.send_request(packet, response_code)
 
-            if (data[0] != response_code):
-                logging.error("Expected response code %s, but got %s",
-                              response_code,
-                              data[0])
-
-            # read data
-            data = bytearray()
-            while (len(data) < length):
-                packet = self.socket.recv(length - len(data))
-                data = data + packet
-
-            return data
+        if response is not None:
+            return response.result()
 
     def request_metadata(self, attribute):
-        if self.socket is None:
-            if self.autoconnect:
-                self.connect()
-            else:
-                raise SigmaTCPException("Not connected")
-
         packet = self.metadata_request(attribute)
-        self.socket.send(packet)
-
-        data = self.socket.recv(HEADER_SIZE)
-        length = int.from_bytes(data[6:10], byteorder='big')
+        response = self.send_request(packet, COMMAND_META_RESPONSE)
 
-        if (data[0] != COMMAND_META_RESPONSE):
-            logging.error("Expected response code %s, but got %s",
-                          COMMAND_META_RESPONSE,
-                          data[0])
+        if not response.valid():
             return
 
-        # read data
-        data = bytearray()
-        while (len(data) < length):
-            packet = self.socket.recv(length - len(data))
-            data = data + packet
-
-        return data.decode("utf-8")
+        return response.data.decode("utf-8")
 
     @staticmethod
     def write_eeprom_file_request(filename):
@@ -315,6 +622,46 @@ class SigmaTCPClient():
         packet.extend(bytearray(data))
         return packet
 
+    @staticmethod
+    def batch_request(operations):
+        '''
+        Args:
+            operations: list of (command, safeload, addr, length, data)
+                tuples, data is only used for COMMAND_WRITE
+        '''
+        packet = bytearray(HEADER_SIZE)
+        packet[0] = COMMAND_BATCH
+        packet[6:10] = datatools.int_data(len(operations), 4)
+        for (command, safeload, addr, length, data) in operations:
+            packet.append(command)
+            packet.append(1 if safeload else 0)
+            packet += datatools.int_data(addr, 2)
+            packet += datatools.int_data(length, 4)
+            if command == COMMAND_WRITE:
+                packet += bytes(data)
+        packet[1:5] = datatools.int_data(len(packet), 4)
+        return packet
+
+    @staticmethod
+    def subscribe_request(cells, interval, threshold=0):
+        packet = bytearray(HEADER_SIZE)
+        packet[0] = COMMAND_SUBSCRIBE
+        packet[6:10] = datatools.int_data(int(interval * 1000), 4)
+        packet[10:14] = datatools.int_data(threshold, 4)
+        for (addr, length) in cells:
+            packet += datatools.int_data(addr, 2)
+            packet += datatools.int_data(length, 2)
+        packet[1:5] = datatools.int_data(len(packet), 4)
+        return packet
+
+    @staticmethod
+    def memory_request(request_code, start=0, length=0):
+        packet = bytearray(HEADER_SIZE)
+        packet[0] = request_code
+        packet[6:10] = datatools.int_data(length, 4)
+        packet[10:12] = datatools.int_data(start, 2)
+        return packet
+
     @staticmethod
     def generic_request(request_type):
         packet = bytearray(HEADER_SIZE)
@@ -342,3 +689,61 @@ class SigmaTCPClient():
             res = res * 256
             res += d
         return res
+
+
+class SigmaTCPBatch():
+    '''
+    Collects reads and writes and executes them with a single request. The
+    server executes the operations in order, memory writes are coalesced 
+    to as few SPI transfers as possible.
+    '''
+
+    def __init__(self, client):
+        self.client = client
+        self.operations = []
+
+    def read(self, addr, length):
+        '''
+        Add a read of length bytes starting at addr
+        '''
+        self.operations.append((COMMAND_READ, False, addr, length, None))
+        return self
+
+    def write(self, addr, data, safeload=False):
+        '''
+        Add a write. If any write of the batch uses safeload, all memory 
+        writes of the batch are written using safeload.
+        '''
+        self.operations.append((COMMAND_WRITE, safeload, addr, len(data),
+                                bytes(data)))
+        return self
+
+    def write_biquad(self, start_addr, bq, safeload=False):
+        return self.write(start_addr, self.client.biquad_data(bq), safeload)
+
+    def execute(self):
+        '''
+        Send the batch to the server
+
+        Returns:
+            list: data of all reads in the order they were added
+        '''
+        if len(self.operations) == 0:
+            return []
+
+        response = self.client.send_request(
+            SigmaTCPClient.batch_request(self.operations),
+            COMMAND_BATCH_RESPONSE)
+
+        lengths = [op[3] for op in self.operations if op[0] == COMMAND_READ]
+        if not response.valid() or len(response.data) != sum(lengths):
+            raise SigmaTCPException("Batch request failed")
+        data = response.data
+
+        self.operations = []
+        result = []
+        pos = 0
+        for length in lengths:
+            result.append(data[pos:pos + length])
+            pos += length
+        return result
@@ -0,0 +1,124 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.server.framing import FrameDecoder
+from hifiberrydsp.server.constants import \
+    COMMAND_READ, COMMAND_READRESPONSE, HEADER_SIZE, DEFAULT_PORT
+
+
+class SlowServer():
+    '''
+    Answers read requests with the low byte of the address, responses are
+    sent in small chunks to simulate short reads
+    '''
+
+    def __init__(self, path=None):
+        if path is None:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.bind(("127.0.0.1", 0))
+            self.port = self.server.getsockname()[1]
+        else:
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(path)
+        self.server.listen(1)
+        self.requests = 0
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        (conn, _addr) = self.server.accept()
+        decoder = FrameDecoder()
+        while decoder.recv_into(conn) > 0:
+            for frame in decoder.frames():
+                if frame[0] != COMMAND_READ:
+                    continue
+                self.requests += 1
+                length = int.from_bytes(frame[6:10], byteorder="big")
+                response = bytearray(HEADER_SIZE)
+                response[0] = COMMAND_READRESPONSE
+                response[6:10] = length.to_bytes(4, byteorder="big")
+                response += bytes([frame[11]] * length)
+                for i in range(0, len(response), 7):
+                    conn.sendall(response[i:i + 7])
+        conn.close()
+        self.server.close()
+
+
+class Test(unittest.TestCase):
+
+    def testFullLengthRead(self):
+        server = SlowServer()
+        client = SigmaTCPClient(Adau145x(), "127.0.0.1", port=server.port)
+        self.assertEqual(client.read_memory(0x12, 1000), bytes([0x12] * 1000))
+        client.disconnect()
+
+    def testPipeline(self):
+        server = SlowServer()
+        client = SigmaTCPClient(Adau145x(), "127.0.0.1", port=server.port,
+                                pipeline_depth=4)
+        responses = [client.send_request(client.read_request(i, 8),
+                                         COMMAND_READRESPONSE)
+                     for i in range(10)]
+        # earlier responses have been received to limit the pipeline depth
+        self.assertEqual(len(client.pending), 4)
+        self.assertTrue(responses[5].done)
+
+        # responses are matched in order
+        self.assertEqual(responses[9].result(), bytes([9] * 8))
+        self.assertEqual(len(client.pending), 0)
+        self.assertEqual([r.result() for r in responses],
+                         [bytes([i] * 8) for i in range(10)])
+
+        blocks = [(i, 4 * i) for i in range(1, 50)]
+        self.assertEqual(client.read_memory_multi(blocks),
+                         [bytes([i] * 4 * i) for i in range(1, 50)])
+        self.assertEqual(server.requests, 59)
+        client.disconnect()
+
+    def testUnixSocket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sigmatcp.sock")
+            server = SlowServer(path)
+            client = SigmaTCPClient(Adau145x(), "localhost",
+                                    unix_socket=path)
+            self.assertEqual(client.read_memory(0x12, 4), bytes([0x12] * 4))
+            self.assertEqual(client.socket.family, socket.AF_UNIX)
+            client.disconnect()
+
+            # only used for the default port on localhost
+            client = SigmaTCPClient(Adau145x(), "localhost",
+                                    port=DEFAULT_PORT + 1, unix_socket=path)
+            self.assertIsNone(client.connect_unix())
+            client = SigmaTCPClient(Adau145x(), "192.168.1.1",
+                                    unix_socket=path)
+            self.assertIsNone(client.connect_unix())
+
+
+if __name__ == "__main__":
+    unittest.main()
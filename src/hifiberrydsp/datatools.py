@@ -91,3 +91,13 @@ def int_data(intval, length=4):
         octets.append((intval >> (i - 1) * 8) & 0xff)
 
     return octets
+
+
+def memory_dump(data, word_length=4):
+    '''
+    Format memory content as one hex encoded word per line
+    '''
+    hexdata = bytes(data).hex().upper()
+    step = word_length * 2
+    end = len(hexdata) - len(hexdata) % step
+    return "".join(hexdata[i:i + step] + "\n" for i in range(0, end, step))
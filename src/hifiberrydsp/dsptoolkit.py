@@ -53,10 +53,9 @@ from hifiberrydsp.parser.xmlprofile import  \
     ATTRIBUTE_MUTE_REG, ATTRIBUTE_TONECONTROL_FILTER_LEFT, \
     ATTRIBUTE_TONECONTROL_FILTER_LEFT, \
     REGISTER_ATTRIBUTES, XmlProfile, ATTRIBUTE_TONECONTROL_FILTER_RIGHT
-from hifiberrydsp.server.constants import COMMAND_PROGMEM, \
-    COMMAND_PROGMEM_RESPONSE, COMMAND_XML, COMMAND_XML_RESPONSE, \
+from hifiberrydsp.server.constants import \
+    COMMAND_XML, COMMAND_XML_RESPONSE, \
     COMMAND_STORE_DATA, COMMAND_RESTORE_DATA, \
-    COMMAND_DATAMEM, COMMAND_DATAMEM_RESPONSE, \
     COMMAND_GPIO, COMMAND_GPIO_RESPONSE, \
     GPIO_READ, GPIO_WRITE, GPIO_RESET, GPIO_SELFBOOT
 #    ZEROCONF_TYPE
@@ -235,16 +234,18 @@ class DSPToolkit():
                           len(coefficients), length)
             return False
 
-        data = []
-        for coeff in coefficients:
-            x = list(self.sigmatcp.get_decimal_repr(coeff))
-            data[0:0] = x
-
-        x = list(self.sigmatcp.get_decimal_repr(0))
-        for _i in range(len(coefficients), length):
-            data[0:0] = x
+        # coefficients are stored in reverse order, unused cells at the
+        # beginning are set to 0
+        try:
+            (data, _saturated) = self.sigmatcp.dsp.decimal_repr_array(
+                list(reversed(coefficients)))
+        except ValueError as e:
+            logging.error("can't deploy coefficients: %s", e)
+            return False
 
-        self.sigmatcp.write_memory(addr, data)
+        padding = bytes((length - len(coefficients)) *
+                        self.sigmatcp.dsp.DECIMAL_LEN)
+        self.sigmatcp.write_memory(addr, padding + data)
 
         return True
 
@@ -285,7 +286,13 @@ class DSPToolkit():
             if mode == MODE_RIGHT or mode == MODE_BOTH:
                 self.sigmatcp.write_biquad(addr_right + 5, highshelf)
 
-    def set_filters(self, filters, mode=MODE_BOTH, cutoff_long=False):
+    def set_filters(self, filters, mode=MODE_BOTH, cutoff_long=False,
+                    safeload=True):
+        '''
+        Deploy biquad filters to the IIR filter banks. With safeload, each
+        biquad is updated atomically while the DSP is running, otherwise
+        the DSP is hibernated while the filters are written.
+        '''
 
         (addr_left, length_left) = datatools.parse_int_length(
             self.sigmatcp.request_metadata(ATTRIBUTE_IIR_FILTER_LEFT))
@@ -316,24 +323,29 @@ class DSPToolkit():
             raise(DSPError("{} filters given, but filter bank has only {:.0f} slots".format(
                 len(filters), maxlen)))
 
-        self.hibernate(True)
+        if not safeload:
+            self.hibernate(True)
 
         logging.debug("deploying filters %s", filters)
 
+        # all filters are sent in a single request
+        batch = self.sigmatcp.batch()
         i = 0
         for f in filters:
             logging.debug(f)
             if mode == MODE_LEFT or mode == MODE_BOTH:
                 if i < length_left:
-                    self.sigmatcp.write_biquad(addr_left + i * 5, f)
+                    batch.write_biquad(addr_left + i * 5, f, safeload)
             if mode == MODE_RIGHT or mode == MODE_BOTH:
                 if i < length_right:
-                    self.sigmatcp.write_biquad(addr_right + i * 5, f)
+                    batch.write_biquad(addr_right + i * 5, f, safeload)
             i += 1
             if i >= maxlen:
                 break
+        batch.execute()
 
-        self.hibernate(False)
+        if not safeload:
+            self.hibernate(False)
 
     def clear_iir_filters(self, mode=MODE_BOTH):
         # Simply fill filter arrays with dummy filters
@@ -427,6 +439,7 @@ class CommandLine():
             "write-mem": self.cmd_write_mem,
             "get-xml": self.cmd_get_xml,
             "get-prog": self.cmd_get_prog,
+            "get-data": self.cmd_get_data,
             "get-meta": self.cmd_get_meta,
             "mute": self.cmd_mute,
             "unmute": self.cmd_unmute,
@@ -451,6 +464,10 @@ commands and parameters to get you started:
 
     get-meta dsp_detected           report the dsp chip identified by sigmatcpserver
 
+    get-prog|get-data [<addr> [<words>]]
+                                    dumps program or data memory, one word per line
+                                    optionally only <words> memory cells starting at <addr>
+
     install-profile <profile.xml>   writes a DSP profile to the DSP EEPROM and activates it
                                     the file should not be deleted after installing as this programm relies
                                     on the metadata.
@@ -622,27 +639,37 @@ for more documentation visit https://github.com/hifiberry/hifiberry-dsp/blob/mas
             print("Can't parse address {}".format(self.args.parameters))
             sys.exit(1)
 
-        while True:
-            if display == DISPLAY_FLOAT:
-                val = self.dsptk.sigmatcp.read_decimal(addr)
-                print("{:.8f}".format(val))
-            elif display == DISPLAY_INT:
-                val = 0
-                for i in self.dsptk.sigmatcp.read_data(addr, length):
-                    val *= 256
-                    val += i
-                print(val)
-            elif display == DISPLAY_HEX:
-                val = self.dsptk.sigmatcp.read_data(addr, length)
-                print(''.join(["%02X " % x for x in val]))
-
-            if not loop:
-                break
+        if display == DISPLAY_FLOAT or length is None:
+            length = self.dsptk.dsp.DECIMAL_LEN
 
+        if not loop:
+            self.print_value(self.dsptk.sigmatcp.read_data(addr, length),
+                             display)
+            return
+
+        # the server polls the value and only sends changes
+        sigmatcp = self.dsptk.sigmatcp
+        (_sid, values) = sigmatcp.subscribe([(addr, length)],
+                                            float(self.args.delay) / 1000)
+        self.print_value(values[addr], display)
+        while True:
             try:
-                time.sleep(float(self.args.delay) / 1000)
+                notification = sigmatcp.receive_notification()
             except KeyboardInterrupt:
                 break
+            (_sid, values) = notification
+            if addr in values:
+                self.print_value(values[addr], display)
+
+    def print_value(self, data, display):
+        if display == DISPLAY_FLOAT:
+            val = self.dsptk.dsp.decimal_val(int.from_bytes(data,
+                                                            byteorder="big"))
+            print("{:.8f}".format(val))
+        elif display == DISPLAY_INT:
+            print(int.from_bytes(data, byteorder="big"))
+        elif display == DISPLAY_HEX:
+            print(''.join(["%02X " % x for x in data]))
 
     def cmd_loop_read_dec(self):
         self.cmd_read(DISPLAY_FLOAT, True)
@@ -807,14 +834,30 @@ for more documentation visit https://github.com/hifiberry/hifiberry-dsp/blob/mas
         print(xml.decode("utf-8", errors="replace"))
 
     def cmd_get_prog(self):
-        mem = self.dsptk.generic_request(COMMAND_PROGMEM,
-                                         COMMAND_PROGMEM_RESPONSE)
-        print(mem.decode("utf-8", errors="replace"))
+        (start, length) = self.memory_range()
+        mem = self.dsptk.sigmatcp.get_program_memory(start, length)
+        print(datatools.memory_dump(mem), end="")
 
-    def cmd_get_Data(self):
-        mem = self.dsptk.generic_request(COMMAND_DATAMEM,
-                                         COMMAND_DATAMEM_RESPONSE)
-        print(mem.decode("utf-8", errors="replace"))
+    def cmd_get_data(self):
+        (start, length) = self.memory_range()
+        mem = self.dsptk.sigmatcp.get_data_memory(start, length)
+        print(datatools.memory_dump(mem), end="")
+
+    def memory_range(self):
+        if len(self.args.parameters) == 0:
+            return (0, 0)
+
+        try:
+            start = parse_int(self.args.parameters[0])
+            if len(self.args.parameters) > 1:
+                length = parse_int(self.args.parameters[1])
+            else:
+                length = 1
+        except (ValueError, TypeError):
+            print("Can't parse memory range {}".format(self.args.parameters))
+            sys.exit(1)
+
+        return (start, length)
 
     def cmd_get_meta(self):
         if len(self.args.parameters) > 0:
@@ -1070,20 +1113,23 @@ for more documentation visit https://github.com/hifiberry/hifiberry-dsp/blob/mas
             print("no storable attributes found in XML, using default set")
             attributes = REGISTER_ATTRIBUTES
 
+        # read all attributes with a single request
+        batch = self.dsptk.sigmatcp.batch()
+        cells = []
         for attribute in attributes:
             (addr, length) = xmlprofile.get_addr_length(attribute)
             if addr is None:
                 continue
 
-            while length > 0:
-                data = self.dsptk.sigmatcp.read_data(addr,
-                                                     self.dsptk.dsp.WORD_LENGTH)
-                replace[addr] = data
-                addr += 1
-                length -= 1
-
+            batch.read(addr, length * self.dsptk.dsp.WORD_LENGTH)
+            cells.append((addr, length))
             print("storing {}".format(attribute))
 
+        word_length = self.dsptk.dsp.WORD_LENGTH
+        for ((addr, length), data) in zip(cells, batch.execute()):
+            for i in range(length):
+                replace[addr + i] = data[i * word_length:(i + 1) * word_length]
+
         xmlprofile.replace_eeprom_cells(replace)
         xmlprofile.replace_ram_cells(replace)
         self.write_back_xml(xmlprofile)
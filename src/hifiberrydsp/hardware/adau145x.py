@@ -24,8 +24,19 @@ import math
 import logging
 import time
 import hashlib
+import threading
+import struct
+from contextlib import contextmanager
 
-from hifiberrydsp.hardware.spi import SpiHandler
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from hifiberrydsp.hardware.spi import SpiHandler, \
+    PRIORITY_INTERACTIVE, PRIORITY_BULK, BULK_BLOCK_SIZE
+from hifiberrydsp.hardware.programhash import ProgramHasher, \
+    ProgramSnapshot, ProgramIdentity
 
 # ADAU1701 address range
 LSB_SIGMA = float(1) / math.pow(2, 23)
@@ -34,6 +45,9 @@ LSB_SIGMA = float(1) / math.pow(2, 23)
 class Adau145x():
 
     DECIMAL_LEN = 4
+    # Range of 8.24 fixed point values
+    DECIMAL_MIN = -128
+    DECIMAL_MAX = 128 - 1.0 / (1 << 24)
     GPIO_LEN = 2
 
     WORD_LENGTH = 4
@@ -66,6 +80,22 @@ class Adau145x():
     PROGRAM_MAX_LEN_UPPER = 0xf465
     PROGRAM_MAX_LEN_LOWER = 0xf466 
 
+    CORE_STATUS_REGISTER = 0xf405
+    CORE_RUNNING = 1
+
+    # Safeload registers in DM1. Up to 5 words are copied to the target
+    # address at the start of the next audio frame, writing the number of 
+    # words triggers the safeload. The address register contains the 
+    # target address minus one.
+    SAFELOAD_DATA = 0x6000
+    SAFELOAD_ADDRESS = 0x6005
+    SAFELOAD_NUM_LOWER = 0x6006     # target in DM0
+    SAFELOAD_NUM_UPPER = 0x6007     # target in DM1
+    SAFELOAD_WORDS = 5
+    SAFELOAD_DM1 = 0x6000
+    # Minimum distance between two safeloads in audio frames
+    SAFELOAD_FRAMES = 2
+
     # PLL Control Registers
     PLL_CTRL0 = 0xf000          # PLL feedback divider
     PLL_CTRL1 = 0xf001          # PLL prescale divider
@@ -91,17 +121,35 @@ class Adau145x():
         "REG": 0xf000,
     }
     
-    # Cache for program checksums - structure: {mode: {algorithm: digest}}
-    _checksum_cache = {
-        "signature": {"md5": None, "sha1": None},
-        "length": {"md5": None, "sha1": None}
-    }
-    
-    # Cache for program memory to avoid multiple reads
-    _memory_cache = {
-        "signature": None,
-        "length": None
-    }
+    # Program memory and checksums of the running program, created on 
+    # first use, see program_identity()
+    _identity = None
+    _identity_lock = threading.Lock()
+
+    # Held while a memory dump runs with a stopped core, so that concurrent
+    # dumps can't restart the core while another one is still reading
+    _core_lock = threading.RLock()
+
+    # Per-thread state of write batches, see batch()
+    _batch_state = threading.local()
+
+    # Write-through shadow copy of DM0/DM1, see enable_shadow()
+    SHADOW_ADDR = 0x0000
+    SHADOW_LENGTH = 0xc000
+    _shadow = None
+    _shadow_valid = False
+    _shadow_volatile = set()
+    _shadow_lock = threading.RLock()
+    _shadow_stats = {"hits": 0, "misses": 0}
+
+    # Timing of the last EEPROM write, see write_eeprom_content()
+    eeprom_timing = None
+
+    # Time between two safeloads and time of the last safeload, only used
+    # by the SPI scheduler thread
+    _safeload_interval = None
+    _last_safeload = 0
+    _safeload_stats = {"commits": 0, "direct": 0}
 
     @staticmethod
     def decimal_repr(f):
@@ -140,6 +188,84 @@ class Adau145x():
             f = -256 + f
         return f
 
+    @staticmethod
+    def decimal_repr_array(values, saturate=False):
+        '''
+        Converts a sequence of floats to big-endian 8.24 fixed point
+        values. Uses numpy if available.
+
+        Args:
+            values: sequence or numpy array of floats
+            saturate: clip values that are out of range instead of raising
+                a ValueError
+
+        Returns:
+            (bytes, list) tuple: the fixed point data (4 bytes per value)
+            and the indices of values that have been saturated
+        '''
+        scale = 1 << 24
+        min_value = int(Adau145x.DECIMAL_MIN * scale)
+        max_value = int(Adau145x.DECIMAL_MAX * scale)
+
+        if numpy is not None:
+            values = numpy.asarray(values, dtype=numpy.float64)
+            if not numpy.isfinite(values).all():
+                raise ValueError("values must be finite")
+            fixed = numpy.floor(values * scale)
+            saturated = numpy.flatnonzero((fixed < min_value) |
+                                          (fixed > max_value)).tolist()
+            if saturated:
+                fixed = numpy.clip(fixed, min_value, max_value)
+        else:
+            if not all(math.isfinite(f) for f in values):
+                raise ValueError("values must be finite")
+            fixed = [math.floor(f * scale) for f in values]
+            saturated = [i for i, f in enumerate(fixed)
+                         if f < min_value or f > max_value]
+            if saturated:
+                fixed = [min(max(f, min_value), max_value) for f in fixed]
+
+        if saturated:
+            if not saturate:
+                raise ValueError("{} values not in range [{},{}], first "
+                                 "at index {}".format(len(saturated),
+                                                      Adau145x.DECIMAL_MIN,
+                                                      Adau145x.DECIMAL_MAX,
+                                                      saturated[0]))
+            logging.warning("saturated %s values to [%s,%s]",
+                            len(saturated), Adau145x.DECIMAL_MIN,
+                            Adau145x.DECIMAL_MAX)
+
+        if numpy is not None:
+            data = fixed.astype(">i4").tobytes()
+        else:
+            data = struct.pack(">{}i".format(len(fixed)), *fixed)
+
+        return (data, saturated)
+
+    @staticmethod
+    def decimal_val_array(data):
+        '''
+        Converts big-endian 8.24 fixed point data to floats
+
+        Args:
+            data: bytes, length must be a multiple of 4
+
+        Returns:
+            numpy array of floats if numpy is available, a list otherwise
+        '''
+        if len(data) % Adau145x.DECIMAL_LEN != 0:
+            raise ValueError("data length {} is not a multiple of {}".format(
+                len(data), Adau145x.DECIMAL_LEN))
+
+        scale = float(1 << 24)
+        if numpy is not None:
+            return numpy.frombuffer(bytes(data), dtype=">i4") / scale
+
+        count = len(data) // Adau145x.DECIMAL_LEN
+        return [v / scale for v in struct.unpack(">{}i".format(count),
+                                                 bytes(data))]
+
     @staticmethod
     def cell_len(addr):
         '''
@@ -221,6 +347,10 @@ class Adau145x():
         Kill the DSP core (stop processing)
         '''
         logging.debug("killing DSP core")
+        SpiHandler.submit(Adau145x._kill_dsp)
+
+    @staticmethod
+    def _kill_dsp():
         spi = SpiHandler()
         
         spi.write(Adau145x.HIBERNATE_REGISTER, 
@@ -238,6 +368,10 @@ class Adau145x():
         Start the DSP core (begin processing)
         '''
         logging.debug("starting DSP core")
+        SpiHandler.submit(Adau145x._start_dsp)
+
+    @staticmethod
+    def _start_dsp():
         spi = SpiHandler()
 
         spi.write(Adau145x.KILLCORE_REGISTER, 
@@ -253,32 +387,64 @@ class Adau145x():
                   Adau145x.int_data(0, Adau145x.REGISTER_WORD_LENGTH))
     
     @staticmethod
-    def read_memory(addr, length):
+    def read_memory(addr, length, priority=PRIORITY_INTERACTIVE):
         '''
         Read memory from the DSP
         
         Args:
             addr: Start address
             length: Number of bytes to read
+            priority: SPI scheduler priority class
             
         Returns:
             bytearray: Memory data
         '''
+        if getattr(Adau145x._batch_state, "pending", None):
+            # make sure queued writes are visible
+            Adau145x.flush_batch()
+
+        if Adau145x._shadow is not None:
+            data = Adau145x.read_shadow(addr, length)
+            if data is not None:
+                return data
+
         spi = SpiHandler()
-        return spi.read(addr, length)
+        return spi.read(addr, length, priority=priority)
         
     @staticmethod
-    def write_memory(addr, data):
+    def write_memory(addr, data, priority=PRIORITY_INTERACTIVE):
         '''
         Write memory to the DSP
+
+        Inside a batch() block, writes to data/program memory are queued
+        and written when the outermost batch ends.
         
         Args:
             addr: Start address
             data: Data bytes to write
+            priority: SPI scheduler priority class
             
         Returns:
             int: Result code (0 = success)
         '''
+        pending = getattr(Adau145x._batch_state, "pending", None)
+        if pending is not None:
+            if addr < Adau145x.MIN_REGISTER and \
+                    len(data) % Adau145x.WORD_LENGTH == 0:
+                for i in range(0, len(data), Adau145x.WORD_LENGTH):
+                    pending[addr + i // Adau145x.WORD_LENGTH] = \
+                        bytes(data[i:i + Adau145x.WORD_LENGTH])
+                Adau145x._batch_state.queued += 1
+                return data
+            # Registers might trigger actions in the DSP, keep the order
+            # of earlier memory writes and the register write
+            Adau145x.flush_batch()
+
+        return Adau145x._write_memory(addr, data, priority)
+
+    @staticmethod
+    def _write_memory(addr, data, priority=PRIORITY_INTERACTIVE,
+                      update_shadow=True):
         # Debug logging for memory writes if enabled
         # Check if debug mode is enabled in SigmaTCPHandler
         try:
@@ -297,40 +463,369 @@ class Adau145x():
             pass
         
         spi = SpiHandler()
-        return spi.write(addr, data)
-    
+        result = spi.write(addr, data, priority=priority)
+
+        if update_shadow and Adau145x._shadow is not None:
+            Adau145x.update_shadow(addr, data)
+
+        return result
+
+    @staticmethod
+    def enable_shadow(enabled=True):
+        '''
+        Enable or disable the shadow copy of data memory. When enabled,
+        reads from DM0/DM1 are served from the shadow copy once it has 
+        been loaded with load_shadow(), except for cells marked as volatile.
+        All writes are written through to the shadow copy.
+        '''
+        with Adau145x._shadow_lock:
+            if enabled:
+                if Adau145x._shadow is None:
+                    Adau145x._shadow = bytearray(Adau145x.SHADOW_LENGTH * 
+                                                 Adau145x.WORD_LENGTH)
+                    Adau145x._shadow_valid = False
+            else:
+                Adau145x._shadow = None
+                Adau145x._shadow_valid = False
+
+    @staticmethod
+    def shadow_enabled():
+        return Adau145x._shadow is not None
+
+    @staticmethod
+    def load_shadow(volatile_cells=None):
+        '''
+        Load the shadow copy from the DSP. Call this on startup and after 
+        the DSP program has been changed. 
+
+        Args:
+            volatile_cells: iterable of cell addresses that are modified by 
+                the DSP program itself (e.g. level meters). Reads of these 
+                cells always go to the DSP.
+        '''
+        if Adau145x._shadow is None:
+            return False
+
+        # Writes from other threads wait for the lock before updating the
+        # shadow, therefore no write can be overwritten by older data
+        with Adau145x._shadow_lock:
+            Adau145x._shadow_valid = False
+            if volatile_cells is not None:
+                Adau145x._shadow_volatile = set(volatile_cells)
+            # the safeload registers are changed by the DSP as well
+            Adau145x._shadow_volatile.update(
+                range(Adau145x.SAFELOAD_DATA, Adau145x.SAFELOAD_NUM_UPPER + 1))
+            memory = Adau145x.get_memory_block(Adau145x.SHADOW_ADDR,
+                                               Adau145x.SHADOW_LENGTH,
+                                               halt=False)
+            if memory is None or len(memory) != len(Adau145x._shadow):
+                logging.error("could not load shadow copy of data memory")
+                return False
+            Adau145x._shadow[:] = memory
+            Adau145x._shadow_valid = True
+
+        logging.info("loaded shadow copy of data memory, %s volatile cells",
+                     len(Adau145x._shadow_volatile))
+        return True
+
+    @staticmethod
+    def invalidate_shadow():
+        '''
+        Stop serving reads from the shadow copy until it is loaded again
+        '''
+        with Adau145x._shadow_lock:
+            Adau145x._shadow_valid = False
+
+    @staticmethod
+    def read_shadow(addr, length):
+        '''
+        Read from the shadow copy
+
+        Returns:
+            bytearray or None if the data isn't available in the shadow copy
+        '''
+        cells = length // Adau145x.WORD_LENGTH
+        with Adau145x._shadow_lock:
+            if not Adau145x._shadow_valid or \
+                    length % Adau145x.WORD_LENGTH != 0 or \
+                    addr < Adau145x.SHADOW_ADDR or \
+                    addr + cells > Adau145x.SHADOW_ADDR + Adau145x.SHADOW_LENGTH or \
+                    not Adau145x._shadow_volatile.isdisjoint(range(addr, addr + cells)):
+                Adau145x._shadow_stats["misses"] += 1
+                return None
+
+            start = (addr - Adau145x.SHADOW_ADDR) * Adau145x.WORD_LENGTH
+            Adau145x._shadow_stats["hits"] += 1
+            return bytearray(Adau145x._shadow[start:start + length])
+
+    @staticmethod
+    def update_shadow(addr, data):
+        if addr < Adau145x.SHADOW_ADDR or \
+                addr >= Adau145x.SHADOW_ADDR + Adau145x.SHADOW_LENGTH:
+            return
+
+        start = (addr - Adau145x.SHADOW_ADDR) * Adau145x.WORD_LENGTH
+        with Adau145x._shadow_lock:
+            if Adau145x._shadow is None:
+                return
+            end = min(start + len(data), len(Adau145x._shadow))
+            Adau145x._shadow[start:end] = bytes(data[0:end - start])
+
+    @staticmethod
+    def shadow_stats():
+        '''
+        Returns:
+            dict with the state of the shadow copy and hit/miss counters
+        '''
+        with Adau145x._shadow_lock:
+            return {
+                "enabled": Adau145x._shadow is not None,
+                "valid": Adau145x._shadow_valid,
+                "volatile_cells": len(Adau145x._shadow_volatile),
+                "hits": Adau145x._shadow_stats["hits"],
+                "misses": Adau145x._shadow_stats["misses"],
+            }
+
     @staticmethod
-    def get_memory_block(addr, length):
+    @contextmanager
+    def batch(safeload=False):
+        '''
+        Coalesce memory writes. All writes to data/program memory inside
+        the block are collected, sorted by address and written as few
+        contiguous SPI bursts as possible when the block ends. Writing the 
+        same cell multiple times only writes the last value.
+
+        With safeload=True, data memory is updated through the safeload
+        registers, see safeload_bursts().
+
+        Batches can be nested, only the outermost batch writes to the DSP.
+        The batch uses safeload if any of the nested batches requested it.
+
+        Usage:
+            with Adau145x.batch(safeload=True):
+                Adau145x.write_biquad(addr1, bq1)
+                Adau145x.write_biquad(addr2, bq2)
+        '''
+        state = Adau145x._batch_state
+        if getattr(state, "pending", None) is not None:
+            state.depth += 1
+            state.safeload = state.safeload or safeload
+            try:
+                yield
+            finally:
+                state.depth -= 1
+            return
+
+        state.pending = {}
+        state.queued = 0
+        state.depth = 1
+        state.safeload = safeload
+        try:
+            yield
+        finally:
+            try:
+                Adau145x.flush_batch()
+            finally:
+                state.pending = None
+
+    @staticmethod
+    def flush_batch():
+        '''
+        Write all memory writes queued by the current thread's batch
+        '''
+        state = Adau145x._batch_state
+        pending = getattr(state, "pending", None)
+        if not pending:
+            return
+
+        bursts = Adau145x.coalesce_cells(pending)
+        logging.debug("batch: %s writes, %s cells coalesced to %s bursts",
+                      state.queued, len(pending), len(bursts))
+        state.pending = {}
+        state.queued = 0
+
+        # One scheduler job, bursts are not interleaved with other writes
+        if state.safeload:
+            if Adau145x._safeload_interval is None:
+                Adau145x._safeload_interval = Adau145x.safeload_interval()
+            SpiHandler.submit(Adau145x.safeload_bursts, bursts)
+        else:
+            SpiHandler.submit(Adau145x._write_bursts, bursts)
+
+        # Not done in the scheduler thread, it must never wait for the 
+        # shadow lock
+        if Adau145x._shadow is not None:
+            for (addr, data) in bursts:
+                Adau145x.update_shadow(addr, data)
+
+    @staticmethod
+    def _write_bursts(bursts):
+        for (addr, data) in bursts:
+            Adau145x._write_memory(addr, data, update_shadow=False)
+
+    @staticmethod
+    def safeload_write(addr, data):
+        '''
+        Write data memory through the safeload registers. Each group of up
+        to 5 words is updated atomically at an audio frame boundary, this
+        allows changing filters while audio is playing without clicks.
+
+        Args:
+            addr: Start address
+            data: Data bytes to write
+        '''
+        with Adau145x.batch(safeload=True):
+            return Adau145x.write_memory(addr, data)
+
+    @staticmethod
+    def safeload_bursts(bursts):
+        '''
+        Write bursts as a sequence of safeload commits of up to 5 words.
+        Needs to run in the SPI scheduler thread, the safeload registers
+        must not be used by anything else while a sequence is written.
+
+        If the core isn't running, no safeload would be executed and the
+        data is written directly.
+        '''
+        spi = SpiHandler()
+        status = int.from_bytes(spi.read(Adau145x.CORE_STATUS_REGISTER,
+                                         Adau145x.REGISTER_WORD_LENGTH),
+                                byteorder='big')
+        if status != Adau145x.CORE_RUNNING:
+            logging.debug("core not running, writing safeload data directly")
+            Adau145x._safeload_stats["direct"] += len(bursts)
+            Adau145x._write_bursts(bursts)
+            return
+
+        block = Adau145x.SAFELOAD_WORDS * Adau145x.WORD_LENGTH
+        for (addr, data) in bursts:
+            if not Adau145x.safeload_possible(addr, len(data)):
+                Adau145x._safeload_stats["direct"] += 1
+                Adau145x._write_memory(addr, data, update_shadow=False)
+                continue
+            for offset in range(0, len(data), block):
+                Adau145x._safeload_commit(
+                    addr + offset // Adau145x.WORD_LENGTH,
+                    data[offset:offset + block])
+
+    @staticmethod
+    def safeload_possible(addr, length):
+        '''
+        Only data memory outside of the safeload registers can be written
+        with safeload. Address 0 can't be used as its target address 
+        minus one isn't valid.
+        '''
+        end = addr + length // Adau145x.WORD_LENGTH
+        return length % Adau145x.WORD_LENGTH == 0 and addr > 0 and \
+            end <= Adau145x.PROGRAM_ADDR and \
+            (end <= Adau145x.SAFELOAD_DATA or
+             addr > Adau145x.SAFELOAD_NUM_UPPER)
+
+    @staticmethod
+    def _safeload_commit(addr, data):
+        words = len(data) // Adau145x.WORD_LENGTH
+        message = bytearray(Adau145x.SAFELOAD_WORDS * Adau145x.WORD_LENGTH)
+        message[0:len(data)] = data
+        message += Adau145x.int_data(addr - 1, Adau145x.WORD_LENGTH)
+        if addr < Adau145x.SAFELOAD_DM1:
+            message += Adau145x.int_data(words, Adau145x.WORD_LENGTH)
+
+        # The previous safeload has to be executed before the safeload
+        # registers can be written again
+        wait = Adau145x._last_safeload + Adau145x._safeload_interval - \
+            time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        spi = SpiHandler()
+        spi.write(Adau145x.SAFELOAD_DATA, message)
+        if addr >= Adau145x.SAFELOAD_DM1:
+            spi.write(Adau145x.SAFELOAD_NUM_UPPER,
+                      Adau145x.int_data(words, Adau145x.WORD_LENGTH))
+
+        Adau145x._last_safeload = time.monotonic()
+        Adau145x._safeload_stats["commits"] += 1
+
+    @staticmethod
+    def safeload_interval():
+        '''
+        Returns:
+            float: minimum time between two safeloads in seconds
+        '''
+        samplerate = Adau145x.guess_samplerate() or 48000
+        return Adau145x.SAFELOAD_FRAMES / samplerate
+
+    @staticmethod
+    def safeload_stats():
+        return dict(Adau145x._safeload_stats)
+
+    @staticmethod
+    def coalesce_cells(cells):
+        '''
+        Merge single cell writes to contiguous bursts
+
+        Args:
+            cells: dict of cell address -> 4 bytes cell value
+
+        Returns:
+            list of (start address, bytearray) tuples sorted by address
+        '''
+        bursts = []
+        start = None
+        data = None
+        next_addr = None
+        for addr in sorted(cells):
+            if addr != next_addr:
+                if data is not None:
+                    bursts.append((start, data))
+                start = addr
+                data = bytearray()
+            data += cells[addr]
+            next_addr = addr + 1
+
+        if data is not None:
+            bursts.append((start, data))
+        return bursts
+
+    @staticmethod
+    def get_memory_block(addr, length, halt=True):
         '''
         Read a block of memory from the DSP
         
         Args:
             addr: Start address
             length: Length in words
+            halt: Stop the core while reading. This is required for 
+                program memory, but not for data memory
             
         Returns:
             bytearray: Memory content
         '''
-        block_size = 2048
+        block_size = BULK_BLOCK_SIZE
         spi = SpiHandler()
 
         logging.debug("reading %s bytes from memory", 
                       length * Adau145x.WORD_LENGTH)
 
-        # Must kill the core to read program memory, but it doesn't
-        # hurt doing it also for other memory types
-        Adau145x.kill_dsp()
+        with Adau145x._core_lock:
+            # Must kill the core to read program memory, but it doesn't
+            # hurt doing it also for other memory types
+            if halt:
+                Adau145x.kill_dsp()
 
-        memory = bytearray()
+            memory = bytearray()
 
-        while len(memory) < length * Adau145x.WORD_LENGTH:
-            logging.debug("reading memory code block from addr %s", addr)
-            data = spi.read(addr, block_size)
-            memory += data
-            addr = addr + int(block_size / Adau145x.WORD_LENGTH)
+            # Each block is a separate bulk job, interactive requests
+            # can be served between two blocks
+            while len(memory) < length * Adau145x.WORD_LENGTH:
+                logging.debug("reading memory code block from addr %s", addr)
+                data = spi.read(addr, block_size, priority=PRIORITY_BULK)
+                memory += data
+                addr = addr + int(block_size / Adau145x.WORD_LENGTH)
 
-        # Restart the core
-        Adau145x.start_dsp()
+            # Restart the core
+            if halt:
+                Adau145x.start_dsp()
 
         return memory[0:length * Adau145x.WORD_LENGTH]
 
@@ -385,74 +880,78 @@ class Adau145x():
         if end not in ["signature", "full", "len"]:
             raise ValueError(f"Invalid end mode '{end}'. Must be 'signature', 'full', or 'len'")
         
-        Adau145x.kill_dsp()
-        time.sleep(0.0001)
-        
-        try:
-            if end == "full":
-                # Dump full program memory space
-                memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
-                                                  Adau145x.PROGRAM_LENGTH)
-                logging.debug("Read full program memory from address %s to %s (%s bytes)", 
-                             Adau145x.PROGRAM_ADDR, 
-                             Adau145x.PROGRAM_ADDR + Adau145x.PROGRAM_LENGTH * Adau145x.WORD_LENGTH,
-                             len(memory))
-                return memory
+        with Adau145x._core_lock:
+            try:
+                Adau145x.kill_dsp()
+                time.sleep(0.0001)
                 
-            elif end == "len":
-                # Use program length registers to determine end
-                program_len = Adau145x.get_program_len()
-                if program_len is None:
-                    logging.error("Failed to read program length for memory dump")
-                    return None
+                if end == "full":
+                    # Dump full program memory space
+                    memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
+                                                      Adau145x.PROGRAM_LENGTH,
+                                                      halt=False)
+                    logging.debug("Read full program memory from address %s to %s (%s bytes)", 
+                                 Adau145x.PROGRAM_ADDR, 
+                                 Adau145x.PROGRAM_ADDR + Adau145x.PROGRAM_LENGTH * Adau145x.WORD_LENGTH,
+                                 len(memory))
+                    return memory
+                
+                elif end == "len":
+                    # Use program length registers to determine end
+                    program_len = Adau145x.get_program_len()
+                    if program_len is None:
+                        logging.error("Failed to read program length for memory dump")
+                        return None
                     
-                # Convert from words to bytes
-                program_len_bytes = program_len * Adau145x.WORD_LENGTH
+                    # Convert from words to bytes
+                    program_len_bytes = program_len * Adau145x.WORD_LENGTH
                 
-                # Read only the used program memory
-                memory_length_words = min(program_len, Adau145x.PROGRAM_LENGTH)
-                memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
-                                                  memory_length_words)
+                    # Read only the used program memory
+                    memory_length_words = min(program_len, Adau145x.PROGRAM_LENGTH)
+                    memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
+                                                      memory_length_words,
+                                                      halt=False)
                 
-                logging.debug("Read program memory using length registers: %s words (%s bytes)",
-                             program_len, program_len_bytes)
-                return memory[0:program_len_bytes]
+                    logging.debug("Read program memory using length registers: %s words (%s bytes)",
+                                 program_len, program_len_bytes)
+                    return memory[0:program_len_bytes]
                 
-            else:  # end == "signature" (default)
-                # Original behavior: find program end signature
-                memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
-                                                  Adau145x.PROGRAM_LENGTH)
-                logging.debug("Read program from address %s to %s", 
-                             Adau145x.PROGRAM_ADDR, 
-                             Adau145x.PROGRAM_ADDR + Adau145x.PROGRAM_LENGTH * Adau145x.WORD_LENGTH)
-
-                end_index = memory.find(Adau145x.PROGRAM_END_SIGNATURE)
-                logging.debug("Program end signature found at %s", end_index)
-
-                if end_index < 0:
-                    memsum = 0
-                    for i in memory:
-                        memsum = memsum + i
-
-                    if (memsum > 0):
-                        logging.error("couldn't find program end signature," +
-                                      " using full program memory")
-                        end_index = len(memory) - Adau145x.WORD_LENGTH
+                else:  # end == "signature" (default)
+                    # Original behavior: find program end signature
+                    memory = Adau145x.get_memory_block(Adau145x.PROGRAM_ADDR,
+                                                      Adau145x.PROGRAM_LENGTH,
+                                                      halt=False)
+                    logging.debug("Read program from address %s to %s", 
+                                 Adau145x.PROGRAM_ADDR, 
+                                 Adau145x.PROGRAM_ADDR + Adau145x.PROGRAM_LENGTH * Adau145x.WORD_LENGTH)
+
+                    end_index = memory.find(Adau145x.PROGRAM_END_SIGNATURE)
+                    logging.debug("Program end signature found at %s", end_index)
+
+                    if end_index < 0:
+                        memsum = 0
+                        for i in memory:
+                            memsum = memsum + i
+
+                        if (memsum > 0):
+                            logging.error("couldn't find program end signature," +
+                                          " using full program memory")
+                            end_index = len(memory) - Adau145x.WORD_LENGTH
+                        else:
+                            logging.error("SPI returned only zeros - communication "
+                                          "error")
+                            return None
                     else:
-                        logging.error("SPI returned only zeros - communication "
-                                      "error")
-                        return None
-                else:
-                    end_index = end_index + len(Adau145x.PROGRAM_END_SIGNATURE)
+                        end_index = end_index + len(Adau145x.PROGRAM_END_SIGNATURE)
 
-                logging.debug("Program lengths = %s words",
-                              end_index / Adau145x.WORD_LENGTH)
+                    logging.debug("Program lengths = %s words",
+                                  end_index / Adau145x.WORD_LENGTH)
 
-                return memory[0:end_index]
+                    return memory[0:end_index]
                 
-        finally:
-            # Always restart the DSP core
-            Adau145x.start_dsp()
+            finally:
+                # Always restart the DSP core
+                Adau145x.start_dsp()
     
     @staticmethod
     def get_data_memory():
@@ -473,11 +972,11 @@ class Adau145x():
     def get_program_memory_subset(mode="signature", cached=True):
         '''
         Get a subset of program memory based on either signature or length detection
-        with efficient caching to avoid multiple memory reads
+        from the program snapshot
         
         Args:
             mode (str): Detection mode - "signature" or "length"
-            cached (bool): Whether to use cached memory if available
+            cached (bool): Whether to use the current snapshot if available
             
         Returns:
             bytearray: Program memory subset or None if failed
@@ -485,26 +984,10 @@ class Adau145x():
         if mode not in ["signature", "length"]:
             raise ValueError(f"Invalid mode '{mode}'. Must be 'signature' or 'length'")
         
-        # Check cache first
-        if cached and Adau145x._memory_cache[mode] is not None:
-            logging.debug(f"Using cached program memory ({mode} mode)")
-            return Adau145x._memory_cache[mode]
-        
-        logging.debug(f"Reading program memory ({mode} mode)")
-        
-        if mode == "signature":
-            # Use signature-based detection
-            memory = Adau145x.get_program_memory(end="signature")
-        else:  # mode == "length"
-            # Use length-based detection
-            memory = Adau145x.get_program_memory(end="len")
-        
-        # Cache the result
-        if memory is not None:
-            Adau145x._memory_cache[mode] = memory
-            logging.debug(f"Cached program memory ({mode} mode): {len(memory)} bytes")
-        
-        return memory
+        snapshot = Adau145x.get_program_snapshot(refresh=not cached)
+        if snapshot is None:
+            return None
+        return snapshot.program_memory(mode)
     
     @staticmethod
     def calculate_program_checksums(mode="signature", algorithms=None, cached=True):
@@ -531,62 +1014,98 @@ class Adau145x():
             if alg not in valid_algorithms:
                 raise ValueError(f"Invalid algorithm '{alg}'. Must be one of {valid_algorithms}")
         
-        result = {}
-        
-        # Check cache for each requested algorithm
-        all_cached = True
-        for alg in algorithms:
-            if cached and Adau145x._checksum_cache[mode][alg] is not None:
-                result[alg] = Adau145x._checksum_cache[mode][alg]
-                logging.debug(f"Using cached {alg} checksum ({mode} mode)")
-            else:
-                all_cached = False
-        
-        # If all requested checksums are cached, return them
-        if all_cached:
-            return result
-        
-        # Get program memory (cached if possible)
-        program_data = Adau145x.get_program_memory_subset(mode=mode, cached=cached)
-        if program_data is None:
+        snapshot = Adau145x.get_program_snapshot(refresh=not cached)
+        if snapshot is None or mode not in snapshot.checksums:
             logging.error(f"Failed to get program memory for checksum calculation ({mode} mode)")
             return {}
-        
-        # Calculate missing checksums
-        import hashlib
+
+        result = {}
         for alg in algorithms:
-            if alg not in result:  # Only calculate if not cached
-                try:
-                    if alg == "md5":
-                        hasher = hashlib.md5()
-                    elif alg == "sha1":
-                        hasher = hashlib.sha1()
-                    
-                    hasher.update(program_data)
-                    digest_hex = hasher.hexdigest().upper()
-                    
-                    # Cache and store result
-                    Adau145x._checksum_cache[mode][alg] = digest_hex
-                    result[alg] = digest_hex
-                    
-                    logging.debug(f"Calculated {alg} checksum ({mode} mode): {digest_hex}")
-                    
-                except Exception as e:
-                    logging.error(f"Failed to calculate {alg} checksum ({mode} mode): {str(e)}")
+            result[alg] = snapshot.checksum(mode, alg)
         
         return result
+
+    @staticmethod
+    def program_identity():
+        '''
+        Returns:
+            ProgramIdentity: the shared identity of the running program
+        '''
+        if Adau145x._identity is None:
+            with Adau145x._identity_lock:
+                if Adau145x._identity is None:
+                    Adau145x._identity = ProgramIdentity(
+                        Adau145x.take_program_snapshot,
+                        Adau145x.get_program_len)
+        return Adau145x._identity
+
+    @staticmethod
+    def program_generation():
+        '''
+        Returns:
+            int: counter that changes whenever the program might have 
+            changed
+        '''
+        return Adau145x.program_identity().generation
+
+    @staticmethod
+    def get_program_snapshot(refresh=False):
+        '''
+        Get program memory and checksums of both end detection modes. 
+        The snapshot is taken with a single stop of the DSP core and shared
+        by all callers until clear_checksum_cache() is called or the 
+        program length registers change.
+
+        Args:
+            refresh (bool): Take a new snapshot. If another thread takes a 
+                snapshot at the same time, its result is used.
+
+        Returns:
+            ProgramSnapshot or None if program memory couldn't be read
+        '''
+        return Adau145x.program_identity().get_snapshot(refresh=refresh)
+
+    @staticmethod
+    def take_program_snapshot():
+        '''
+        Read program memory in 2 KB blocks while calculating MD5 and SHA-1 
+        checksums for the signature and length mode. Reading stops as soon
+        as the end signature and the program length have been reached. The 
+        core is stopped only once.
+
+        Returns:
+            ProgramSnapshot
+        '''
+        program_len = Adau145x.get_program_len()
+        hasher = ProgramHasher(Adau145x.PROGRAM_END_SIGNATURE, 
+                               program_len,
+                               Adau145x.WORD_LENGTH)
+        spi = SpiHandler()
+        block_words = BULK_BLOCK_SIZE // Adau145x.WORD_LENGTH
+        end = Adau145x.PROGRAM_ADDR + Adau145x.PROGRAM_LENGTH
+        memory = bytearray()
+
+        with Adau145x._core_lock:
+            Adau145x.kill_dsp()
+            try:
+                for addr in range(Adau145x.PROGRAM_ADDR, end, block_words):
+                    data = spi.read(addr, BULK_BLOCK_SIZE, 
+                                    priority=PRIORITY_BULK)
+                    memory += data
+                    if hasher.update(data):
+                        break
+                else:
+                    hasher.finish()
+            finally:
+                Adau145x.start_dsp()
+
+        logging.debug("read %s bytes of program memory", len(memory))
+        return ProgramSnapshot(memory, hasher, program_len)
     
     @staticmethod
     def clear_checksum_cache():
-        '''Clear all cached checksums and memory'''
-        Adau145x._checksum_cache = {
-            "signature": {"md5": None, "sha1": None},
-            "length": {"md5": None, "sha1": None}
-        }
-        Adau145x._memory_cache = {
-            "signature": None,
-            "length": None
-        }
+        '''Clear the program snapshot with all cached checksums and memory'''
+        Adau145x.program_identity().invalidate()
         logging.debug("Cleared all checksum and memory caches")
         
     @staticmethod
@@ -625,36 +1144,44 @@ class Adau145x():
                 return None
     
     @staticmethod
-    def write_biquad(start_addr, bq):
+    def biquad_data(bq):
         '''
-        Write biquad filter coefficients to DSP memory.
+        Convert biquad filter coefficients to the memory layout of the DSP.
         
         Args:
-            start_addr: Starting address for the biquad coefficients
             bq: Biquad filter object with a1, a2, b0, b1, b2 coefficients
+            
+        Returns:
+            bytearray: b2, b1, b0, -a2, -a1 of the normalized filter in 
+            DSP number format, starting at the lowest address
         '''
         # Normalize the biquad coefficients
         bqn = bq.normalized()
         
-        # Create array of parameters in the order they should be written
-        bq_params = []
-        bq_params.append(-bqn.a1)  # Negative a1
-        bq_params.append(-bqn.a2)  # Negative a2
-        bq_params.append(bqn.b0)   # b0
-        bq_params.append(bqn.b1)   # b1
-        bq_params.append(bqn.b2)   # b2
-        
-        # Write params to registers starting from highest address
-        reg = start_addr + 4
-        for i, param in enumerate(bq_params):
-            data = Adau145x.int_data(Adau145x.decimal_repr(param), Adau145x.DECIMAL_LEN)
-            Adau145x.write_memory(reg, data)
-            reg = reg - 1
-        
-        logging.debug(f"Wrote biquad to address {start_addr}: a1={-bqn.a1}, a2={-bqn.a2}, b0={bqn.b0}, b1={bqn.b1}, b2={bqn.b2}")
+        data = bytearray()
+        for param in [bqn.b2, bqn.b1, bqn.b0, -bqn.a2, -bqn.a1]:
+            data += Adau145x.int_data(Adau145x.decimal_repr(param), Adau145x.DECIMAL_LEN)
+        return data
+
+    @staticmethod
+    def write_biquad(start_addr, bq, safeload=False):
+        '''
+        Write biquad filter coefficients to DSP memory.
+        
+        Args:
+            start_addr: Starting address for the biquad coefficients
+            bq: Biquad filter object with a1, a2, b0, b1, b2 coefficients
+            safeload: update all coefficients atomically using safeload
+        '''
+        data = Adau145x.biquad_data(bq)
+        with Adau145x.batch(safeload=safeload):
+            Adau145x.write_memory(start_addr, data)
+        
+        logging.debug(f"Wrote biquad to address {start_addr}: {bq}")
     
     @staticmethod
-    def write_biquad_direct(start_addr, a0, a1, a2, b0, b1, b2):
+    def write_biquad_direct(start_addr, a0, a1, a2, b0, b1, b2,
+                            safeload=False):
         '''
         Write biquad filter coefficients directly to DSP memory without normalization.
         
@@ -666,6 +1193,7 @@ class Adau145x():
             b0: Numerator coefficient 0
             b1: Numerator coefficient 1
             b2: Numerator coefficient 2
+            safeload: update all coefficients atomically using safeload
         '''
         from hifiberrydsp.filtering.biquad import Biquad
 
@@ -673,7 +1201,7 @@ class Adau145x():
         bq = Biquad(a0, a1, a2, b0, b1, b2)
 
         # Use the existing write_biquad method
-        Adau145x.write_biquad(start_addr, bq)
+        Adau145x.write_biquad(start_addr, bq, safeload=safeload)
     
     @staticmethod
     def guess_samplerate():
@@ -702,20 +1230,21 @@ class Adau145x():
             return None
 
     @staticmethod
-    def write_eeprom_content(xmldata):
+    def write_eeprom_content(xmldata, polling=True):
         """
         Write EEPROM content based on XML data.
         
         Args:
             xmldata (str or bytes): XML data containing DSP configuration
+            polling (bool): poll the state of the EEPROM programmer instead
+                of waiting fixed times after each step
             
         Returns:
             bool: True for success, False for failure
         """
         import xmltodict
-        import os
-        import time
         from hifiberrydsp.parser.xmlprofile import get_default_dspprofile_path
+        from hifiberrydsp.hardware.selfboot import SelfbootProgrammer
         
         logging.info("Writing EEPROM content from XML")
         dspprogramfile = get_default_dspprofile_path()
@@ -725,43 +1254,20 @@ class Adau145x():
 
             # Kill DSP and clear checksum cache before updating
             Adau145x.clear_checksum_cache()
+            Adau145x.invalidate_shadow()
             Adau145x.kill_dsp()
-            
-            for action in doc["ROM"]["page"]["action"]:
-                instr = action["@instr"]
-
-                if instr == "writeXbytes":
-                    addr = int(action["@addr"])
-                    paramname = action["@ParamName"]
-                    data = []
-                    for d in action["#text"].split(" "):
-                        value = int(d, 16)
-                        data.append(value)
-
-                    logging.debug("writeXbytes %s %s", addr, len(data))
-                    Adau145x.write_memory(addr, data)
-
-                    # Sleep after erase operations
-                    if ("g_Erase" in paramname):
-                        logging.debug(
-                            "found erase command, waiting 10 seconds to finish")
-                        time.sleep(10)
-
-                    # Delay after Programn, DM0 data, DM1 data, HIBERNATE
-                    if ("Programn" in paramname) or ("DM0" in paramname) or ("DM1" in paramname) or ("HIBERNATE" in paramname):
-                        logging.debug(
-                            "found program write command, waiting 1 seconds to finish")
-                        time.sleep(1)
-
-                    # Delay after a page write
-                    if ("Page_" in paramname):
-                        logging.debug(
-                            "found page write command, waiting 1 second to finish")
-                        time.sleep(1)
-
-                if instr == "delay":
-                    logging.debug("delay")
-                    time.sleep(1)
+
+            programmer = SelfbootProgrammer(polling=polling)
+            timing = programmer.program(doc["ROM"]["page"]["action"],
+                                        Adau145x.write_memory)
+            Adau145x.eeprom_timing = timing
+            logging.info("EEPROM written in %.1fs (%s), %s pages, phases: %s",
+                         timing["total"],
+                         "polling" if timing["polling"] else "fixed delays",
+                         timing["pages"],
+                         ", ".join("{} {:.2f}s".format(phase, duration)
+                                   for phase, duration
+                                   in timing["phases"].items()))
 
             # Restart the DSP core
             Adau145x.start_dsp()
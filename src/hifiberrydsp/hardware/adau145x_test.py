@@ -19,8 +19,27 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
+import threading
 import unittest
 from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.hardware.emulator import Adau145xEmulator
+
+
+class RecordingSpi():
+    '''
+    Records all SPI transfers instead of sending them to a device
+    '''
+
+    def __init__(self):
+        self.transfers = []
+
+    def xfer2(self, data):
+        self.transfers.append(list(data))
+        return list(data)
+
+    def writebytes2(self, data):
+        self.transfers.append(list(data))
 
 class Test(unittest.TestCase):
 
@@ -51,6 +70,153 @@ class Test(unittest.TestCase):
             self.assertEqual(b,Adau145x.decimal_repr(f), "float -> int failed for {}/{}".format(b,f))
             self.assertEqual(f,Adau145x.decimal_val(b), "int -> float failed for {}/{}".format(b,f))
 
+    def testArrayConversion(self):
+        values = [-128, -1, 0, 64, 1, 0.00390625, -0.3, 0.331, 127.5]
+        expected = b"".join(Adau145x.int_data(Adau145x.decimal_repr(f), 4)
+                            for f in values)
+
+        (data, saturated) = Adau145x.decimal_repr_array(values)
+        self.assertEqual(data, expected)
+        self.assertEqual(saturated, [])
+
+        decoded = Adau145x.decimal_val_array(data)
+        for (f, d) in zip(values, decoded):
+            self.assertAlmostEqual(f, d, 6)
+
+        with self.assertRaises(ValueError):
+            Adau145x.decimal_repr_array([1, 200])
+
+        (data, saturated) = Adau145x.decimal_repr_array([1, 200, -300],
+                                                        saturate=True)
+        self.assertEqual(saturated, [1, 2])
+        self.assertEqual(data[4:], b'\x7f\xff\xff\xff\x80\x00\x00\x00')
+
+    def testCoalesceCells(self):
+        cells = {
+            12: b'\x00\x00\x00\x03',
+            10: b'\x00\x00\x00\x01',
+            11: b'\x00\x00\x00\x02',
+            20: b'\x00\x00\x00\x04',
+        }
+        bursts = Adau145x.coalesce_cells(cells)
+        self.assertEqual(bursts, [
+            (10, bytearray(b'\x00\x00\x00\x01\x00\x00\x00\x02\x00\x00\x00\x03')),
+            (20, bytearray(b'\x00\x00\x00\x04'))])
+
+    def testBatch(self):
+        saved_spi = SpiHandler.spi
+        SpiHandler.spi = RecordingSpi()
+        try:
+            with Adau145x.batch():
+                Adau145x.write_memory(0x101, b'\x00\x00\x00\x02')
+                with Adau145x.batch():
+                    Adau145x.write_memory(0x100, b'\x00\x00\x00\x01')
+                Adau145x.write_memory(0x101, b'\x00\x00\x00\x03')
+                self.assertEqual(SpiHandler.spi.transfers, [])
+
+            self.assertEqual(SpiHandler.spi.transfers,
+                             [[0, 0x01, 0x00, 0, 0, 0, 1, 0, 0, 0, 3]])
+        finally:
+            SpiHandler.spi = saved_spi
+
+    def testShadow(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator()
+        SpiHandler.set_backend(emulator)
+        try:
+            emulator.write(0x20, b'\x00\x00\x00\x05')
+            Adau145x.enable_shadow()
+            self.assertTrue(Adau145x.load_shadow(volatile_cells=[0x21]))
+            transactions = emulator.transactions
+
+            self.assertEqual(Adau145x.read_memory(0x20, 4), b'\x00\x00\x00\x05')
+            Adau145x.write_memory(0x20, b'\x00\x00\x00\x06')
+            self.assertEqual(Adau145x.read_memory(0x20, 4), b'\x00\x00\x00\x06')
+            self.assertEqual(emulator.transactions, transactions + 1)
+
+            # volatile cells and registers are always read from the DSP
+            emulator.write(0x21, b'\x00\x00\x00\x07')
+            self.assertEqual(Adau145x.read_memory(0x20, 8),
+                             b'\x00\x00\x00\x06\x00\x00\x00\x07')
+            Adau145x.read_memory(Adau145x.START_PULSE_REGISTER, 2)
+            self.assertEqual(emulator.transactions, transactions + 3)
+
+            stats = Adau145x.shadow_stats()
+            self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        finally:
+            Adau145x.enable_shadow(False)
+            SpiHandler.spi = saved_spi
+
+    def testSafeload(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator(realtime=False)
+        SpiHandler.set_backend(emulator)
+        try:
+            data = bytes(range(1, 33))
+
+            # no safeload possible if the core doesn't run
+            Adau145x.safeload_write(0x100, data)
+            self.assertEqual(emulator.safeloads, 0)
+            self.assertEqual(emulator.read(0x100, 32), data)
+
+            Adau145x.start_dsp()
+            with Adau145x.batch(safeload=True):
+                Adau145x.write_memory(0x200, data[0:20])
+                Adau145x.write_memory(0x205, data[20:32])
+                Adau145x.write_memory(0x6100, data[0:8])
+            # 8 words to DM0 need 2 commits, DM1 uses the upper counter
+            self.assertEqual(emulator.safeloads, 3)
+            self.assertEqual(emulator.read(0x200, 32), data)
+            self.assertEqual(emulator.read(0x6100, 8), data[0:8])
+
+            # the address register contains the target address minus one
+            Adau145x.safeload_write(0x300, data[0:20])
+            self.assertEqual(
+                emulator.read(Adau145x.SAFELOAD_ADDRESS, 4),
+                bytes([0, 0, 0x02, 0xff]))
+            self.assertEqual(emulator.read(0x2ff, 4), bytes(4))
+            self.assertEqual(emulator.read(0x300, 20), data[0:20])
+            self.assertEqual(emulator.read(0x305, 4), bytes(4))
+
+            # address 0 is written directly
+            safeloads = emulator.safeloads
+            Adau145x.safeload_write(0, data[0:4])
+            self.assertEqual(emulator.safeloads, safeloads)
+            self.assertEqual(emulator.read(0, 4), data[0:4])
+        finally:
+            SpiHandler.spi = saved_spi
+
+    def testProgramMemoryError(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator(realtime=False)
+        SpiHandler.set_backend(emulator)
+        write = emulator.write
+
+        def failing_write(addr, data):
+            if addr == Adau145x.HIBERNATE_REGISTER:
+                raise IOError("SPI error")
+            write(addr, data)
+
+        try:
+            emulator.write = failing_write
+            with self.assertRaises(IOError):
+                Adau145x.get_program_memory()
+
+            # the core lock has been released
+            acquired = []
+
+            def acquire():
+                acquired.append(Adau145x._core_lock.acquire(timeout=1))
+                if acquired[0]:
+                    Adau145x._core_lock.release()
+
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+            self.assertEqual(acquired, [True])
+        finally:
+            SpiHandler.spi = saved_spi
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testConversion']
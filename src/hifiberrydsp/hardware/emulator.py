@@ -0,0 +1,373 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import logging
+import time
+
+# Address map (cell addresses)
+MEMORY_END = 0xe000         # DM0 0x0000, DM1 0x6000, PM 0xc000-0xdfff
+PROGRAM_START = 0xc000
+REGISTER_START = 0xf000
+REGISTER_END = 0x10000
+
+# Safeload registers in DM1
+SAFELOAD_DATA = 0x6000
+SAFELOAD_WORDS = 5
+SAFELOAD_ADDRESS = 0x6005
+SAFELOAD_NUM_LOWER = 0x6006
+SAFELOAD_NUM_UPPER = 0x6007
+
+MEMORY_CELL_LENGTH = 4
+REGISTER_CELL_LENGTH = 2
+
+# Registers with side effects
+PLL_CTRL0 = 0xf000
+PLL_ENABLE = 0xf003
+PLL_LOCK = 0xf004
+HIBERNATE = 0xf400
+START_PULSE = 0xf401
+STARTCORE = 0xf402
+KILLCORE = 0xf403
+CORE_STATUS = 0xf405
+PROGRAM_LEN_UPPER = 0xf463
+PROGRAM_LEN_LOWER = 0xf464
+PROGRAM_MAX_LEN_UPPER = 0xf465
+PROGRAM_MAX_LEN_LOWER = 0xf466
+SOFT_RESET = 0xf890
+
+# Values of the CORE_STATUS register
+CORE_STOPPED = 0
+CORE_RUNNING = 1
+CORE_HIBERNATE = 3
+CORE_HALTED = 4
+
+PROGRAM_END_SIGNATURE = b'\x02\xC2\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+PROGRAM_MAX_LENGTH = 0x2000
+
+REGISTER_DEFAULTS = {
+    PLL_CTRL0: 0x0060,
+    START_PULSE: 0x0002,        # 48kHz
+    PROGRAM_MAX_LEN_UPPER: PROGRAM_MAX_LENGTH >> 16,
+    PROGRAM_MAX_LEN_LOWER: PROGRAM_MAX_LENGTH & 0xffff,
+    SOFT_RESET: 0x0001,
+}
+
+# written by the DSP, writes from SPI are ignored
+READ_ONLY_REGISTERS = [PLL_LOCK, CORE_STATUS]
+
+
+class Adau145xEmulator():
+    '''
+    Emulates an ADAU145x connected to the SPI bus. Implements the subset
+    of the spidev.SpiDev interface used by SpiHandler, so it can be used
+    as a drop-in replacement:
+
+        SpiHandler.set_backend(Adau145xEmulator())
+
+    Modelled behaviour:
+    - data memory (DM0/DM1) and program memory with 4 byte cells,
+      control registers with 2 byte cells, auto-incrementing addresses
+    - HIBERNATE/KILLCORE/STARTCORE and the CORE_STATUS register.
+      Program memory can only be accessed while the core is not running,
+      reads return zeros and writes are ignored otherwise
+    - program length registers are set from the program end signature
+      when the core is started
+    - soft reset resets all registers to their default values
+    - safeload: writing the number of words executes the safeload
+      immediately if the core is running
+    - latency: every transfer takes transaction_latency + byte_latency
+      per transferred byte. With realtime=False the latency is only
+      accounted in busy_time, which makes measurements reproducible
+    '''
+
+    def __init__(self, transaction_latency=0.0, byte_latency=0.0,
+                 realtime=True):
+        self.transaction_latency = transaction_latency
+        self.byte_latency = byte_latency
+        self.realtime = realtime
+
+        # spidev attributes, not used by the emulator
+        self.max_speed_hz = 1000000
+        self.mode = 0
+        self.bits_per_word = 8
+
+        self.memory = bytearray(MEMORY_END * MEMORY_CELL_LENGTH)
+        self.registers = bytearray((REGISTER_END - REGISTER_START)
+                                   * REGISTER_CELL_LENGTH)
+        self.core_status = CORE_STOPPED
+
+        self.transactions = 0
+        self.bytes_transferred = 0
+        self.busy_time = 0.0
+        self.ignored_program_writes = 0
+        self.core_stops = 0
+        self.safeloads = 0
+
+        self.reset_registers()
+
+    @staticmethod
+    def with_spi_timing(speed_hz=1000000, transaction_overhead=0.00005,
+                        realtime=True):
+        '''
+        Create an emulator with latencies of a real SPI bus at the given
+        clock speed
+        '''
+        return Adau145xEmulator(transaction_latency=transaction_overhead,
+                                byte_latency=8.0 / speed_hz,
+                                realtime=realtime)
+
+    # spidev interface
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def xfer(self, data):
+        return self.transfer(data)
+
+    def xfer2(self, data):
+        return self.transfer(data)
+
+    def xfer3(self, data):
+        return self.transfer(data)
+
+    def writebytes(self, data):
+        self.transfer(data)
+
+    def writebytes2(self, data):
+        self.transfer(data)
+
+    def transfer(self, message):
+        '''
+        Process a single SPI message: 1 byte read/write flag, 2 bytes
+        address, data. Returns the bytes clocked out by the DSP.
+        '''
+        message = bytes(message)
+        self.account(len(message))
+
+        if len(message) < 3:
+            return [0] * len(message)
+
+        read = message[0] & 0x01
+        addr = (message[1] << 8) | message[2]
+        payload = message[3:]
+
+        if read:
+            return list(message[0:3] + self.read(addr, len(payload)))
+
+        self.write(addr, payload)
+        return [0] * len(message)
+
+    def account(self, length):
+        latency = self.transaction_latency + length * self.byte_latency
+        self.transactions += 1
+        self.bytes_transferred += length
+        self.busy_time += latency
+        if self.realtime and latency > 0:
+            time.sleep(latency)
+
+    # Memory access
+
+    def read(self, addr, length):
+        '''
+        Read length bytes starting at cell address addr
+        '''
+        if addr >= REGISTER_START:
+            self.update_status_registers()
+            start = (addr - REGISTER_START) * REGISTER_CELL_LENGTH
+            data = bytes(self.registers[start:start + length])
+        elif addr < MEMORY_END:
+            start = addr * MEMORY_CELL_LENGTH
+            end = start + length
+            if self.program_locked(addr, end):
+                data = bytes(length)
+            else:
+                data = bytes(self.memory[start:end])
+        else:
+            data = b''
+
+        # addresses that don't exist read as 0
+        return data + bytes(length - len(data))
+
+    def write(self, addr, data):
+        '''
+        Write data starting at cell address addr
+        '''
+        if addr >= REGISTER_START:
+            for i in range(0, len(data) - 1, REGISTER_CELL_LENGTH):
+                register = addr + i // REGISTER_CELL_LENGTH
+                if register >= REGISTER_END:
+                    break
+                value = (data[i] << 8) | data[i + 1]
+                self.write_register(register, value)
+        elif addr < MEMORY_END:
+            start = addr * MEMORY_CELL_LENGTH
+            end = min(start + len(data), len(self.memory))
+            if self.program_locked(addr, end):
+                self.ignored_program_writes += 1
+                logging.debug("emulator: ignoring program memory write to "
+                              "%s while core is running", addr)
+                return
+            self.memory[start:end] = data[0:end - start]
+
+            for register in [SAFELOAD_NUM_LOWER, SAFELOAD_NUM_UPPER]:
+                if addr <= register < addr + len(data) // MEMORY_CELL_LENGTH:
+                    self.safeload(register)
+
+    def safeload(self, register):
+        '''
+        Copy the safeload data to the target address. The DSP does this at
+        the start of the next frame, this is only possible while the core
+        is running.
+        '''
+        words = self.read_cell(register)
+        if words == 0 or self.core_status != CORE_RUNNING:
+            return
+        words = min(words, SAFELOAD_WORDS)
+        # the address register contains the target address minus one
+        target = (self.read_cell(SAFELOAD_ADDRESS) + 1) * MEMORY_CELL_LENGTH
+        source = SAFELOAD_DATA * MEMORY_CELL_LENGTH
+        length = words * MEMORY_CELL_LENGTH
+        self.memory[target:target + length] = \
+            self.memory[source:source + length]
+        self.memory[register * MEMORY_CELL_LENGTH:
+                    (register + 1) * MEMORY_CELL_LENGTH] = bytes(4)
+        self.safeloads += 1
+
+    def read_cell(self, addr):
+        start = addr * MEMORY_CELL_LENGTH
+        return int.from_bytes(self.memory[start:start + MEMORY_CELL_LENGTH],
+                              byteorder="big")
+
+    def program_locked(self, addr, end_byte):
+        '''
+        Program memory can't be accessed while the core is running
+        '''
+        return self.core_status == CORE_RUNNING and \
+            end_byte > PROGRAM_START * MEMORY_CELL_LENGTH
+
+    def get_register(self, register):
+        start = (register - REGISTER_START) * REGISTER_CELL_LENGTH
+        return (self.registers[start] << 8) | self.registers[start + 1]
+
+    def set_register(self, register, value):
+        start = (register - REGISTER_START) * REGISTER_CELL_LENGTH
+        self.registers[start] = (value >> 8) & 0xff
+        self.registers[start + 1] = value & 0xff
+
+    def write_register(self, register, value):
+        if register in READ_ONLY_REGISTERS:
+            return
+
+        previous = self.get_register(register)
+        self.set_register(register, value)
+
+        if register == SOFT_RESET:
+            if value & 0x01 == 0:
+                self.reset_registers()
+                self.set_register(SOFT_RESET, 0)
+                self.core_status = CORE_STOPPED
+        elif register == KILLCORE:
+            if value & 0x01:
+                if self.core_status in [CORE_RUNNING, CORE_HIBERNATE]:
+                    self.core_stops += 1
+                self.core_status = CORE_HALTED
+        elif register == STARTCORE:
+            # the core starts on a rising edge
+            if (value & 0x01) and not (previous & 0x01) and \
+                    not (self.get_register(KILLCORE) & 0x01):
+                self.start_core()
+        elif register == HIBERNATE:
+            if (value & 0x01) and self.core_status == CORE_RUNNING:
+                self.core_status = CORE_HIBERNATE
+            elif not (value & 0x01) and self.core_status == CORE_HIBERNATE:
+                self.core_status = CORE_RUNNING
+
+    def reset_registers(self):
+        self.registers[:] = bytes(len(self.registers))
+        for register, value in REGISTER_DEFAULTS.items():
+            self.set_register(register, value)
+
+    def update_status_registers(self):
+        self.set_register(CORE_STATUS, self.core_status)
+        self.set_register(PLL_LOCK, self.get_register(PLL_ENABLE) & 0x01)
+
+    def start_core(self):
+        if self.get_register(HIBERNATE) & 0x01:
+            self.core_status = CORE_HIBERNATE
+        else:
+            self.core_status = CORE_RUNNING
+        self.update_program_length()
+
+    def update_program_length(self):
+        '''
+        Set the program length registers to the number of program words
+        including the end signature
+        '''
+        program = self.memory[PROGRAM_START * MEMORY_CELL_LENGTH:]
+        index = program.find(PROGRAM_END_SIGNATURE)
+        while index >= 0 and index % MEMORY_CELL_LENGTH != 0:
+            index = program.find(PROGRAM_END_SIGNATURE, index + 1)
+
+        if index < 0:
+            length = 0
+        else:
+            length = (index + len(PROGRAM_END_SIGNATURE)) // MEMORY_CELL_LENGTH
+
+        self.set_register(PROGRAM_LEN_UPPER, length >> 16)
+        self.set_register(PROGRAM_LEN_LOWER, length & 0xffff)
+        return length
+
+    # Profiles
+
+    def install_profile(self, profile):
+        '''
+        Load a DSP profile like it would be loaded by SigmaStudio or the
+        self-boot EEPROM: all register and memory writes of the profile are
+        executed in order, the core is started afterwards.
+
+        Args:
+            profile: XmlProfile object
+
+        Returns:
+            int: program length in words
+        '''
+        actions = profile.doc["ROM"]["page"]["action"]
+        for action in actions:
+            if action["@instr"] != "writeXbytes":
+                continue
+            addr = int(action["@addr"])
+            data = bytes.fromhex(action.get("#text") or "")
+            # profile installation isn't an SPI transfer, don't account it
+            self.write(addr, data)
+
+        # The profile usually ends with START_CORE, but this is not
+        # required
+        if self.core_status != CORE_RUNNING:
+            self.write_register(HIBERNATE, 0)
+            self.write_register(KILLCORE, 0)
+            self.write_register(STARTCORE, 0)
+            self.write_register(STARTCORE, 1)
+
+        return self.update_program_length()
@@ -0,0 +1,113 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import unittest
+
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.emulator import Adau145xEmulator, \
+    CORE_RUNNING, CORE_HALTED, CORE_HIBERNATE
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.parser.xmlprofile import XmlProfile
+
+SAMPLE_PROFILE = os.path.join(os.path.dirname(__file__),
+                              "..", "..", "..", "sample_files", "xml",
+                              "dacdsp-default.xml")
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_spi = SpiHandler.spi
+        self.emulator = Adau145xEmulator(transaction_latency=0.001,
+                                         byte_latency=0.00001,
+                                         realtime=False)
+        SpiHandler.set_backend(self.emulator)
+
+    def tearDown(self):
+        SpiHandler.spi = self.saved_spi
+
+    def testCellWidths(self):
+        Adau145x.write_memory(0x10, b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.assertEqual(Adau145x.read_memory(0x11, 4), b'\x05\x06\x07\x08')
+
+        Adau145x.write_memory(0xf020, b'\x00\x01\x00\x02')
+        self.assertEqual(Adau145x.read_memory(0xf021, 2), b'\x00\x02')
+
+    def testCoreControl(self):
+        Adau145x.start_dsp()
+        self.assertEqual(self.emulator.core_status, CORE_RUNNING)
+
+        # program memory is not accessible while the core is running
+        Adau145x.write_memory(Adau145x.PROGRAM_ADDR, b'\x01\x02\x03\x04')
+        self.assertEqual(self.emulator.ignored_program_writes, 1)
+
+        Adau145x.kill_dsp()
+        self.assertEqual(self.emulator.core_status, CORE_HALTED)
+        Adau145x.write_memory(Adau145x.PROGRAM_ADDR, b'\x01\x02\x03\x04')
+        self.assertEqual(Adau145x.read_memory(Adau145x.PROGRAM_ADDR, 4),
+                         b'\x01\x02\x03\x04')
+
+        Adau145x.start_dsp()
+        Adau145x.write_memory(Adau145x.HIBERNATE_REGISTER, b'\x00\x01')
+        self.assertEqual(self.emulator.core_status, CORE_HIBERNATE)
+
+    def testLatencyModel(self):
+        Adau145x.write_memory(0x100, bytes(4000))
+        self.assertEqual(self.emulator.transactions, 1)
+        self.assertAlmostEqual(self.emulator.busy_time,
+                               0.001 + 4003 * 0.00001)
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_PROFILE),
+                         "sample profile not available")
+    def testInstallProfile(self):
+        profile = XmlProfile(SAMPLE_PROFILE)
+        length = self.emulator.install_profile(profile)
+
+        self.assertEqual(Adau145x.get_program_len(), length)
+        checksums = Adau145x.calculate_program_checksums(
+            mode="signature", algorithms=["md5"], cached=False)
+        self.assertEqual(checksums["md5"], profile.get_meta("checksum"))
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_PROFILE),
+                         "sample profile not available")
+    def testProgramSnapshot(self):
+        profile = XmlProfile(SAMPLE_PROFILE)
+        self.emulator.install_profile(profile)
+        Adau145x.clear_checksum_cache()
+        stops = self.emulator.core_stops
+
+        signature = Adau145x.calculate_program_checksums(mode="signature")
+        length = Adau145x.calculate_program_checksums(mode="length")
+        memory = Adau145x.get_program_memory_subset(mode="length")
+
+        # one stop of the core for both modes
+        self.assertEqual(self.emulator.core_stops, stops + 1)
+        self.assertEqual(signature["md5"], profile.get_meta("checksum"))
+        self.assertEqual(length["md5"], signature["md5"])
+        self.assertEqual(len(memory), Adau145x.get_program_len() * 4)
+
+        Adau145x.get_program_snapshot(refresh=True)
+        self.assertEqual(self.emulator.core_stops, stops + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
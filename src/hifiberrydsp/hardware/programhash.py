@@ -0,0 +1,353 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import hashlib
+import logging
+import threading
+import time
+
+ALGORITHMS = ["md5", "sha1"]
+MODES = ["signature", "length"]
+
+
+class ProgramHasher():
+    '''
+    Calculates the program checksums of both end detection modes while
+    program memory is read block by block:
+
+    - signature: program memory up to and including the end signature.
+      If there is no signature, the full memory except the last word.
+    - length: the number of words given by the program length registers
+
+    update() returns True as soon as all checksums are known, no more
+    program memory has to be read after that.
+    '''
+
+    def __init__(self, signature, program_length=None, word_length=4):
+        '''
+        Args:
+            signature: program end signature
+            program_length: program length in words from the length
+                registers or None if the length mode isn't needed
+            word_length: length of a memory cell in bytes
+        '''
+        self.signature = bytes(signature)
+        self.word_length = word_length
+        if program_length is None:
+            self.length_bytes = None
+        else:
+            self.length_bytes = program_length * word_length
+
+        self.hashers = {}
+        for mode in MODES:
+            self.hashers[mode] = {}
+            for algorithm in ALGORITHMS:
+                self.hashers[mode][algorithm] = hashlib.new(algorithm)
+
+        # bytes that might contain the beginning of the signature, they
+        # are added to the signature hashes when the next block arrives
+        self.tail = b''
+        self.position = 0
+        self.signature_end = None
+        self.nonzero = False
+        self.finished = False
+
+    def signature_done(self):
+        return self.signature_end is not None
+
+    def length_done(self):
+        return self.length_bytes is None or self.position >= self.length_bytes
+
+    def update(self, block):
+        '''
+        Add the next block of program memory
+
+        Returns:
+            bool: True if all checksums are complete
+        '''
+        block = bytes(block)
+        if not self.nonzero and any(block):
+            self.nonzero = True
+
+        if not self.length_done():
+            length_data = block[0:self.length_bytes - self.position]
+            for hasher in self.hashers["length"].values():
+                hasher.update(length_data)
+
+        if not self.signature_done():
+            data = self.tail + block
+            index = data.find(self.signature)
+            if index >= 0:
+                end = index + len(self.signature)
+                self.feed_signature(data[0:end])
+                self.signature_end = self.position - len(self.tail) + end
+                self.tail = b''
+                logging.debug("program end signature found at %s",
+                              self.signature_end - len(self.signature))
+            else:
+                keep = len(self.signature) - 1
+                self.feed_signature(data[0:len(data) - keep])
+                self.tail = data[len(data) - keep:]
+
+        self.position += len(block)
+        self.finished = self.signature_done() and self.length_done()
+        return self.finished
+
+    def feed_signature(self, data):
+        for hasher in self.hashers["signature"].values():
+            hasher.update(data)
+
+    def finish(self):
+        '''
+        Called after the whole program memory has been read. 
+        '''
+        if self.length_bytes is not None and not self.length_done():
+            # program length registers larger than the program memory
+            self.length_bytes = self.position
+
+        if not self.signature_done():
+            if not self.nonzero:
+                logging.error("SPI returned only zeros - communication error")
+            else:
+                logging.error("couldn't find program end signature," +
+                              " using full program memory")
+                # the last word of the program memory is not included
+                self.feed_signature(
+                    self.tail[0:len(self.tail) - self.word_length])
+                self.signature_end = self.position - self.word_length
+                self.tail = b''
+
+        self.finished = True
+
+    def checksums(self):
+        '''
+        Returns:
+            dict: {mode: {algorithm: uppercase hex digest}}. A mode is
+            missing if it couldn't be calculated.
+        '''
+        result = {}
+        for mode in MODES:
+            if mode == "signature" and not self.signature_done():
+                continue
+            if mode == "length" and \
+                    (self.length_bytes is None or not self.length_done()):
+                continue
+            result[mode] = {}
+            for algorithm, hasher in self.hashers[mode].items():
+                result[mode][algorithm] = hasher.hexdigest().upper()
+        return result
+
+
+class ProgramSnapshot():
+    '''
+    Program memory and checksums captured with a single stop of the DSP 
+    core. Contains everything that is needed for both end detection modes.
+    '''
+
+    def __init__(self, memory, hasher, program_length):
+        '''
+        Args:
+            memory: program memory that has been read, starting at the 
+                beginning of the program memory
+            hasher: ProgramHasher that processed the memory
+            program_length: value of the program length registers in words
+        '''
+        self.memory = bytes(memory)
+        self.program_length = program_length
+        self.signature_end = hasher.signature_end
+        self.length_bytes = hasher.length_bytes
+        self.checksums = hasher.checksums()
+        self.timestamp = time.monotonic()
+
+    def checksum(self, mode, algorithm):
+        '''
+        Returns:
+            str: uppercase hex digest or None if not available
+        '''
+        return self.checksums.get(mode, {}).get(algorithm)
+
+    def program_memory(self, mode):
+        '''
+        Returns:
+            bytes: program memory for the given end detection mode or None
+        '''
+        if mode not in self.checksums:
+            return None
+        if mode == "signature":
+            return self.memory[0:self.signature_end]
+        else:
+            return self.memory[0:self.length_bytes]
+
+
+class ProgramIdentity():
+    '''
+    Identity (memory and checksums) of the running DSP program, shared by
+    the SigmaTCP server, the REST API and the filter autoloader.
+
+    Only one program memory dump runs at a time. Callers that need a 
+    snapshot while a dump is running wait for its result instead of 
+    starting their own dump.
+
+    The generation counter is incremented whenever the program may have 
+    changed. Caches that depend on the program store the generation and 
+    are invalid if it changed. Before a snapshot is used, the program 
+    length registers are compared with the length at the time of the 
+    snapshot. This is a cheap check that detects most program changes 
+    that haven't been reported by invalidate().
+    '''
+
+    def __init__(self, take_snapshot, read_program_length=None):
+        '''
+        Args:
+            take_snapshot: function that dumps the program memory and 
+                returns a ProgramSnapshot
+            read_program_length: function that reads the program length
+                registers, None disables the check
+        '''
+        self.take_snapshot = take_snapshot
+        self.read_program_length = read_program_length
+        self.condition = threading.Condition()
+        self.snapshot = None
+        self.generation = 0
+        self.dumping = False
+        # number of the last dump that has been started and of the last
+        # dump that failed
+        self.dump_number = 0
+        self.failed_dump = None
+        self.dumps = 0
+        self.waits = 0
+        self.probe_invalidations = 0
+
+    def get_snapshot(self, refresh=False, probe=True):
+        '''
+        Args:
+            refresh: don't use a snapshot that has been taken before this
+                call. A dump that is running is waited for, it ends after
+                the call.
+            probe: check the program length registers before a cached 
+                snapshot is used
+
+        Returns:
+            ProgramSnapshot or None if program memory couldn't be read
+        '''
+        requested = time.monotonic()
+        if probe and not refresh:
+            self.probe()
+
+        with self.condition:
+            while True:
+                snapshot = self.snapshot
+                if snapshot is not None and \
+                        (not refresh or snapshot.timestamp >= requested):
+                    logging.debug("Using cached program snapshot")
+                    return snapshot
+
+                if not self.dumping:
+                    break
+
+                # single flight: use the result of the running dump
+                self.waits += 1
+                waiting_for = self.dump_number
+                while self.dumping and self.dump_number == waiting_for:
+                    self.condition.wait()
+                if not refresh and self.failed_dump == waiting_for:
+                    # the dump failed, don't start another one
+                    return None
+                # otherwise use its result or, if it was discarded 
+                # because the program changed, join or start a new dump
+
+            self.dumping = True
+            self.dump_number += 1
+            dump_number = self.dump_number
+            generation = self.generation
+
+        snapshot = None
+        try:
+            snapshot = self.take_snapshot()
+            self.dumps += 1
+        except Exception as e:
+            logging.error(f"Failed to read program memory: {str(e)}")
+
+        with self.condition:
+            self.dumping = False
+            if snapshot is None:
+                self.failed_dump = dump_number
+            if generation == self.generation:
+                self.snapshot = snapshot
+            else:
+                logging.debug("program changed during dump, "
+                              "snapshot not cached")
+            self.condition.notify_all()
+        return snapshot
+
+    def probe(self):
+        '''
+        Compare the program length registers with the cached snapshot and
+        invalidate it if they differ
+
+        Returns:
+            bool: True if the cached snapshot is still valid
+        '''
+        snapshot = self.snapshot
+        if snapshot is None or self.read_program_length is None:
+            return snapshot is not None
+
+        try:
+            program_length = self.read_program_length()
+        except Exception as e:
+            logging.error("can't read program length: %s", e)
+            return True
+
+        if program_length == snapshot.program_length:
+            return True
+
+        logging.debug("program length changed from %s to %s",
+                      snapshot.program_length, program_length)
+        with self.condition:
+            if self.snapshot is snapshot:
+                self.probe_invalidations += 1
+                self.invalidate()
+        return False
+
+    def invalidate(self):
+        '''
+        Called when the program might have changed
+        '''
+        with self.condition:
+            self.snapshot = None
+            self.generation += 1
+
+    def cached(self):
+        return self.snapshot
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "generation": self.generation,
+            "cached": snapshot is not None,
+            "dumping": self.dumping,
+            "dumps": self.dumps,
+            "waits": self.waits,
+            "probeInvalidations": self.probe_invalidations,
+            "programLength": None if snapshot is None
+            else snapshot.program_length,
+        }
@@ -0,0 +1,214 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import hashlib
+import threading
+import time
+import unittest
+
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.programhash import ProgramHasher, \
+    ProgramSnapshot, ProgramIdentity
+
+SIGNATURE = Adau145x.PROGRAM_END_SIGNATURE
+BLOCK_SIZE = 2048
+
+
+def digests(data):
+    return {"md5": hashlib.md5(data).hexdigest().upper(),
+            "sha1": hashlib.sha1(data).hexdigest().upper()}
+
+
+def hash_blocks(memory, program_length):
+    hasher = ProgramHasher(SIGNATURE, program_length)
+    blocks = 0
+    for i in range(0, len(memory), BLOCK_SIZE):
+        blocks += 1
+        if hasher.update(memory[i:i + BLOCK_SIZE]):
+            break
+    else:
+        hasher.finish()
+    return (hasher.checksums(), blocks)
+
+
+def make_snapshot(program_length):
+    memory = bytes(range(1, 9)) * program_length + bytes(SIGNATURE)
+    hasher = ProgramHasher(SIGNATURE, program_length)
+    hasher.update(memory)
+    return ProgramSnapshot(memory, hasher, program_length)
+
+
+class Test(unittest.TestCase):
+
+    def testSingleFlight(self):
+        release = threading.Event()
+        dumps = []
+
+        def take_snapshot():
+            dumps.append(1)
+            release.wait(5)
+            return make_snapshot(10)
+
+        identity = ProgramIdentity(take_snapshot)
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(identity.get_snapshot()))
+            for _i in range(5)]
+        for thread in threads:
+            thread.start()
+        while len(dumps) == 0 or identity.waits < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(dumps), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def testGeneration(self):
+        program_length = [10]
+        identity = ProgramIdentity(lambda: make_snapshot(program_length[0]),
+                                   lambda: program_length[0])
+        snapshot = identity.get_snapshot()
+        self.assertIs(identity.get_snapshot(), snapshot)
+
+        identity.invalidate()
+        self.assertEqual(identity.generation, 1)
+        snapshot = identity.get_snapshot()
+        self.assertEqual(identity.dumps, 2)
+
+        # a different program length invalidates the snapshot
+        program_length[0] = 12
+        new_snapshot = identity.get_snapshot()
+        self.assertIsNot(new_snapshot, snapshot)
+        self.assertEqual(new_snapshot.program_length, 12)
+        self.assertEqual(identity.generation, 2)
+        self.assertEqual(identity.probe_invalidations, 1)
+
+    def testInvalidateDuringDump(self):
+        identity = None
+
+        def take_snapshot():
+            identity.invalidate()
+            return make_snapshot(10)
+
+        identity = ProgramIdentity(take_snapshot)
+        self.assertIsNotNone(identity.get_snapshot())
+        # the program changed while it was read, the result isn't cached
+        self.assertIsNone(identity.cached())
+
+    def testWaitForDiscardedDump(self):
+        release = threading.Event()
+        identity = None
+        dumps = []
+
+        def take_snapshot():
+            dumps.append(1)
+            if len(dumps) == 1:
+                release.wait(5)
+                # program update during the first dump
+                identity.invalidate()
+                return make_snapshot(10)
+            return make_snapshot(12)
+
+        identity = ProgramIdentity(take_snapshot)
+        first = threading.Thread(target=identity.get_snapshot)
+        first.start()
+        while len(dumps) == 0:
+            time.sleep(0.001)
+
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(identity.get_snapshot()))
+        waiter.start()
+        while identity.waits < 1:
+            time.sleep(0.001)
+        release.set()
+        first.join()
+        waiter.join()
+
+        # the waiter didn't get None, but the result of a new dump
+        self.assertEqual(len(dumps), 2)
+        self.assertEqual(results[0].program_length, 12)
+        self.assertIs(identity.cached(), results[0])
+
+    def testFailedDump(self):
+        release = threading.Event()
+        dumps = []
+
+        def take_snapshot():
+            dumps.append(1)
+            release.wait(5)
+            raise IOError("SPI error")
+
+        identity = ProgramIdentity(take_snapshot)
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(identity.get_snapshot()))
+            for _i in range(3)]
+        for thread in threads:
+            thread.start()
+        while len(dumps) == 0 or identity.waits < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        # waiters don't start another dump after a failure
+        self.assertEqual(len(dumps), 1)
+        self.assertEqual(results, [None, None, None])
+
+    def testSignatureAcrossBlocks(self):
+        # the signature starts 4 bytes before the end of the first block
+        program = bytes(range(1, 256)) * 8
+        program = program[0:BLOCK_SIZE - 4] + SIGNATURE
+        memory = program + b'\x11' * (0x8000 - len(program))
+
+        (checksums, blocks) = hash_blocks(memory, len(program) // 4)
+        self.assertEqual(blocks, 2)
+        self.assertEqual(checksums["signature"], digests(program))
+        self.assertEqual(checksums["length"], digests(program))
+
+    def testLengthBeyondSignature(self):
+        program = b'\x01\x02\x03\x04' * 100 + SIGNATURE
+        memory = program + b'\x05' * (0x8000 - len(program))
+
+        (checksums, blocks) = hash_blocks(memory, 1000)
+        self.assertEqual(blocks, 2)
+        self.assertEqual(checksums["signature"], digests(program))
+        self.assertEqual(checksums["length"], digests(memory[0:4000]))
+
+    def testNoSignature(self):
+        memory = b'\x01\x02\x03\x04' * 0x2000
+
+        (checksums, blocks) = hash_blocks(memory, None)
+        self.assertEqual(blocks, 16)
+        self.assertEqual(checksums["signature"], digests(memory[0:-4]))
+        self.assertNotIn("length", checksums)
+
+    def testZeros(self):
+        (checksums, _blocks) = hash_blocks(bytes(0x8000), 0)
+        self.assertNotIn("signature", checksums)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import logging
+import time
+
+from hifiberrydsp.hardware.spi import SpiHandler
+
+# Values of the CORE_STATUS register
+CORE_STATUS_REGISTER = 0xf405
+CORE_NOT_RUNNING = 0
+CORE_RUNNING = 1
+CORE_HIBERNATE = 3
+CORE_HALTED = 4
+
+PLL_LOCK_REGISTER = 0xf004
+
+# Fixed delays in seconds, used if the state of an operation can't be
+# polled
+ERASE_DELAY = 10
+PAGE_DELAY = 1
+LOAD_DELAY = 1
+ACTION_DELAY = 1
+
+# Timeouts in seconds for polled operations
+ERASE_TIMEOUT = 30
+PAGE_TIMEOUT = 5
+STATUS_TIMEOUT = 2
+
+POLL_INTERVAL = 0.005
+
+PHASE_LOAD = "load"
+PHASE_REGISTERS = "registers"
+PHASE_ERASE = "erase"
+PHASE_PAGES = "pages"
+PHASE_CORE = "core"
+
+
+class SelfbootProgrammer():
+    '''
+    Executes the actions of a self-boot EEPROM image created by
+    SigmaStudio.
+
+    The image first loads a small EEPROM programmer into the DSP. This
+    programmer is controlled by the g_* cells in data memory: writing
+    g_Erase starts a chip erase, writing g_PageSize writes the page buffer
+    (Page_*) to g_PageAddress. The programmer clears the trigger cell when
+    the EEPROM operation is done. Instead of sleeping a fixed time after
+    each step, the trigger cells and the core/PLL status registers are
+    polled until the operation is finished.
+
+    If a trigger cell isn't cleared before the timeout, the programmer in
+    the image doesn't report its state. In this case the fixed delays are
+    used for the rest of the image.
+    '''
+
+    def __init__(self, polling=True, erase_timeout=ERASE_TIMEOUT,
+                 page_timeout=PAGE_TIMEOUT, status_timeout=STATUS_TIMEOUT,
+                 poll_interval=POLL_INTERVAL, sleep=time.sleep):
+        '''
+        Args:
+            polling: poll the state of operations, use fixed delays if False
+            erase_timeout: maximum time for a chip erase
+            page_timeout: maximum time for a page write
+            status_timeout: maximum time for core and PLL state changes
+            poll_interval: time between two status reads
+            sleep: function used for waiting
+        '''
+        self.polling = polling
+        self.erase_timeout = erase_timeout
+        self.page_timeout = page_timeout
+        self.status_timeout = status_timeout
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+        self.spi = SpiHandler()
+        self.timing = {}
+
+    @staticmethod
+    def phase(paramname):
+        if paramname == "g_Erase":
+            return PHASE_ERASE
+        if paramname.startswith("Page_") or paramname.startswith("g_Page"):
+            return PHASE_PAGES
+        if paramname.startswith("g_"):
+            return PHASE_REGISTERS
+        if paramname in ["Program", "Program Data"] or \
+                paramname.startswith("DM0") or paramname.startswith("DM1"):
+            return PHASE_LOAD
+        if "HIBERNATE" in paramname or "CORE" in paramname or \
+                "Delay" in paramname:
+            return PHASE_CORE
+        return PHASE_REGISTERS
+
+    def program(self, actions, write_memory):
+        '''
+        Execute all actions of a self-boot image
+
+        Args:
+            actions: list of action dicts from the XML profile
+            write_memory: function(addr, data) used for memory writes
+
+        Returns:
+            dict: timing information with the time spent in each phase,
+            number of pages and erase operations and the wait mode used
+        '''
+        self.timing = {
+            "phases": {},
+            "erase": 0,
+            "pages": 0,
+            "polling": self.polling,
+            "fallback": False,
+        }
+        started = time.monotonic()
+
+        for action in actions:
+            instr = action["@instr"]
+            paramname = action.get("@ParamName", "")
+            phase = self.phase(paramname)
+            phase_started = time.monotonic()
+
+            if instr == "writeXbytes":
+                addr = int(action["@addr"])
+                data = bytes.fromhex(action.get("#text") or "")
+                logging.debug("writeXbytes %s %s", addr, len(data))
+                write_memory(addr, data)
+                self.after_write(paramname, addr, data)
+
+            elif instr == "delay":
+                self.delay(paramname)
+
+            phases = self.timing["phases"]
+            phases[phase] = phases.get(phase, 0) + \
+                time.monotonic() - phase_started
+
+        self.timing["total"] = time.monotonic() - started
+        self.timing["polling"] = self.polling
+        return self.timing
+
+    def after_write(self, paramname, addr, data):
+        if paramname == "g_Erase":
+            self.timing["erase"] += 1
+            self.wait_for_cell("erase", addr, len(data),
+                               self.erase_timeout, ERASE_DELAY)
+
+        elif paramname == "g_PageSize":
+            self.timing["pages"] += 1
+            self.wait_for_cell("page write", addr, len(data),
+                               self.page_timeout, PAGE_DELAY)
+
+        elif not self.polling:
+            # SPI writes are synchronous, the old implementation waited
+            # nevertheless
+            if paramname.startswith("Page_"):
+                self.fixed_delay("page", PAGE_DELAY)
+            elif paramname.startswith("DM0") or \
+                    paramname.startswith("DM1") or "HIBERNATE" in paramname:
+                self.fixed_delay("load", LOAD_DELAY)
+
+    def delay(self, paramname):
+        if not self.polling:
+            self.fixed_delay(paramname, ACTION_DELAY)
+        elif "PLL" in paramname:
+            self.wait_for("PLL lock", self.pll_locked)
+        elif "Hibernate" in paramname:
+            self.wait_for("hibernate",
+                          lambda: self.core_status() != CORE_RUNNING)
+        elif "Start" in paramname:
+            self.wait_for("core start",
+                          lambda: self.core_status() in [CORE_RUNNING,
+                                                         CORE_HIBERNATE])
+        else:
+            self.fixed_delay(paramname, ACTION_DELAY)
+
+    def wait_for_cell(self, name, addr, length, timeout, delay):
+        '''
+        Wait until the EEPROM programmer cleared a trigger cell
+        '''
+        if not self.polling:
+            self.fixed_delay(name, delay)
+            return
+
+        if not self.wait_for(name,
+                             lambda: not any(self.spi.read(addr, length)),
+                             timeout):
+            logging.warning("EEPROM programmer doesn't report its state, "
+                            "using fixed delays")
+            self.polling = False
+            self.timing["fallback"] = True
+
+    def wait_for(self, name, condition, timeout=None):
+        '''
+        Poll condition until it is True
+
+        Returns:
+            bool: False if the timeout has been reached
+        '''
+        if timeout is None:
+            timeout = self.status_timeout
+        started = time.monotonic()
+        while not condition():
+            if time.monotonic() - started > timeout:
+                logging.warning("timeout waiting for %s after %.1fs",
+                                name, timeout)
+                return False
+            self.sleep(self.poll_interval)
+
+        logging.debug("%s done after %.3fs", name,
+                      time.monotonic() - started)
+        return True
+
+    def fixed_delay(self, name, delay):
+        logging.debug("%s, waiting %s seconds to finish", name, delay)
+        self.sleep(delay)
+
+    def core_status(self):
+        return int.from_bytes(self.spi.read(CORE_STATUS_REGISTER, 2),
+                              byteorder="big")
+
+    def pll_locked(self):
+        return int.from_bytes(self.spi.read(PLL_LOCK_REGISTER, 2),
+                              byteorder="big") & 0x01 == 1
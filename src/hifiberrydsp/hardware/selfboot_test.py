@@ -0,0 +1,117 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import unittest
+
+import xmltodict
+
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.emulator import Adau145xEmulator
+from hifiberrydsp.hardware.selfboot import SelfbootProgrammer, \
+    ERASE_DELAY, PAGE_DELAY
+from hifiberrydsp.hardware.spi import SpiHandler
+
+SAMPLE_PROFILE = os.path.join(os.path.dirname(__file__),
+                              "..", "..", "..", "sample_files", "xml",
+                              "dacdsp-default.xml")
+
+G_ERASE = 52
+G_PAGESIZE = 53
+
+
+class SelfbootEmulator(Adau145xEmulator):
+    '''
+    Emulator with a minimal EEPROM programmer that clears the trigger
+    cells after a number of status reads
+    '''
+
+    def __init__(self, busy_reads=3):
+        super().__init__(realtime=False)
+        self.busy_reads = busy_reads
+        self.busy = {}
+
+    def write(self, addr, data):
+        super().write(addr, data)
+        if addr in [G_ERASE, G_PAGESIZE] and any(data):
+            self.busy[addr] = self.busy_reads
+
+    def read(self, addr, length):
+        if addr in self.busy:
+            self.busy[addr] -= 1
+            if self.busy[addr] <= 0:
+                del self.busy[addr]
+                super().write(addr, bytes(4))
+        return super().read(addr, length)
+
+
+@unittest.skipUnless(os.path.exists(SAMPLE_PROFILE),
+                     "sample profile not available")
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_spi = SpiHandler.spi
+        with open(SAMPLE_PROFILE) as f:
+            self.actions = xmltodict.parse(f.read())["ROM"]["page"]["action"]
+        self.delays = []
+
+    def tearDown(self):
+        SpiHandler.spi = self.saved_spi
+
+    def programmer(self, **kwargs):
+        return SelfbootProgrammer(poll_interval=0,
+                                  sleep=self.delays.append, **kwargs)
+
+    def testPolling(self):
+        SpiHandler.set_backend(SelfbootEmulator())
+        timing = self.programmer().program(self.actions,
+                                           Adau145x.write_memory)
+
+        self.assertTrue(timing["polling"])
+        self.assertFalse(timing["fallback"])
+        self.assertEqual(timing["erase"], 1)
+        self.assertEqual(timing["pages"], 24)
+        self.assertNotIn(ERASE_DELAY, self.delays)
+        self.assertNotIn(PAGE_DELAY, self.delays)
+        for phase in ["load", "erase", "pages", "core"]:
+            self.assertIn(phase, timing["phases"])
+
+    def testFallback(self):
+        # the plain emulator never clears the trigger cells
+        SpiHandler.set_backend(Adau145xEmulator(realtime=False))
+        timing = self.programmer(erase_timeout=0).program(
+            self.actions, Adau145x.write_memory)
+
+        self.assertFalse(timing["polling"])
+        self.assertTrue(timing["fallback"])
+        self.assertGreaterEqual(self.delays.count(PAGE_DELAY), 24)
+
+    def testFixedDelays(self):
+        SpiHandler.set_backend(SelfbootEmulator())
+        timing = self.programmer(polling=False).program(
+            self.actions, Adau145x.write_memory)
+
+        self.assertFalse(timing["fallback"])
+        self.assertEqual(self.delays.count(ERASE_DELAY), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
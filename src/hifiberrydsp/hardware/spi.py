@@ -20,8 +20,27 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 import logging
+import itertools
+import queue
+import threading
+import time
+
 import hifiberrydsp
 
+# Priority classes for the SPI scheduler. Lower values are served first.
+PRIORITY_INTERACTIVE = 0    # parameter writes (volume, filters, SigmaStudio)
+PRIORITY_POLL = 1           # periodic register polling (AlsaSync, Sound Sync)
+PRIORITY_BULK = 2           # memory dumps, checksums, profile uploads
+
+# Bulk transfers are split into blocks of this size so that interactive
+# requests can be served between two blocks
+BULK_BLOCK_SIZE = 2048
+
+# Maximum size of a single SPI message including the 3 byte header and the
+# payload size used when longer writes have to be split
+MAX_TRANSFER_SIZE = 4096
+WRITE_BLOCK_SIZE = 4000
+
 def init_spi():        
     if not hifiberrydsp._called_from_test:
         # only open the device when not running tests
@@ -38,75 +57,224 @@ def init_spi():
     return spi
 
 
+class SpiJob():
+    '''
+    A unit of work executed by the SPI scheduler thread. The submitting
+    thread blocks on wait() until the job has been executed.
+    '''
+
+    def __init__(self, function, args=()):
+        self.function = function
+        self.args = args
+        self.result = None
+        self.exception = None
+        self.duration = 0.0
+        self.done = threading.Event()
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            self.result = self.function(*self.args)
+        except Exception as e:
+            self.exception = e
+        finally:
+            self.duration = time.perf_counter() - started
+            self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+
+class SpiScheduler(threading.Thread):
+    '''
+    Single owner of the SPI bus. All transfers are queued and executed by
+    this thread, ordered by priority class and FIFO inside a class.
+
+    A job is never interrupted, but bulk transfers are submitted as a
+    sequence of small jobs. Interactive requests that arrive while a
+    bulk transfer is running are executed before its next block.
+    '''
+
+    def __init__(self):
+        threading.Thread.__init__(self, name="SpiScheduler", daemon=True)
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.jobs_executed = [0, 0, 0]
+
+    def submit(self, job, priority=PRIORITY_INTERACTIVE):
+        self.queue.put((priority, next(self.sequence), job))
+        return job
+
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def run(self):
+        while True:
+            (priority, _seq, job) = self.queue.get()
+            job.run()
+            self.jobs_executed[priority] += 1
+
+
 class SpiHandler():
     '''
     Implements access to the SPI bus. Can be used by multiple threads.
 
-    We assume that the SPI library is thread-safe and do not use 
-    additional locking here.
+    Transfers are not executed directly by the calling thread, but 
+    serialized through a SpiScheduler thread that owns the bus. This 
+    guarantees that multi-transfer sequences (e.g. kill core, dump memory,
+    restart core) are not interleaved with transfers from other threads
+    and that interactive writes are not delayed by long memory dumps.
 
     Data is passed in bytearrays, not string or lists
     '''
 
-    spi = init_spi()
+    # initialized on first use, this allows to select a different backend 
+    # (e.g. an emulator) before the SPI device is opened
+    spi = None
+
+    # Only used by the scheduler thread, therefore it can be reused for
+    # every write without locking
+    transfer_buffer = bytearray(MAX_TRANSFER_SIZE)
+
+    scheduler = None
+    scheduler_lock = threading.Lock()
+
+    # SPI time used by the jobs of each submitting thread
+    accounting = threading.local()
+
+    @staticmethod
+    def set_backend(backend):
+        '''
+        Use a different SPI backend, e.g. Adau145xEmulator. The backend 
+        needs to implement xfer2 and optionally writebytes2 like spidev.SpiDev
+        '''
+        logging.info("using SPI backend %s", backend)
+        SpiHandler.spi = backend
 
     @staticmethod
-    def read(addr, length):
-        spi_request = []
-        a0 = addr & 0xff
-        a1 = (addr >> 8) & 0xff
+    def get_spi():
+        if SpiHandler.spi is None:
+            SpiHandler.spi = init_spi()
+        return SpiHandler.spi
 
-        spi_request.append(1)
-        spi_request.append(a1)
-        spi_request.append(a0)
+    @staticmethod
+    def get_scheduler():
+        if SpiHandler.scheduler is None:
+            with SpiHandler.scheduler_lock:
+                if SpiHandler.scheduler is None:
+                    scheduler = SpiScheduler()
+                    scheduler.start()
+                    SpiHandler.scheduler = scheduler
+        return SpiHandler.scheduler
+
+    @staticmethod
+    def submit(function, *args, priority=PRIORITY_INTERACTIVE):
+        '''
+        Execute a function on the SPI scheduler thread and wait for the
+        result. Use this for sequences of transfers that must not be 
+        interleaved with transfers from other threads.
 
-        for _i in range(0, length):
-            spi_request.append(0)
+        Calls from the scheduler thread itself are executed directly, 
+        therefore submitted functions can use read/write/submit again.
+        '''
+        scheduler = SpiHandler.get_scheduler()
+        if threading.current_thread() is scheduler:
+            return function(*args)
+        job = scheduler.submit(SpiJob(function, args), priority)
+        try:
+            return job.wait()
+        finally:
+            SpiHandler.accounting.spi_time = \
+                SpiHandler.spi_time() + job.duration
 
-        spi_response = SpiHandler.spi.xfer(spi_request)  # SPI read
-        logging.debug("spi read %s bytes from %s", len(spi_request), addr)
-        return bytearray(spi_response[3:])
+    @staticmethod
+    def spi_time():
+        '''
+        Time in seconds the SPI scheduler spent executing jobs submitted 
+        by the calling thread
+        '''
+        return getattr(SpiHandler.accounting, "spi_time", 0.0)
+
+    @staticmethod
+    def queue_depth():
+        '''
+        Number of jobs waiting for the SPI bus
+        '''
+        if SpiHandler.scheduler is None:
+            return 0
+        return SpiHandler.scheduler.queue_depth()
+
+    @staticmethod
+    def read(addr, length, priority=PRIORITY_INTERACTIVE):
+        return SpiHandler.submit(SpiHandler._read, addr, length,
+                                 priority=priority)
 
     @staticmethod
-    def write(addr, data):
+    def write(addr, data, priority=PRIORITY_INTERACTIVE):
+        return SpiHandler.submit(SpiHandler._write, addr, data,
+                                 priority=priority)
+
+    @staticmethod
+    def _read(addr, length):
+        spi_request = bytearray(3 + length)
+        spi_request[0] = 1
+        spi_request[1] = (addr >> 8) & 0xff
+        spi_request[2] = addr & 0xff
+
+        spi_response = bytearray(SpiHandler.get_spi().xfer2(spi_request))  # SPI read
+        logging.debug("spi read %s bytes from %s", length, addr)
+
+        # removing bytes from the start of a bytearray doesn't copy the data
+        del spi_response[0:3]
+        return spi_response
+
+    @staticmethod
+    def _write(addr, data):
         logging.debug("spi write %s bytes to %s", len(data), addr)
 
-        a0 = addr & 0xff
-        a1 = (addr >> 8) & 0xff
+        original = data
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            # lists of integers are still supported
+            data = bytes(data)
+        data = memoryview(data).cast("B")
+
+        buffer = SpiHandler.transfer_buffer
+        position = 0
+        while True:
+            # Messages up to 4096 bytes are sent as a single transfer, longer
+            # messages are split into blocks of 1000 cells (4000 bytes)
+            if len(data) - position + 3 <= MAX_TRANSFER_SIZE:
+                chunk_length = len(data) - position
+            else:
+                chunk_length = WRITE_BLOCK_SIZE
+
+            buffer[0] = 0
+            buffer[1] = (addr >> 8) & 0xff
+            buffer[2] = addr & 0xff
+            buffer[3:3 + chunk_length] = data[position:position + chunk_length]
+            SpiHandler._send(memoryview(buffer)[0:3 + chunk_length])
+            logging.debug("spi write %s bytes", chunk_length)
 
-        spi_request = []
-        spi_request.append(0)
-        spi_request.append(a1)
-        spi_request.append(a0)
+            position += chunk_length
+            if position >= len(data):
+                break
 
-        for d in data:
-            spi_request.append(d)
+            # skip forward 1000 cells
+            addr = addr + 1000  # each memory cell is 4 bytes long
 
-        if len(spi_request) < 4096:
-            logging.debug(f"spi write {len(spi_request) - 3} bytes: {spi_request}")
-            SpiHandler.spi.xfer(spi_request)
+        return original
+
+    @staticmethod
+    def _send(message):
+        '''
+        Send a message without reading back data. writebytes2 (spidev >= 3.5)
+        accepts any buffer, older versions need a list
+        '''
+        spi = SpiHandler.get_spi()
+        if hasattr(spi, "writebytes2"):
+            spi.writebytes2(message)
         else:
-            finished = False
-            while not finished:
-                if len(spi_request) < 4096:
-                    SpiHandler.spi.xfer(spi_request)
-                    logging.debug("spi write %s bytes", len(spi_request) - 3)
-                    finished = True
-                else:
-                    short_request = spi_request[:4003]
-                    SpiHandler.spi.xfer(short_request)
-                    logging.debug("spi write %s bytes", len(short_request) - 3)
-
-                    # skip forward 1000 cells
-                    addr = addr + 1000  # each memory cell is 4 bytes long
-                    a0 = addr & 0xff
-                    a1 = (addr >> 8) & 0xff
-                    new_request = []
-                    new_request.append(0)
-                    new_request.append(a1)
-                    new_request.append(a0)
-                    new_request.extend(spi_request[4003:])
-
-                    spi_request = new_request
-
-        return data
+            spi.xfer2(message.tolist())
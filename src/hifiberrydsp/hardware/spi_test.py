@@ -0,0 +1,72 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import threading
+import unittest
+
+from hifiberrydsp.hardware.spi import SpiHandler, SpiJob, \
+    PRIORITY_INTERACTIVE, PRIORITY_POLL, PRIORITY_BULK
+
+
+class Test(unittest.TestCase):
+
+    def testPriorityOrder(self):
+        scheduler = SpiHandler.get_scheduler()
+        release = threading.Event()
+        executed = []
+
+        # Block the scheduler thread, so that all following jobs are queued
+        blocker = scheduler.submit(SpiJob(release.wait), PRIORITY_INTERACTIVE)
+
+        jobs = []
+        for (name, priority) in [("bulk1", PRIORITY_BULK),
+                                 ("poll1", PRIORITY_POLL),
+                                 ("bulk2", PRIORITY_BULK),
+                                 ("write1", PRIORITY_INTERACTIVE),
+                                 ("write2", PRIORITY_INTERACTIVE)]:
+            jobs.append(scheduler.submit(SpiJob(executed.append, (name,)),
+                                         priority))
+        release.set()
+        blocker.wait()
+        for job in jobs:
+            job.wait()
+
+        self.assertEqual(executed,
+                         ["write1", "write2", "poll1", "bulk1", "bulk2"])
+
+    def testReentrantSubmit(self):
+
+        def outer():
+            return SpiHandler.submit(lambda: 42) + 1
+
+        self.assertEqual(SpiHandler.submit(outer), 43)
+
+    def testException(self):
+
+        def fail():
+            raise IOError("bus error")
+
+        with self.assertRaises(IOError):
+            SpiHandler.submit(fail)
+
+
+if __name__ == "__main__":
+    unittest.main()
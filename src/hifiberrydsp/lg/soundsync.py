@@ -32,7 +32,7 @@ from hifiberrydsp import datatools
 
 try:
     from hifiberrydsp.hardware.adau145x import Adau145x
-    from hifiberrydsp.hardware.spi import SpiHandler
+    from hifiberrydsp.hardware.spi import SpiHandler, PRIORITY_POLL
     # depends on spidev and is not required to run tests
 except:
     pass
@@ -80,13 +80,15 @@ class SoundSync(Thread):
         if self.spdif_active_register is None:
             return True
         
-        data = self.spi.read(self.spdif_active_register, 4)
+        data = self.spi.read(self.spdif_active_register, 4,
+                             priority=PRIORITY_POLL)
         [spdif_active] = struct.unpack(">l", data)
         return spdif_active != 0
 
     def try_read_volume(self):
         spdif_status_register = 0xf617
-        return self.parse_volume_from_status(self.spi.read(spdif_status_register, 5))
+        return self.parse_volume_from_status(
+            self.spi.read(spdif_status_register, 5, priority=PRIORITY_POLL))
 
     # Volume    ~~~~~
     #      0: 00f048a$  This is what the SPDIF status registers look like with different volume levels set.
@@ -0,0 +1,270 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import json
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+from threading import Lock
+
+from hifiberrydsp.parser.xmlprofile import MetadataIndex
+
+DEFAULT_PROFILES_DIRECTORY = "/usr/share/hifiberry/dspprofiles"
+CATALOG_FILENAME = "dspprofiles-catalog.json"
+CATALOG_VERSION = 1
+
+DEFAULT_SAMPLERATE = 48000
+
+# Fields that are stored for every profile in addition to the full
+# metadata
+SUMMARY_ATTRIBUTES = ["checksum", "checksum_sha1", "profileName",
+                      "profileVersion"]
+
+catalogs = {}
+catalogs_lock = Lock()
+
+
+def get_catalog_path():
+    '''
+    Default location of the catalog file, /var/lib/hifiberry if running 
+    as root, ~/.hifiberry otherwise
+    '''
+    if os.geteuid() == 0:
+        mydir = "/var/lib/hifiberry"
+    else:
+        mydir = os.path.expanduser("~/.hifiberry")
+    return os.path.join(mydir, CATALOG_FILENAME)
+
+
+def read_profile_metadata(filename):
+    '''
+    Read only the beometa section of an XML profile. Parsing stops at the
+    end of this section, the program and parameter data that follows 
+    isn't processed.
+
+    Returns:
+        MetadataIndex
+    '''
+    metadata = []
+    depth = 0
+    for event, element in ElementTree.iterparse(filename,
+                                                events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+
+        depth -= 1
+        if element.tag == "metadata":
+            entry = {}
+            for name, value in element.attrib.items():
+                entry["@" + name] = value
+            text = (element.text or "").strip()
+            entry["#text"] = text if text else None
+            metadata.append(entry)
+        elif element.tag == "beometa":
+            break
+        elif depth == 1:
+            # another section of the profile, there is no beometa in
+            # front of the program data
+            element.clear()
+
+    return MetadataIndex(metadata)
+
+
+def catalog_entry(path, stat):
+    '''
+    Create the catalog entry of a profile
+    '''
+    entry = {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+    try:
+        index = read_profile_metadata(path)
+        metadata = {}
+        for key in index.keys():
+            metadata[key] = index.get(key)
+        for attribute in SUMMARY_ATTRIBUTES:
+            entry[attribute] = metadata.get(attribute)
+        try:
+            entry["samplerate"] = int(metadata.get("samplerate"))
+        except (TypeError, ValueError):
+            entry["samplerate"] = DEFAULT_SAMPLERATE
+        entry["metadata"] = metadata
+    except Exception as e:
+        logging.warning("can't read metadata of %s: %s", path, e)
+        entry["error"] = str(e)
+    return entry
+
+
+class ProfileCatalog():
+    '''
+    Metadata of all DSP profiles in a directory. 
+
+    The catalog is stored as a JSON file. Entries are keyed by the path 
+    and only read again if the modification time or size of the file 
+    changed, new profiles are added and removed profiles are dropped on 
+    every refresh. Profiles can be looked up by their checksum without 
+    reading any XML file.
+    '''
+
+    def __init__(self, directory=DEFAULT_PROFILES_DIRECTORY,
+                 catalog_file=None):
+        self.directory = directory
+        if catalog_file is None:
+            catalog_file = get_catalog_path()
+        self.catalog_file = catalog_file
+        self.entries = {}
+        self.by_checksum = {}
+        self.by_checksum_sha1 = {}
+        self.lock = Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.catalog_file) as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                self.entries = data.get("profiles", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning("can't read profile catalog %s: %s",
+                            self.catalog_file, e)
+        self.update_lookup()
+
+    def save(self, entries):
+        data = {"version": CATALOG_VERSION, "profiles": entries}
+        tmpfile = self.catalog_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.catalog_file), exist_ok=True)
+            with open(tmpfile, "w") as f:
+                json.dump(data, f)
+            os.replace(tmpfile, self.catalog_file)
+        except Exception as e:
+            logging.warning("can't write profile catalog %s: %s",
+                            self.catalog_file, e)
+
+    def update_lookup(self):
+        by_checksum = {}
+        by_checksum_sha1 = {}
+        for path, entry in self.entries.items():
+            if os.path.dirname(path) != self.directory:
+                continue
+            if entry.get("checksum"):
+                by_checksum.setdefault(entry["checksum"].upper(), path)
+            if entry.get("checksum_sha1"):
+                by_checksum_sha1.setdefault(entry["checksum_sha1"].upper(),
+                                            path)
+        self.by_checksum = by_checksum
+        self.by_checksum_sha1 = by_checksum_sha1
+
+    def refresh(self):
+        '''
+        Bring the catalog up to date with the profiles directory. Only new
+        and changed profiles are read.
+
+        Returns:
+            bool: False if the directory can't be read
+        '''
+        try:
+            filenames = sorted(os.listdir(self.directory))
+        except OSError as e:
+            logging.warning("can't read profiles directory %s: %s",
+                            self.directory, e)
+            return False
+
+        with self.lock:
+            entries = {}
+            changed = False
+            for filename in filenames:
+                if not filename.lower().endswith(".xml"):
+                    continue
+                path = os.path.join(self.directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entry = self.entries.get(path)
+                if entry is None or entry.get("mtime") != stat.st_mtime_ns \
+                        or entry.get("size") != stat.st_size:
+                    logging.debug("adding %s to the profile catalog", path)
+                    entry = catalog_entry(path, stat)
+                    changed = True
+                entries[path] = entry
+
+            # profiles of other directories stay in the catalog file
+            for path, entry in self.entries.items():
+                if os.path.dirname(path) != self.directory:
+                    entries[path] = entry
+                elif path not in entries:
+                    changed = True
+
+            if changed:
+                self.entries = entries
+                self.update_lookup()
+                self.save(entries)
+
+        return True
+
+    def profiles(self):
+        '''
+        Returns:
+            dict: {filename: catalog entry} of all profiles in the 
+            directory, sorted by filename
+        '''
+        self.refresh()
+        result = {}
+        for path in sorted(self.entries):
+            if os.path.dirname(path) == self.directory:
+                result[os.path.basename(path)] = self.entries[path]
+        return result
+
+    def find(self, checksum=None, checksum_sha1=None):
+        '''
+        Find the profile of a DSP program. The length-mode SHA-1 
+        (checksum_sha1) is preferred over the signature-mode MD5 
+        (checksum).
+
+        Returns:
+            str: path of the profile or None
+        '''
+        self.refresh()
+        path = None
+        if checksum_sha1:
+            path = self.by_checksum_sha1.get(checksum_sha1.upper())
+        if path is None and checksum:
+            path = self.by_checksum.get(checksum.upper())
+        return path
+
+
+def get_profile_catalog(directory=DEFAULT_PROFILES_DIRECTORY):
+    '''
+    Shared catalog of a profiles directory
+    '''
+    with catalogs_lock:
+        catalog = catalogs.get(directory)
+        if catalog is None:
+            catalog = ProfileCatalog(directory)
+            catalogs[directory] = catalog
+        return catalog
@@ -0,0 +1,98 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import shutil
+import tempfile
+import unittest
+
+from hifiberrydsp.parser import profilecatalog
+from hifiberrydsp.parser.profilecatalog import ProfileCatalog, \
+    read_profile_metadata
+
+SAMPLE_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                                "sample_files", "xml")
+CHECKSUM = "16EA9EE2C6A296BDBF4C2C3A55246729"
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmpdir, "profiles")
+        os.mkdir(self.directory)
+        self.catalog_file = os.path.join(self.tmpdir, "catalog.json")
+        for filename in ["dacdsp-default.xml", "fullrange-iir.xml"]:
+            shutil.copy(os.path.join(SAMPLE_DIRECTORY, filename),
+                        self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testMetadata(self):
+        index = read_profile_metadata(
+            os.path.join(self.directory, "dacdsp-default.xml"))
+        self.assertEqual(index.get("checksum"), CHECKSUM)
+        self.assertEqual(index.get("IIR_L"), "42/80")
+
+    def testCatalog(self):
+        catalog = ProfileCatalog(self.directory, self.catalog_file)
+        profiles = catalog.profiles()
+        self.assertEqual(list(profiles.keys()),
+                         ["dacdsp-default.xml", "fullrange-iir.xml"])
+        entry = profiles["dacdsp-default.xml"]
+        self.assertEqual(entry["checksum"], CHECKSUM)
+        self.assertEqual(entry["samplerate"], 48000)
+        self.assertEqual(entry["metadata"]["IIR_L"], "42/80")
+
+        self.assertEqual(catalog.find(checksum=CHECKSUM.lower()),
+                         os.path.join(self.directory, "dacdsp-default.xml"))
+        self.assertIsNone(catalog.find(checksum="0" * 32))
+
+        # unchanged profiles are not read again
+        saved_entry = profilecatalog.catalog_entry
+        try:
+            profilecatalog.catalog_entry = None
+            catalog = ProfileCatalog(self.directory, self.catalog_file)
+            self.assertEqual(catalog.profiles(), profiles)
+        finally:
+            profilecatalog.catalog_entry = saved_entry
+
+        # changed and removed profiles
+        path = os.path.join(self.directory, "fullrange-iir.xml")
+        shutil.copy(os.path.join(self.directory, "dacdsp-default.xml"), path)
+        os.utime(path, ns=(0, 1000))
+        os.remove(os.path.join(self.directory, "dacdsp-default.xml"))
+        self.assertEqual(catalog.find(checksum=CHECKSUM), path)
+        self.assertEqual(list(catalog.profiles().keys()),
+                         ["fullrange-iir.xml"])
+
+    def testInvalidProfile(self):
+        with open(os.path.join(self.directory, "broken.xml"), "w") as f:
+            f.write("<ROM><beometa>")
+        catalog = ProfileCatalog(self.directory, self.catalog_file)
+        profiles = catalog.profiles()
+        self.assertIn("error", profiles["broken.xml"])
+        self.assertEqual(len(profiles), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -88,6 +88,19 @@ REGISTER_ATTRIBUTES = [ATTRIBUTE_CHANNEL_SELECT,
                        ATTRIBUTE_SPDIF_ENABLE,
                        ATTRIBUTE_LOUDNESS]
 
+# Metadata attributes that describe banks of biquad filters
+BIQUAD_BANK_ATTRIBUTES = [ATTRIBUTE_IIR_FILTER_LEFT,
+                          ATTRIBUTE_IIR_FILTER_RIGHT,
+                          ATTRIBUTE_CUSTOM_FILTER_LEFT,
+                          ATTRIBUTE_CUSTOM_FILTER_RIGHT,
+                          ATTRIBUTE_TONECONTROL_FILTER_LEFT,
+                          ATTRIBUTE_TONECONTROL_FILTER_RIGHT]
+
+# Number of memory cells of a biquad filter
+BIQUAD_CELLS = 5
+
+TRUE_VALUES = ["y", "yes", "1", "true"]
+
 MEMTYPE = {
     0: "DM0",
     1: "DM1",
@@ -149,11 +162,93 @@ def get_default_dspprofile_path():
     return os.path.expanduser(mydir + "/dspprogram.xml")
 
 
+class MetadataIndex():
+    '''
+    The beometa section of a profile compiled into dictionaries, 
+    attributes can be looked up without scanning the metadata list. 
+    Address values are parsed on first use and cached.
+    '''
+
+    def __init__(self, metadata_list):
+        self.values = OrderedDict()
+        self.storable = []
+        self.volatile = []
+        self.cells = {}
+
+        if isinstance(metadata_list, dict):
+            # xmltodict doesn't create a list for a single element
+            metadata_list = [metadata_list]
+
+        for metadata in metadata_list or []:
+            attribute = metadata.get("@type")
+            if attribute is None or attribute in self.values:
+                # the first entry of an attribute is used
+                continue
+
+            self.values[attribute] = metadata.get("#text")
+            if MetadataIndex.flag(metadata, "@storable"):
+                self.storable.append(attribute)
+            if MetadataIndex.flag(metadata, "@volatile") or \
+                    attribute == ATTRIBUTE_SPDIF_ACTIVE:
+                self.volatile.append(attribute)
+
+    @staticmethod
+    def flag(metadata, name):
+        value = metadata.get(name)
+        return value is not None and value.lower() in TRUE_VALUES
+
+    def get(self, attribute):
+        return self.values.get(attribute)
+
+    def keys(self):
+        return list(self.values.keys())
+
+    def addr_length(self, attribute):
+        '''
+        Returns:
+            tuple: (addr, length) of an address attribute, (None, 0) if 
+            the attribute doesn't exist or isn't an address
+        '''
+        try:
+            return self.cells[attribute]
+        except KeyError:
+            pass
+
+        cells = parse_int_length(self.values.get(attribute))
+        self.cells[attribute] = cells
+        return cells
+
+    def biquad_bank(self, attribute):
+        '''
+        Returns:
+            tuple: (addr, number of biquads) of a filter bank or None
+        '''
+        (addr, length) = self.addr_length(attribute)
+        if addr is None or length < BIQUAD_CELLS:
+            return None
+        return (addr, length // BIQUAD_CELLS)
+
+    def biquad_banks(self):
+        '''
+        Returns:
+            dict: {attribute: (addr, number of biquads)} of all filter banks
+            of the profile
+        '''
+        banks = {}
+        for attribute in BIQUAD_BANK_ATTRIBUTES:
+            if attribute in self.values:
+                bank = self.biquad_bank(attribute)
+                if bank is not None:
+                    banks[attribute] = bank
+        return banks
+
+
 class XmlProfile():
 
     def __init__(self, filename=None, read_default_profile=False):
         self.dsp = Adau145x()
         self.doc = None
+        self.index = None
         self.filename = filename
         self.eeprom = DummyEepromWriter(self.dsp)
         if filename is None and read_default_profile:
@@ -174,11 +269,13 @@ class XmlProfile():
             logging.error("can't read file %s", filename)
             return
 
+        self.index = None
         self.update()
 
     def read_from_text(self, xmlcontent):
         logging.info("parsing xml")
         self.doc = xmltodict.parse(xmlcontent)
+        self.index = None
         self.update()
 
     def update(self):
@@ -260,40 +357,51 @@ class XmlProfile():
                             '%02X ' % octet for octet in data).strip()
                         action["#text"] = new_data_str
 
+    def metadata_index(self):
+        '''
+        Returns:
+            MetadataIndex: compiled metadata, created on first use
+        '''
+        if self.index is None:
+            try:
+                metadata = self.doc["ROM"]["beometa"]["metadata"]
+            except (KeyError, TypeError):
+                metadata = []
+            self.index = MetadataIndex(metadata)
+        return self.index
+
     def get_meta(self, name):
-        for metadata in self.doc["ROM"]["beometa"]["metadata"]:
-            t = metadata["@type"]
-            if (t == name):
-                return metadata["#text"]
-            
+        return self.metadata_index().get(name)
+
     def get_meta_keys(self):
         """
         Get a list of all metadata keys
         """
-        keys = []
-        for metadata in self.doc["ROM"]["beometa"]["metadata"]:
-            keys.append(metadata["@type"])
-
-        return keys
+        return self.metadata_index().keys()
 
     def get_storable_registers(self):
-        storables = []
-        for metadata in self.doc["ROM"]["beometa"]["metadata"]:
-            try:
-                storable = metadata["@storable"]
-                if storable is not None:
-                    storable = storable.lower()
-
-                if (storable in ["y", "yes", "1", "true"]):
-                    storables.append(metadata["@type"])
-            except KeyError:
-                pass
-
-        return storables
+        return list(self.metadata_index().storable)
+
+    def get_volatile_cells(self):
+        '''
+        Memory cells that are modified by the DSP program itself, e.g. 
+        level meters. These are marked with volatile="yes" in the metadata.
+        The SPDIF status register is always volatile.
+        '''
+        index = self.metadata_index()
+        cells = set()
+        for attribute in index.volatile:
+            (addr, length) = index.addr_length(attribute)
+            if addr is not None:
+                cells.update(range(addr, addr + length))
+
+        return cells
 
     def get_addr_length(self, attribute):
-        addr = self.get_meta(attribute)
-        return parse_int_length(addr)
+        return self.metadata_index().addr_length(attribute)
+
+    def get_biquad_bank(self, attribute):
+        return self.metadata_index().biquad_bank(attribute)
 
     def update_metadata(self, metadata_dict):
 
@@ -325,6 +433,7 @@ class XmlProfile():
                                        ('#text', md[attribute])]))
 
         beometa["metadata"] = md_new
+        self.index = None
 
     def samplerate(self):
         try:
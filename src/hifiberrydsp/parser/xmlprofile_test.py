@@ -0,0 +1,72 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import unittest
+
+from hifiberrydsp.parser.xmlprofile import XmlProfile, MetadataIndex, \
+    ATTRIBUTE_IIR_FILTER_LEFT, ATTRIBUTE_SPDIF_ACTIVE
+
+SAMPLE_PROFILE = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                              "sample_files", "xml", "dacdsp-default.xml")
+
+
+class Test(unittest.TestCase):
+
+    def testIndex(self):
+        index = MetadataIndex([
+            {"@type": "IIR_L", "#text": "42/80"},
+            {"@type": "IIR_L", "#text": "1/5"},
+            {"@type": "volumeControlRegister", "#text": "4106",
+             "@storable": "yes"},
+            {"@type": ATTRIBUTE_SPDIF_ACTIVE, "#text": "4200"},
+            {"@type": "samplerate", "#text": "48000"},
+        ])
+        # the first entry of an attribute wins
+        self.assertEqual(index.get(ATTRIBUTE_IIR_FILTER_LEFT), "42/80")
+        self.assertEqual(index.addr_length("IIR_L"), (42, 80))
+        self.assertEqual(index.biquad_bank("IIR_L"), (42, 16))
+        self.assertEqual(index.biquad_banks(), {"IIR_L": (42, 16)})
+        self.assertEqual(index.addr_length("volumeControlRegister"),
+                         (4106, 1))
+        self.assertIsNone(index.biquad_bank("volumeControlRegister"))
+        self.assertEqual(index.addr_length("unknown"), (None, 0))
+        self.assertEqual(index.storable, ["volumeControlRegister"])
+        self.assertEqual(index.volatile, [ATTRIBUTE_SPDIF_ACTIVE])
+
+    def testSingleEntry(self):
+        index = MetadataIndex({"@type": "samplerate", "#text": "48000"})
+        self.assertEqual(index.keys(), ["samplerate"])
+
+    def testProfile(self):
+        profile = XmlProfile(SAMPLE_PROFILE)
+        self.assertEqual(profile.get_meta("IIR_L"), "42/80")
+        self.assertEqual(profile.get_addr_length("IIR_L"), (42, 80))
+        self.assertEqual(profile.get_biquad_bank("IIR_L"), (42, 16))
+        self.assertIn("IIR_L", profile.get_meta_keys())
+
+        # updates of the metadata rebuild the index
+        profile.update_metadata({"IIR_L": "100/10"})
+        self.assertEqual(profile.get_biquad_bank("IIR_L"), (100, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
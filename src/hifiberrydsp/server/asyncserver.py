@@ -0,0 +1,212 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import asyncio
+import logging
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from hifiberrydsp.server.framing import FrameDecoder, FrameTooLarge
+from hifiberrydsp.server.clients import ClientRegistry, BACKPRESSURE_DELAY
+from hifiberrydsp.server.constants import DEFAULT_PORT
+from hifiberrydsp.server.watch import SubscriberStalled
+
+# Blocking request handlers (SPI, file system) run in this many threads
+EXECUTOR_THREADS = 4
+
+# Data waiting to be sent to a client before pushing notifications fails
+MAX_PUSH_BUFFER = 256 * 1024
+
+
+def remove_stale_socket(path):
+    '''
+    Remove a Unix socket file left over by a server that didn't shut down
+    cleanly. Other files are not touched.
+    '''
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class AsyncSigmaTCPServer():
+    '''
+    SigmaTCP server based on asyncio. All connections are served by a
+    single event loop thread. Requests are dispatched as soon as they are
+    complete, the blocking work of a request runs in a thread pool. 
+    Requests of a single connection are processed in order.
+
+    Provides the same serve_forever()/server_close() interface as
+    SigmaTCPServer.
+    '''
+
+    def __init__(self, server_address=("0.0.0.0", DEFAULT_PORT),
+                 process_frame=None, executor_threads=EXECUTOR_THREADS,
+                 connection_closed=None, unix_path=None, clients=None):
+        '''
+        Args:
+            server_address: (host, port) tuple
+            unix_path: also listen on this Unix domain socket if not None
+            process_frame: function(frame, push) that processes a complete
+                request and returns the response or None, defaults to 
+                SigmaTCPHandler.process_frame. push is a thread-safe 
+                function that sends data to the client.
+            executor_threads: number of threads for blocking request 
+                handlers
+            connection_closed: function(push) called when a connection
+                has been closed, defaults to 
+                SigmaTCPHandler.connection_closed
+            clients: ClientRegistry with the connection limit and 
+                timeouts, defaults to a registry with the default limits
+        '''
+        if process_frame is None or connection_closed is None:
+            from hifiberrydsp.server.sigmatcp import SigmaTCPHandler
+            if process_frame is None:
+                process_frame = SigmaTCPHandler.process_frame
+            if connection_closed is None:
+                connection_closed = SigmaTCPHandler.connection_closed
+
+        self.server_address = server_address
+        self.unix_path = unix_path
+        self.unix_server = None
+        self.process_frame = process_frame
+        self.connection_closed = connection_closed
+        if clients is None:
+            clients = ClientRegistry()
+        self.clients = clients
+        self.executor = ThreadPoolExecutor(max_workers=executor_threads,
+                                           thread_name_prefix="sigmatcp")
+        self.loop = None
+        self.server = None
+        self.connections = 0
+
+    async def start(self):
+        '''
+        Start listening, returns when the server socket is open
+        '''
+        self.loop = asyncio.get_running_loop()
+        (host, port) = self.server_address
+        self.server = await asyncio.start_server(self.handle_connection,
+                                                 host, port,
+                                                 reuse_address=True)
+        logging.info("asyncio SigmaTCP server listening on %s:%s",
+                     host, port)
+
+        if self.unix_path is not None:
+            try:
+                remove_stale_socket(self.unix_path)
+                self.unix_server = await asyncio.start_unix_server(
+                    self.handle_connection, self.unix_path)
+                # same access as the TCP server on localhost
+                os.chmod(self.unix_path, 0o666)
+                logging.info("asyncio SigmaTCP server listening on %s",
+                             self.unix_path)
+            except OSError as e:
+                logging.warning("can't listen on %s: %s", self.unix_path, e)
+
+    async def handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        logging.debug("connection from %s", peer)
+        if isinstance(peer, tuple):
+            client = self.clients.register(peer, "tcp")
+        else:
+            client = self.clients.register("local", "unix")
+        if client is None:
+            writer.close()
+            return
+
+        self.connections += 1
+        decoder = FrameDecoder()
+
+        def push(data):
+            # can be called from any thread, never blocks
+            if writer.is_closing():
+                return
+            if writer.transport.get_write_buffer_size() > MAX_PUSH_BUFFER:
+                raise SubscriberStalled("{} bytes waiting".format(
+                    writer.transport.get_write_buffer_size()))
+            self.loop.call_soon_threadsafe(writer.write, bytes(data))
+
+        try:
+            while True:
+                while self.clients.spi_busy():
+                    # don't read more requests until the SPI queue has
+                    # room again
+                    client.throttled += 1
+                    await asyncio.sleep(BACKPRESSURE_DELAY)
+
+                pending = decoder.pending()
+                try:
+                    data = await asyncio.wait_for(
+                        reader.read(65536),
+                        self.clients.timeout(client, pending))
+                except asyncio.TimeoutError:
+                    self.clients.timed_out(client, pending)
+                    break
+                if len(data) == 0:
+                    break
+                client.received(len(data))
+
+                for frame in decoder.feed(data):
+                    result = await self.loop.run_in_executor(
+                        self.executor, client.process, self.process_frame,
+                        frame, push)
+                    if (result is not None) and (len(result) > 0):
+                        logging.debug("Sending %s bytes answer to client",
+                                      len(result))
+                        writer.write(result)
+                        await writer.drain()
+
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except FrameTooLarge as e:
+            logging.warning("closing connection from %s: %s", peer, e)
+        except Exception as e:
+            logging.error("error processing request from %s: %s", peer, e)
+            logging.exception(e)
+        finally:
+            self.clients.unregister(client)
+            self.connection_closed(push)
+            self.connections -= 1
+            logging.debug("connection from %s closed", peer)
+            writer.close()
+
+    async def serve(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            if self.unix_server is not None:
+                self.unix_server.close()
+                remove_stale_socket(self.unix_path)
+
+    def serve_forever(self):
+        asyncio.run(self.serve())
+
+    def server_close(self):
+        if self.server is not None and self.loop is not None and \
+                self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.server.close)
+        self.executor.shutdown(wait=False)
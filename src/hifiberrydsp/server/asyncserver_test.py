@@ -0,0 +1,83 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import asyncio
+import time
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.server.asyncserver import AsyncSigmaTCPServer
+from hifiberrydsp.server.constants import COMMAND_READ, COMMAND_READRESPONSE
+
+
+def echo_read(frame, push=None):
+    '''
+    Answers read requests with the requested address, ignores everything
+    else
+    '''
+    time.sleep(0.01)
+    if frame[0] == COMMAND_READ:
+        return bytes([COMMAND_READRESPONSE]) + frame[10:12]
+    return None
+
+
+class Test(unittest.TestCase):
+
+    def testConcurrentClients(self):
+        server = AsyncSigmaTCPServer(server_address=("127.0.0.1", 0),
+                                     process_frame=echo_read,
+                                     connection_closed=lambda push: None)
+
+        async def client(port, index):
+            (reader, writer) = await asyncio.open_connection("127.0.0.1",
+                                                             port)
+            # many small requests in one write
+            requests = b""
+            for i in range(10):
+                requests += SigmaTCPClient.write_request(i, bytes(4))
+                requests += SigmaTCPClient.read_request(None, index * 100 + i,
+                                                        4)
+            writer.write(requests)
+            await writer.drain()
+
+            responses = await reader.readexactly(3 * 10)
+            writer.close()
+            return [int.from_bytes(responses[i + 1:i + 3], byteorder="big")
+                    for i in range(0, len(responses), 3)]
+
+        async def run():
+            await server.start()
+            port = server.server.sockets[0].getsockname()[1]
+            results = await asyncio.gather(*[client(port, i)
+                                             for i in range(20)])
+            server.server.close()
+            return results
+
+        results = asyncio.run(run())
+        server.executor.shutdown()
+
+        for index, addresses in enumerate(results):
+            # responses are in order of the requests
+            self.assertEqual(addresses, [index * 100 + i for i in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
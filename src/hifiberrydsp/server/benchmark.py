@@ -0,0 +1,152 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+Throughput of the SigmaTCP receive path for a synthetic stream of write
+requests:
+
+    python3 -m hifiberrydsp.server.benchmark --frames 100000
+'''
+
+import argparse
+import logging
+import socket
+import time
+from threading import Thread
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.server.framing import FrameDecoder, frame_length
+from hifiberrydsp.server.constants import HEADER_SIZE
+
+# Payload sizes of the generated write requests in bytes, similar to a 
+# SigmaStudio download: mostly single parameters, some filter blocks
+PAYLOAD_SIZES = [4, 4, 4, 8, 20, 20, 64, 400]
+
+
+def write_stream(frames, payload_sizes=PAYLOAD_SIZES):
+    '''
+    Create a stream of write requests to data memory
+
+    Returns:
+        bytes
+    '''
+    stream = bytearray()
+    for i in range(frames):
+        size = payload_sizes[i % len(payload_sizes)]
+        addr = (i * 8) % 0x5000
+        stream += SigmaTCPClient.write_request(addr,
+                                               bytes([i & 0xff]) * size)
+    return bytes(stream)
+
+
+def send_stream(sock, stream):
+    sock.sendall(stream)
+    sock.close()
+
+
+def decode(sock, process):
+    '''
+    Receive path of the SigmaTCP server: recv_into the receive buffer,
+    requests are processed in place
+    '''
+    decoder = FrameDecoder()
+    frames = 0
+    while decoder.recv_into(sock) > 0:
+        for frame in decoder.frames():
+            process(frame)
+            frames += 1
+    return frames
+
+
+def decode_legacy(sock, process):
+    '''
+    The receive path used before FrameDecoder: received data is appended
+    to the unprocessed data and the rest is copied after every request
+    '''
+    frames = 0
+    data = b""
+    while True:
+        received = sock.recv(65536)
+        if len(received) == 0:
+            break
+        data = data + received
+        while len(data) >= HEADER_SIZE:
+            length = frame_length(data)
+            if len(data) < length:
+                break
+            process(data[0:length])
+            data = data[length:]
+            frames += 1
+    return frames
+
+
+def measure(name, decoder, process, stream):
+    (reader, writer) = socket.socketpair()
+    sender = Thread(target=send_stream, args=(writer, stream))
+    started = time.perf_counter()
+    sender.start()
+    frames = decoder(reader, process)
+    duration = time.perf_counter() - started
+    sender.join()
+    reader.close()
+
+    print("{:30} {:8} frames {:8.2f} MB/s {:10.0f} frames/s".format(
+        name, frames, len(stream) / duration / 1e6, frames / duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SigmaTCP receive path")
+    parser.add_argument("--frames", type=int, default=100000,
+                        help="number of write requests")
+    parser.add_argument("--no-dsp", action="store_true",
+                        help="only decode requests, don't write them to "
+                        "the DSP emulator")
+    parser.add_argument("--legacy", action="store_true",
+                        help="also measure the previous receive path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stream = write_stream(args.frames)
+    print("{} write requests, {:.1f} MB".format(args.frames,
+                                               len(stream) / 1e6))
+
+    def ignore(_frame):
+        pass
+
+    measure("decode", decode, ignore, stream)
+    if args.legacy:
+        measure("decode (legacy)", decode_legacy, ignore, stream)
+
+    if not args.no_dsp:
+        from hifiberrydsp.hardware.emulator import Adau145xEmulator
+        from hifiberrydsp.hardware.spi import SpiHandler
+        from hifiberrydsp.server.sigmatcp import SigmaTCPHandler
+
+        SpiHandler.set_backend(Adau145xEmulator(realtime=False))
+        measure("decode + write (emulator)", decode,
+                SigmaTCPHandler.handle_write, stream)
+        if args.legacy:
+            measure("decode + write (legacy)", decode_legacy,
+                    SigmaTCPHandler.handle_write, stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+Capture SigmaTCP sessions and replay them for load benchmarks.
+
+The server records all requests it receives if it is started with 
+--capture FILE. A capture can be replayed against a running server or an
+in-process server with an emulated DSP:
+
+    python3 -m hifiberrydsp.server.capture info session.cap
+    python3 -m hifiberrydsp.server.capture replay session.cap --speed 10
+'''
+
+import argparse
+import logging
+import socket
+import struct
+import time
+from threading import Lock, Thread
+
+from hifiberrydsp.client.sigmatcp import ResponseReader, SigmaTCPClient
+from hifiberrydsp.server import constants
+from hifiberrydsp.server.constants import \
+    COMMAND_READ, COMMAND_READRESPONSE, \
+    COMMAND_EEPROM_FILE, COMMAND_CHECKSUM, COMMAND_CHECKSUM_RESPONSE, \
+    COMMAND_WRITE_EEPROM_CONTENT, COMMAND_XML, COMMAND_XML_RESPONSE, \
+    COMMAND_STORE_DATA, COMMAND_RESTORE_DATA, \
+    COMMAND_GET_META, COMMAND_META_RESPONSE, \
+    COMMAND_PROGMEM, COMMAND_PROGMEM_RESPONSE, \
+    COMMAND_DATAMEM, COMMAND_DATAMEM_RESPONSE, \
+    COMMAND_PROGMEM_BINARY, COMMAND_PROGMEM_BINARY_RESPONSE, \
+    COMMAND_DATAMEM_BINARY, COMMAND_DATAMEM_BINARY_RESPONSE, \
+    COMMAND_BATCH, COMMAND_BATCH_RESPONSE, \
+    COMMAND_SUBSCRIBE, COMMAND_SUBSCRIBE_RESPONSE, COMMAND_NOTIFY, \
+    COMMAND_STATS, COMMAND_STATS_RESPONSE, \
+    DEFAULT_PORT, SigmaTCPException
+
+# File format: file header followed by one record per request. Each record
+# has the time since the start of the capture in microseconds, the 
+# connection number and the length of the request, followed by the request
+# including its SigmaTCP header.
+CAPTURE_MAGIC = b"SIGMACAP"
+CAPTURE_VERSION = 1
+FILE_HEADER = struct.Struct(">8sHH")
+RECORD_HEADER = struct.Struct(">QHI")
+
+# Response opcode for all requests that are answered by the server
+RESPONSES = {
+    COMMAND_READ: COMMAND_READRESPONSE,
+    COMMAND_CHECKSUM: COMMAND_CHECKSUM_RESPONSE,
+    COMMAND_XML: COMMAND_XML_RESPONSE,
+    COMMAND_GET_META: COMMAND_META_RESPONSE,
+    COMMAND_PROGMEM: COMMAND_PROGMEM_RESPONSE,
+    COMMAND_DATAMEM: COMMAND_DATAMEM_RESPONSE,
+    COMMAND_PROGMEM_BINARY: COMMAND_PROGMEM_BINARY_RESPONSE,
+    COMMAND_DATAMEM_BINARY: COMMAND_DATAMEM_BINARY_RESPONSE,
+    COMMAND_BATCH: COMMAND_BATCH_RESPONSE,
+    COMMAND_SUBSCRIBE: COMMAND_SUBSCRIBE_RESPONSE,
+    COMMAND_STATS: COMMAND_STATS_RESPONSE,
+}
+
+# Requests that change the EEPROM or stored data on the server, these are
+# not replayed
+SKIPPED_COMMANDS = [COMMAND_EEPROM_FILE, COMMAND_WRITE_EEPROM_CONTENT,
+                    COMMAND_STORE_DATA, COMMAND_RESTORE_DATA]
+
+# Percentiles of the latency report
+PERCENTILES = [50, 90, 99]
+
+REPLAY_TIMEOUT = 10
+
+COMMAND_NAMES = {}
+for name, value in vars(constants).items():
+    if name.startswith("COMMAND_"):
+        COMMAND_NAMES[value] = name[8:].lower()
+
+
+def command_name(command):
+    return "0x{:02x} {}".format(command, COMMAND_NAMES.get(command, "?"))
+
+
+class CaptureWriter():
+    '''
+    Writes requests to a capture file. Can be used from multiple threads,
+    each connection is identified by its owner object (e.g. the push 
+    function of the connection).
+    '''
+
+    def __init__(self, filename):
+        self.file = open(filename, "wb")
+        self.file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, 0))
+        self.lock = Lock()
+        self.started = time.monotonic()
+        self.connections = {}
+        self.records = 0
+
+    def connection(self, owner):
+        if owner is None:
+            return 0
+        number = self.connections.get(owner)
+        if number is None:
+            number = len(self.connections) + 1
+            self.connections[owner] = number
+        return number
+
+    def record(self, frame, owner=None):
+        timestamp = int((time.monotonic() - self.started) * 1000000)
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(RECORD_HEADER.pack(
+                timestamp, self.connection(owner) & 0xffff, len(frame)))
+            self.file.write(frame)
+            self.records += 1
+
+    def connection_closed(self, owner):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                logging.info("captured %s requests", self.records)
+
+
+def read_capture(filename):
+    '''
+    Read a capture file
+
+    Returns:
+        list: (time in seconds, connection, request) tuples or None if 
+        the file isn't a valid capture
+    '''
+    with open(filename, "rb") as f:
+        data = f.read()
+
+    if len(data) < FILE_HEADER.size:
+        logging.error("%s is not a SigmaTCP capture", filename)
+        return None
+    (magic, version, _reserved) = FILE_HEADER.unpack_from(data, 0)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        logging.error("%s is not a SigmaTCP capture (version %s)",
+                      filename, CAPTURE_VERSION)
+        return None
+
+    records = []
+    position = FILE_HEADER.size
+    while position + RECORD_HEADER.size <= len(data):
+        (timestamp, connection, length) = \
+            RECORD_HEADER.unpack_from(data, position)
+        position += RECORD_HEADER.size
+        if position + length > len(data):
+            break
+        records.append((timestamp / 1000000, connection,
+                        data[position:position + length]))
+        position += length
+
+    if position != len(data):
+        logging.warning("%s is truncated, ignoring the last request",
+                        filename)
+
+    return records
+
+
+def percentile(values, p):
+    '''
+    Nearest-rank percentile of a sorted list
+    '''
+    if len(values) == 0:
+        return None
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+class ReplayStats():
+    '''
+    Request counts and latencies by opcode
+    '''
+
+    def __init__(self):
+        self.counts = {}
+        self.latencies = {}
+        self.bytes = 0
+        self.skipped = 0
+        self.errors = 0
+        self.unexpected = 0
+        self.duration = 0.0
+
+    def add(self, command, length, latency=None):
+        self.counts[command] = self.counts.get(command, 0) + 1
+        self.bytes += length
+        if latency is not None:
+            self.latencies.setdefault(command, []).append(latency)
+
+    def merge(self, other):
+        for command, count in other.counts.items():
+            self.counts[command] = self.counts.get(command, 0) + count
+        for command, latencies in other.latencies.items():
+            self.latencies.setdefault(command, []).extend(latencies)
+        self.bytes += other.bytes
+        self.skipped += other.skipped
+        self.errors += other.errors
+        self.unexpected += other.unexpected
+
+    def requests(self):
+        return sum(self.counts.values())
+
+    def report(self):
+        '''
+        Returns:
+            str: table with count and latency percentiles in ms of each 
+            opcode and the overall throughput
+        '''
+        lines = ["{:28} {:>8} {}".format(
+            "request", "count",
+            " ".join("{:>8}".format("p{} ms".format(p))
+                     for p in PERCENTILES + [100]))]
+        for command in sorted(self.counts):
+            latencies = sorted(self.latencies.get(command, []))
+            if latencies:
+                columns = " ".join(
+                    "{:8.3f}".format(percentile(latencies, p) * 1000)
+                    for p in PERCENTILES + [100])
+            else:
+                # requests without a response
+                columns = " ".join("{:>8}".format("-")
+                                   for _p in PERCENTILES + [100])
+            lines.append("{:28} {:8} {}".format(
+                command_name(command), self.counts[command], columns))
+
+        if self.duration > 0:
+            lines.append("{} requests in {:.3f}s, {:.0f} requests/s, "
+                         "{:.2f} MB/s".format(
+                             self.requests(), self.duration,
+                             self.requests() / self.duration,
+                             self.bytes / self.duration / 1e6))
+        if self.skipped:
+            lines.append("{} EEPROM/store requests skipped".format(
+                self.skipped))
+        if self.errors:
+            lines.append("{} requests failed".format(self.errors))
+        if self.unexpected:
+            lines.append("{} unexpected responses ignored".format(
+                self.unexpected))
+        return "\n".join(lines)
+
+
+class Replayer():
+    '''
+    Replays a capture against a SigmaTCP server. Every connection of the
+    capture is replayed on its own connection and thread. Requests are sent
+    at their original time divided by the speed factor, or as fast as 
+    possible if the speed is 0. The latency of a request is the time from
+    sending it until its response has been received.
+    '''
+
+    def __init__(self, records, host="localhost", port=DEFAULT_PORT,
+                 speed=1.0, timeout=REPLAY_TIMEOUT):
+        self.records = records
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.timeout = timeout
+
+    def run(self):
+        '''
+        Returns:
+            ReplayStats
+        '''
+        connections = {}
+        for (timestamp, connection, request) in self.records:
+            connections.setdefault(connection, []).append(
+                (timestamp, request))
+
+        results = []
+        threads = []
+        started = time.perf_counter()
+        for requests in connections.values():
+            stats = ReplayStats()
+            results.append(stats)
+            thread = Thread(target=self.replay_connection,
+                            args=(requests, started, stats))
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        stats = ReplayStats()
+        for result in results:
+            stats.merge(result)
+        stats.duration = time.perf_counter() - started
+        return stats
+
+    def replay_connection(self, requests, started, stats):
+        try:
+            sock = socket.create_connection((self.host, self.port),
+                                            timeout=self.timeout)
+        except OSError as e:
+            logging.error("can't connect to %s:%s: %s",
+                          self.host, self.port, e)
+            stats.errors += len(requests)
+            return
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        reader = ResponseReader(sock)
+        try:
+            for (timestamp, request) in requests:
+                command = request[0]
+                if command in SKIPPED_COMMANDS:
+                    stats.skipped += 1
+                    continue
+
+                if self.speed > 0:
+                    delay = started + timestamp / self.speed - \
+                        time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                sent = time.perf_counter()
+                sock.sendall(request)
+                response = RESPONSES.get(command)
+                if response is None:
+                    stats.add(command, len(request))
+                    continue
+
+                self.receive(reader, response, stats)
+                stats.add(command, len(request), time.perf_counter() - sent)
+
+            # requests are processed in order, when the response to this
+            # read arrives, all writes have been processed
+            sock.sendall(SigmaTCPClient.read_request(None, 0, 4))
+            self.receive(reader, COMMAND_READRESPONSE, stats)
+
+        except (OSError, SigmaTCPException) as e:
+            logging.error("replay failed: %s", e)
+            stats.errors += 1
+        finally:
+            sock.close()
+
+    @staticmethod
+    def receive(reader, response, stats):
+        '''
+        Read frames until the response arrives. Notifications are ignored,
+        other responses (e.g. to requests this version doesn't know) are
+        counted and skipped.
+        '''
+        while True:
+            (header, _data) = reader.read_frame()
+            if header[0] == response:
+                return
+            if header[0] != COMMAND_NOTIFY:
+                logging.debug("ignoring unexpected response %s",
+                              command_name(header[0]))
+                stats.unexpected += 1
+
+
+def start_emulator_server(profile_file=None, spi_timing=True):
+    '''
+    Start a threaded SigmaTCP server on a free port of localhost with an
+    emulated DSP
+
+    Returns:
+        SigmaTCPServer
+    '''
+    from hifiberrydsp.hardware.emulator import Adau145xEmulator
+    from hifiberrydsp.hardware.spi import SpiHandler
+    from hifiberrydsp.parser.xmlprofile import XmlProfile
+    from hifiberrydsp.server.sigmatcp import SigmaTCPServer
+
+    if spi_timing:
+        emulator = Adau145xEmulator.with_spi_timing()
+    else:
+        emulator = Adau145xEmulator(realtime=False)
+    if profile_file:
+        emulator.install_profile(XmlProfile(profile_file))
+    SpiHandler.set_backend(emulator)
+
+    server = SigmaTCPServer(server_address=("127.0.0.1", 0))
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def info(records):
+    stats = ReplayStats()
+    for (_timestamp, _connection, request) in records:
+        stats.add(request[0], len(request))
+    if records:
+        stats.duration = records[-1][0]
+    connections = len(set(record[1] for record in records))
+    print("{} connections".format(connections))
+    print(stats.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show or replay a SigmaTCP capture")
+    parser.add_argument("command", choices=["info", "replay"])
+    parser.add_argument("capture", help="capture file recorded by "
+                        "sigmatcpserver --capture")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed factor, 0 sends requests as "
+                        "fast as possible (default: %(default)s)")
+    parser.add_argument("--host", default=None,
+                        help="replay against this server instead of an "
+                        "in-process server with an emulated DSP")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--profile", default=None,
+                        help="XML profile loaded into the emulated DSP")
+    parser.add_argument("--no-spi-timing", action="store_true",
+                        help="don't simulate the SPI bus timing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    records = read_capture(args.capture)
+    if records is None:
+        return
+
+    if args.command == "info":
+        info(records)
+        return
+
+    server = None
+    host = args.host
+    port = args.port
+    if host is None:
+        server = start_emulator_server(args.profile,
+                                       not args.no_spi_timing)
+        (host, port) = server.server_address
+
+    stats = Replayer(records, host, port, args.speed).run()
+    print(stats.report())
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import tempfile
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.server.capture import CaptureWriter, Replayer, \
+    ReplayStats, read_capture, percentile, start_emulator_server
+from hifiberrydsp.server.constants import COMMAND_READ, COMMAND_WRITE, \
+    COMMAND_READRESPONSE, COMMAND_STATS, COMMAND_STORE_DATA, HEADER_SIZE
+
+
+class FrameList():
+
+    def __init__(self, commands):
+        self.commands = list(commands)
+
+    def read_frame(self):
+        return (bytes([self.commands.pop(0)]), b"")
+
+
+class Test(unittest.TestCase):
+
+    def testCaptureFile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "session.cap")
+            writer = CaptureWriter(filename)
+            write = SigmaTCPClient.write_request(0x10, bytes(8))
+            read = SigmaTCPClient.read_request(None, 0x10, 2)
+            writer.record(write, "a")
+            writer.record(memoryview(read), "b")
+            writer.record(write, "a")
+            writer.close()
+
+            records = read_capture(filename)
+            self.assertEqual([r[1] for r in records], [1, 2, 1])
+            self.assertEqual(records[0][2], write)
+            self.assertEqual(records[1][2], read)
+            self.assertTrue(records[0][0] <= records[1][0] <= records[2][0])
+
+            # a truncated last request is ignored
+            with open(filename, "r+b") as f:
+                f.truncate(os.path.getsize(filename) - 1)
+            self.assertEqual(len(read_capture(filename)), 2)
+
+    def testPercentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 90), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def testReplay(self):
+        saved_spi = SpiHandler.spi
+        server = start_emulator_server(spi_timing=False)
+        try:
+            (host, port) = server.server_address
+            records = []
+            for i in range(20):
+                records.append((i * 0.001, 1 + i % 2,
+                                SigmaTCPClient.write_request(i * 2, bytes(8))))
+                records.append((i * 0.001, 1 + i % 2,
+                                SigmaTCPClient.read_request(None, i * 2, 2)))
+            records.append((0.02, 1,
+                            bytes([COMMAND_STORE_DATA]) + bytes(HEADER_SIZE - 1)))
+            records.append((0.02, 2,
+                            SigmaTCPClient.generic_request(COMMAND_STATS)))
+
+            stats = Replayer(records, host, port, speed=0).run()
+            self.assertEqual(stats.errors, 0)
+            self.assertEqual(stats.skipped, 1)
+            self.assertEqual(stats.counts, {COMMAND_WRITE: 20,
+                                            COMMAND_READ: 20,
+                                            COMMAND_STATS: 1})
+            self.assertEqual(len(stats.latencies[COMMAND_STATS]), 1)
+            self.assertEqual(stats.unexpected, 0)
+            self.assertEqual(len(stats.latencies[COMMAND_READ]), 20)
+            self.assertNotIn(COMMAND_WRITE, stats.latencies)
+            self.assertIn("requests/s", stats.report())
+        finally:
+            server.shutdown()
+            server.server_close()
+            SpiHandler.spi = saved_spi
+
+    def testUnexpectedResponse(self):
+        stats = ReplayStats()
+        reader = FrameList([0xfe, COMMAND_READRESPONSE])
+        Replayer.receive(reader, COMMAND_READRESPONSE, stats)
+        self.assertEqual(stats.unexpected, 1)
+        self.assertEqual(reader.commands, [])
+        self.assertIn("1 unexpected responses", stats.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
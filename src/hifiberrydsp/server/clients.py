@@ -0,0 +1,238 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import logging
+import time
+from threading import Lock
+
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.server.constants import COMMAND_SUBSCRIBE
+
+# Default limits, 0 disables a limit
+DEFAULT_MAX_CONNECTIONS = 32
+# Time in seconds a connection can be idle before it is closed. Clients 
+# that keep connections open without using them would otherwise block
+# the connection slots. Connections with subscriptions are never idle.
+DEFAULT_IDLE_TIMEOUT = 300
+# Time in seconds to receive the rest of a request that has been started
+DEFAULT_READ_TIMEOUT = 30
+# Requests are not received while more jobs are waiting for the SPI bus.
+# Every connection waits for its own job, so at most one job per 
+# connection can be queued and the limit has to be lower than the
+# connection limit.
+DEFAULT_MAX_SPI_QUEUE = 8
+
+BACKPRESSURE_DELAY = 0.005
+
+
+class ClientStats():
+    '''
+    Counters of a single client connection
+    '''
+
+    def __init__(self, address, transport="tcp"):
+        self.address = address
+        self.transport = transport
+        self.connected = time.time()
+        self.last_activity = time.monotonic()
+        self.frames = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.spi_time = 0.0
+        self.processing_time = 0.0
+        self.throttled = 0
+        # start of the request that is currently being received and the
+        # number of processed requests at that time
+        self.request_started = None
+        self.request_frame = 0
+        # the client waits for notifications, it isn't closed when idle
+        self.subscribed = False
+
+    def received(self, length):
+        self.bytes_received += length
+        self.last_activity = time.monotonic()
+
+    def process(self, process_frame, frame, push=None):
+        '''
+        Process a request and count it. Has to be called in the thread 
+        that processes the request, SPI time is measured per thread.
+
+        Returns:
+            the result of process_frame
+        '''
+        self.frames += 1
+        if frame[0] == COMMAND_SUBSCRIBE:
+            self.subscribed = True
+        spi_time = SpiHandler.spi_time()
+        started = time.perf_counter()
+        try:
+            result = process_frame(frame, push)
+        finally:
+            self.processing_time += time.perf_counter() - started
+            self.spi_time += SpiHandler.spi_time() - spi_time
+
+        if result is not None:
+            self.bytes_sent += len(result)
+        return result
+
+    def as_dict(self):
+        if isinstance(self.address, tuple):
+            address = "{}:{}".format(self.address[0], self.address[1])
+        else:
+            address = str(self.address or "")
+        return {
+            "address": address,
+            "transport": self.transport,
+            "connected": self.connected,
+            "idle": round(time.monotonic() - self.last_activity, 3),
+            "frames": self.frames,
+            "bytesReceived": self.bytes_received,
+            "bytesSent": self.bytes_sent,
+            "spiTime": round(self.spi_time, 6),
+            "processingTime": round(self.processing_time, 6),
+            "throttled": self.throttled,
+        }
+
+
+class ClientRegistry():
+    '''
+    Keeps track of the connected SigmaTCP clients and enforces the 
+    connection limit. Also holds the timeouts and the SPI queue limit 
+    used by the servers.
+    '''
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_spi_queue=DEFAULT_MAX_SPI_QUEUE):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.read_timeout = read_timeout
+        self.max_spi_queue = max_spi_queue
+        self.lock = Lock()
+        self.clients = []
+        self.accepted = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def register(self, address, transport="tcp"):
+        '''
+        Returns:
+            ClientStats: counters of the new connection or None if the 
+            connection limit has been reached
+        '''
+        with self.lock:
+            if self.max_connections and \
+                    len(self.clients) >= self.max_connections:
+                self.rejected += 1
+                logging.warning("rejecting connection from %s, %s clients "
+                                "connected", address, len(self.clients))
+                return None
+            client = ClientStats(address, transport)
+            self.clients.append(client)
+            self.accepted += 1
+            return client
+
+    def unregister(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def timeout(self, client, pending):
+        '''
+        The read timeout is a deadline for the whole request, it starts
+        when the first bytes of a request are received and isn't extended
+        by further data.
+
+        Returns:
+            float: socket timeout in seconds, depending on whether a 
+            partial request has been received, or None for no timeout
+        '''
+        if not pending:
+            client.request_started = None
+            if client.subscribed:
+                return None
+            return self.idle_timeout or None
+
+        now = time.monotonic()
+        if client.request_started is None or \
+                client.request_frame != client.frames:
+            # a new request has been started
+            client.request_started = now
+            client.request_frame = client.frames
+        if not self.read_timeout:
+            return None
+        remaining = client.request_started + self.read_timeout - now
+        # an expired deadline times out the next receive immediately
+        return max(remaining, 0.001)
+
+    def timed_out(self, client, pending):
+        with self.lock:
+            self.timeouts += 1
+        if pending:
+            logging.info("closing connection from %s, request not "
+                         "completed in %ss", client.address,
+                         self.read_timeout)
+        else:
+            logging.info("closing idle connection from %s", client.address)
+
+    def spi_queue_limit(self):
+        '''
+        Returns:
+            int: SPI queue depth that stops reading requests, 0 if 
+            disabled. A limit that can't be reached with the connection
+            limit is reduced to half of the connection limit.
+        '''
+        limit = self.max_spi_queue
+        if limit and self.max_connections and \
+                limit >= self.max_connections:
+            limit = max(self.max_connections // 2, 1)
+        return limit
+
+    def spi_busy(self):
+        limit = self.spi_queue_limit()
+        return limit and SpiHandler.queue_depth() >= limit
+
+    def throttle(self, client):
+        '''
+        Wait until the SPI queue has room again. The client isn't read 
+        while waiting, TCP flow control slows it down.
+        '''
+        while self.spi_busy():
+            client.throttled += 1
+            time.sleep(BACKPRESSURE_DELAY)
+
+    def stats(self):
+        with self.lock:
+            clients = [client.as_dict() for client in self.clients]
+        return {
+            "maxConnections": self.max_connections,
+            "idleTimeout": self.idle_timeout,
+            "readTimeout": self.read_timeout,
+            "maxSpiQueue": self.spi_queue_limit(),
+            "spiQueueDepth": SpiHandler.queue_depth(),
+            "connected": len(clients),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "clients": clients,
+        }
@@ -0,0 +1,227 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import socket
+import threading
+import time
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.emulator import Adau145xEmulator
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.server.clients import ClientRegistry, ClientStats, \
+    DEFAULT_MAX_SPI_QUEUE
+from hifiberrydsp.server.constants import COMMAND_SUBSCRIBE, HEADER_SIZE
+from hifiberrydsp.server.sigmatcp import SigmaTCPHandler, SigmaTCPServer
+
+
+class Test(unittest.TestCase):
+
+    def testProcess(self):
+        saved_spi = SpiHandler.spi
+        SpiHandler.set_backend(Adau145xEmulator(transaction_latency=0.01))
+        try:
+            client = ClientStats(("127.0.0.1", 1234))
+
+            def process(frame, push):
+                return SpiHandler.read(0x10, 4)
+
+            self.assertEqual(client.process(process, b"request"), bytes(4))
+            self.assertEqual(client.frames, 1)
+            self.assertEqual(client.bytes_sent, 4)
+            self.assertGreaterEqual(client.spi_time, 0.009)
+            self.assertGreaterEqual(client.processing_time, client.spi_time)
+            self.assertEqual(client.as_dict()["address"], "127.0.0.1:1234")
+        finally:
+            SpiHandler.spi = saved_spi
+
+    def testRegistry(self):
+        clients = ClientRegistry(max_connections=2, idle_timeout=0,
+                                 read_timeout=5)
+        first = clients.register(("127.0.0.1", 1))
+        self.assertIsNotNone(clients.register(("127.0.0.1", 2)))
+        self.assertIsNone(clients.register(("127.0.0.1", 3)))
+        clients.unregister(first)
+        self.assertIsNotNone(clients.register(("127.0.0.1", 4)))
+
+        stats = clients.stats()
+        self.assertEqual(stats["connected"], 2)
+        self.assertEqual(stats["accepted"], 3)
+        self.assertEqual(stats["rejected"], 1)
+
+        client = ClientStats(("127.0.0.1", 5))
+        self.assertIsNone(clients.timeout(client, 0))
+        self.assertAlmostEqual(clients.timeout(client, 5), 5, places=2)
+
+        # the deadline isn't extended by more data of the same request
+        client.request_started -= 4
+        self.assertAlmostEqual(clients.timeout(client, 6), 1, places=2)
+        client.request_started -= 2
+        self.assertEqual(clients.timeout(client, 7), 0.001)
+
+        # it restarts for the next request
+        client.frames += 1
+        self.assertAlmostEqual(clients.timeout(client, 3), 5, places=2)
+
+    def testIdleTimeout(self):
+        clients = ClientRegistry()
+        self.assertGreater(clients.idle_timeout, 0)
+        client = clients.register(("127.0.0.1", 1))
+        self.assertEqual(clients.timeout(client, 0), clients.idle_timeout)
+
+        # a client that waits for notifications isn't idle
+        client.process(lambda frame, push: None,
+                       bytes([COMMAND_SUBSCRIBE]) + bytes(HEADER_SIZE - 1))
+        self.assertTrue(client.subscribed)
+        self.assertIsNone(clients.timeout(client, 0))
+
+    def testBackpressure(self):
+        # with the default limits, one job is executed and the jobs of 
+        # DEFAULT_MAX_SPI_QUEUE more clients are waiting
+        clients = ClientRegistry()
+        self.assertLess(clients.spi_queue_limit(), clients.max_connections)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking_job():
+            started.set()
+            release.wait(5)
+
+        threads = [threading.Thread(target=SpiHandler.submit,
+                                    args=(blocking_job,))]
+        threads[0].start()
+        try:
+            started.wait(5)
+            for _i in range(DEFAULT_MAX_SPI_QUEUE):
+                self.assertFalse(clients.spi_busy())
+                thread = threading.Thread(target=SpiHandler.submit,
+                                          args=(lambda: None,))
+                thread.start()
+                threads.append(thread)
+                while SpiHandler.queue_depth() < len(threads) - 1:
+                    time.sleep(0.001)
+            self.assertTrue(clients.spi_busy())
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertFalse(clients.spi_busy())
+
+        # a limit above the connection limit could never be reached
+        clients = ClientRegistry(max_connections=4, max_spi_queue=64)
+        self.assertEqual(clients.spi_queue_limit(), 2)
+        self.assertEqual(clients.stats()["maxSpiQueue"], 2)
+
+    def testServer(self):
+        saved_spi = SpiHandler.spi
+        saved_clients = SigmaTCPHandler.clients
+        SpiHandler.set_backend(Adau145xEmulator())
+        SigmaTCPHandler.clients = ClientRegistry(max_connections=2,
+                                                 read_timeout=0.2)
+        server = SigmaTCPServer(server_address=("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        try:
+            client = SigmaTCPClient(Adau145x(), "127.0.0.1", port=port)
+            client.read_memory(0x10, 4)
+            stats = client.server_stats()
+            self.assertEqual(stats["connected"], 1)
+            self.assertEqual(stats["clients"][0]["frames"], 2)
+            self.assertEqual(stats["clients"][0]["transport"], "tcp")
+
+            # a request that isn't completed in time closes the connection
+            partial = socket.create_connection(("127.0.0.1", port))
+            partial.settimeout(5)
+            partial.sendall(bytes([0x0a, 0, 0, 0]))
+            self.assertEqual(partial.recv(1), b"")
+            partial.close()
+
+            # sending single bytes doesn't extend the read timeout
+            request = SigmaTCPClient.write_request(0x10, bytes(1000))
+            slow = socket.create_connection(("127.0.0.1", port))
+            slow.settimeout(0.05)
+            slow.sendall(request[:HEADER_SIZE])
+            started = time.monotonic()
+            closed = False
+            while not closed and time.monotonic() - started < 2:
+                try:
+                    slow.sendall(bytes(1))
+                    closed = slow.recv(1) == b""
+                except socket.timeout:
+                    pass
+                except OSError:
+                    closed = True
+            self.assertTrue(closed)
+            self.assertLess(time.monotonic() - started, 1)
+            slow.close()
+
+            # the connection limit is reached
+            second = SigmaTCPClient(Adau145x(), "127.0.0.1", port=port)
+            second.read_memory(0x10, 4)
+            third = socket.create_connection(("127.0.0.1", port))
+            third.settimeout(5)
+            self.assertEqual(third.recv(1), b"")
+            third.close()
+
+            stats = client.server_stats()
+            self.assertEqual(stats["timeouts"], 2)
+            self.assertEqual(stats["rejected"], 1)
+            self.assertEqual(stats["connected"], 2)
+            client.disconnect()
+            second.disconnect()
+        finally:
+            server.shutdown()
+            server.server_close()
+            SigmaTCPHandler.clients = saved_clients
+            SpiHandler.spi = saved_spi
+
+    def testServerError(self):
+        saved_spi = SpiHandler.spi
+        saved_clients = SigmaTCPHandler.clients
+        SpiHandler.set_backend(Adau145xEmulator())
+        SigmaTCPHandler.clients = ClientRegistry(max_connections=1)
+        server = SigmaTCPServer(server_address=("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        try:
+            # invalid UTF-8 in the attribute name of a GET_META request
+            broken = socket.create_connection(("127.0.0.1", port))
+            broken.settimeout(5)
+            request = SigmaTCPClient.metadata_request("x")
+            request[-1] = 0xff
+            broken.sendall(request)
+            self.assertEqual(broken.recv(1), b"")
+            broken.close()
+
+            # the connection slot has been released
+            client = SigmaTCPClient(Adau145x(), "127.0.0.1", port=port)
+            self.assertEqual(client.server_stats()["connected"], 1)
+            client.disconnect()
+        finally:
+            server.shutdown()
+            server.server_close()
+            SigmaTCPHandler.clients = saved_clients
+            SpiHandler.spi = saved_spi
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,6 +42,38 @@ COMMAND_DATAMEM_RESPONSE = 0xfd
 COMMAND_GPIO = 0xfe
 COMMAND_GPIO_RESPONSE = 0xff
 
+# raw memory dumps, optionally limited to a range given by the start
+# address in bytes 10-11 and the number of words in bytes 6-9 of the header
+COMMAND_PROGMEM_BINARY = 0xe0
+COMMAND_PROGMEM_BINARY_RESPONSE = 0xe1
+COMMAND_DATAMEM_BINARY = 0xe2
+COMMAND_DATAMEM_BINARY_RESPONSE = 0xe3
+
+# multiple reads and writes in one request, the total length is in bytes
+# 1-4 and the number of operations in bytes 6-9 of the header. Each
+# operation starts with BATCH_OPERATION_SIZE bytes: COMMAND_READ or
+# COMMAND_WRITE, safeload flag, address (2 bytes), length (4 bytes),
+# followed by the data of a write
+COMMAND_BATCH = 0xe4
+COMMAND_BATCH_RESPONSE = 0xe5
+BATCH_OPERATION_SIZE = 8
+
+# watch cells for changes. The subscribe request has the total length in
+# bytes 1-4, the polling interval in ms in bytes 6-9 and the change 
+# threshold in bytes 10-13 of the header, followed by the address (2 bytes)
+# and length (2 bytes) of each cell. The response contains the 
+# subscription id in bytes 10-11 and the current values. Notifications are
+# sent without a request and contain address, length and data of all
+# changed cells.
+COMMAND_SUBSCRIBE = 0xe6
+COMMAND_SUBSCRIBE_RESPONSE = 0xe7
+COMMAND_NOTIFY = 0xe8
+COMMAND_UNSUBSCRIBE = 0xe9
+
+# connection and SPI statistics of the server as a JSON document
+COMMAND_STATS = 0xea
+COMMAND_STATS_RESPONSE = 0xeb
+
 GPIO_READ = 0
 GPIO_WRITE = 1
 
@@ -52,6 +84,9 @@ HEADER_SIZE = 14
 
 DEFAULT_PORT = 8086
 
+# Local clients connect through this Unix domain socket if it exists
+DEFAULT_UNIX_SOCKET = "/run/sigmatcp.sock"
+
 MAX_READ_SIZE = 1024 * 2
 
 ZEROCONF_TYPE = "_sigmatcp._tcp.local."
@@ -0,0 +1,225 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import logging
+
+from hifiberrydsp.server.constants import \
+    COMMAND_READ, COMMAND_WRITE, COMMAND_EEPROM_FILE, COMMAND_CHECKSUM, \
+    COMMAND_WRITE_EEPROM_CONTENT, COMMAND_XML, COMMAND_STORE_DATA, \
+    COMMAND_RESTORE_DATA, COMMAND_GET_META, COMMAND_PROGMEM, \
+    COMMAND_DATAMEM, COMMAND_GPIO, COMMAND_PROGMEM_BINARY, \
+    COMMAND_DATAMEM_BINARY, COMMAND_BATCH, COMMAND_SUBSCRIBE, \
+    COMMAND_UNSUBSCRIBE, COMMAND_STATS, HEADER_SIZE, SigmaTCPException
+
+# Initial size of the receive buffer. The buffer grows by at most this 
+# size per receive call.
+BUFFER_SIZE = 65536
+
+# Largest request that is accepted, the largest requests are EEPROM 
+# images written with COMMAND_WRITE_EEPROM_CONTENT
+MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+# Requests that consist of the header only
+HEADER_ONLY_COMMANDS = [COMMAND_CHECKSUM, COMMAND_XML, COMMAND_STORE_DATA,
+                        COMMAND_RESTORE_DATA, COMMAND_PROGMEM,
+                        COMMAND_DATAMEM, COMMAND_PROGMEM_BINARY,
+                        COMMAND_DATAMEM_BINARY, COMMAND_UNSUBSCRIBE,
+                        COMMAND_STATS]
+
+# Requests with the total length in bytes 1-4 of the header
+LENGTH_1_COMMANDS = [COMMAND_READ, COMMAND_GET_META, COMMAND_GPIO,
+                     COMMAND_BATCH, COMMAND_SUBSCRIBE]
+
+# Requests with the total length in bytes 3-6 of the header
+LENGTH_3_COMMANDS = [COMMAND_WRITE, COMMAND_WRITE_EEPROM_CONTENT]
+
+
+def frame_length(header):
+    '''
+    Get the length of a request from its header
+
+    Args:
+        header: at least HEADER_SIZE bytes starting with the command
+
+    Returns:
+        int: total length of the request in bytes including the header or
+        None if the command is unknown
+    '''
+    command = header[0]
+
+    if command in HEADER_ONLY_COMMANDS:
+        return HEADER_SIZE
+
+    if command in LENGTH_1_COMMANDS:
+        length = int.from_bytes(header[1:5], byteorder='big')
+    elif command in LENGTH_3_COMMANDS:
+        length = int.from_bytes(header[3:7], byteorder='big')
+        if length == 0 and command == COMMAND_WRITE:
+            # Client might not implement the total length correctly, use
+            # the data length instead
+            length = HEADER_SIZE + \
+                int.from_bytes(header[8:12], byteorder='big')
+    elif command == COMMAND_EEPROM_FILE:
+        length = HEADER_SIZE + header[1]
+    else:
+        return None
+
+    return max(length, HEADER_SIZE)
+
+
+class FrameTooLarge(SigmaTCPException):
+    '''
+    A request header announces more than the maximum frame size, the 
+    connection has to be closed
+    '''
+
+
+class FrameDecoder():
+    '''
+    Splits a stream of received data into SigmaTCP requests. 
+
+    Data is received directly into a preallocated buffer with recv_into()
+    or added with feed(). Complete requests are returned as memoryviews 
+    of this buffer, no data is copied. A memoryview is only valid until 
+    the next call of recv_into() or feed(). Before new data is received, 
+    the remainder of an incomplete request is moved to the start of the 
+    buffer. The buffer only grows if a single request is larger than the 
+    buffer, and only with the data that has actually been received. A 
+    header that announces a request larger than max_frame_size raises 
+    FrameTooLarge.
+    '''
+
+    def __init__(self, size=BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        # data between start and end hasn't been processed yet
+        self.start = 0
+        self.end = 0
+        self.skipped = 0
+
+    def free_space(self, needed=1):
+        '''
+        Make room for at least needed bytes after the unprocessed data
+
+        Returns:
+            memoryview: free space of the buffer
+        '''
+        unprocessed = self.end - self.start
+        if self.start > 0 and len(self.buffer) - self.end < needed:
+            self.buffer[0:unprocessed] = self.view[self.start:self.end]
+            self.start = 0
+            self.end = unprocessed
+
+        if len(self.buffer) - self.end < needed:
+            # create a new buffer, views of the old one stay valid
+            size = len(self.buffer)
+            while size - unprocessed < needed:
+                size *= 2
+            buffer = bytearray(size)
+            buffer[0:unprocessed] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+            self.start = 0
+            self.end = unprocessed
+
+        return self.view[self.end:]
+
+    def recv_into(self, sock):
+        '''
+        Receive data from a socket directly into the buffer
+
+        Returns:
+            int: number of bytes received, 0 if the connection was closed
+        '''
+        free = self.free_space(min(max(self.missing(), 1), BUFFER_SIZE))
+        received = sock.recv_into(free)
+        self.end += received
+        return received
+
+    def feed(self, data):
+        '''
+        Add received data
+
+        Returns:
+            list: complete requests as memoryviews
+        '''
+        free = self.free_space(len(data))
+        free[0:len(data)] = data
+        self.end += len(data)
+        return list(self.frames())
+
+    def frames(self):
+        '''
+        Iterate over the complete requests in the buffer
+        '''
+        while self.end - self.start >= HEADER_SIZE:
+            length = self.current_length()
+            if length is None:
+                # unknown command, e.g. the 0 byte some clients send after
+                # a file name, skip it
+                logging.debug("skipping unknown command %s",
+                              self.buffer[self.start])
+                self.skipped += 1
+                self.start += 1
+                continue
+
+            if self.end - self.start < length:
+                break
+
+            frame = self.view[self.start:self.start + length]
+            self.start += length
+            yield frame
+
+    def missing(self):
+        '''
+        Returns:
+            int: number of bytes that are missing to complete the current 
+            request
+        '''
+        available = self.end - self.start
+        if available < HEADER_SIZE:
+            return HEADER_SIZE - available
+        length = self.current_length()
+        if length is None:
+            return 1
+        return max(length - available, 0)
+
+    def current_length(self):
+        '''
+        Returns:
+            int: length of the request at the start of the unprocessed 
+            data or None if the command is unknown
+        '''
+        length = frame_length(self.view[self.start:self.start + HEADER_SIZE])
+        if length is not None and length > self.max_frame_size:
+            raise FrameTooLarge(
+                "request of {} bytes exceeds the maximum of {} bytes".format(
+                    length, self.max_frame_size))
+        return length
+
+    def pending(self):
+        '''
+        Returns:
+            int: number of buffered bytes that are not a complete request yet
+        '''
+        return self.end - self.start
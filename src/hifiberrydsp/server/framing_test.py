@@ -0,0 +1,132 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import socket
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.server.framing import FrameDecoder, FrameTooLarge, \
+    frame_length, BUFFER_SIZE
+from hifiberrydsp.server.constants import COMMAND_CHECKSUM, COMMAND_READ, \
+    HEADER_SIZE
+
+
+class Test(unittest.TestCase):
+
+    def testFrameLength(self):
+        self.assertEqual(frame_length(
+            SigmaTCPClient.write_request(0x100, bytes(20))), HEADER_SIZE + 20)
+        self.assertEqual(frame_length(
+            SigmaTCPClient.metadata_request("checksum")), HEADER_SIZE + 8)
+        self.assertEqual(frame_length(
+            SigmaTCPClient.generic_request(COMMAND_CHECKSUM)), HEADER_SIZE)
+        self.assertIsNone(frame_length(bytes(HEADER_SIZE)))
+
+    def testSplitAndMerged(self):
+        requests = [SigmaTCPClient.write_request(0x100 + i, bytes([i] * 4))
+                    for i in range(50)]
+        requests.append(SigmaTCPClient.metadata_request("volumeControl"))
+        stream = b"".join(requests)
+
+        # many requests in one chunk
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(stream), requests)
+        self.assertEqual(decoder.pending(), 0)
+
+        # byte by byte into a small buffer, views are only valid until the
+        # next call of feed()
+        decoder = FrameDecoder(size=32)
+        frames = []
+        for i in range(len(stream)):
+            frames += [bytes(f) for f in decoder.feed(stream[i:i + 1])]
+        self.assertEqual(frames, requests)
+
+    def testRecvInto(self):
+        large = SigmaTCPClient.write_request(0x100, bytes(range(256)) * 40)
+        small = SigmaTCPClient.write_request(0x200, bytes(4))
+        (reader, writer) = socket.socketpair()
+        try:
+            writer.sendall(small + large + small)
+            writer.close()
+
+            decoder = FrameDecoder(size=64)
+            frames = []
+            while decoder.recv_into(reader) > 0:
+                frames += [bytes(f) for f in decoder.frames()]
+            self.assertEqual(frames, [small, large, small])
+            self.assertEqual(decoder.pending(), 0)
+        finally:
+            reader.close()
+
+    def testFrameTooLarge(self):
+        header = bytearray(HEADER_SIZE)
+        header[0] = COMMAND_READ
+        header[1:5] = (0xffffffff).to_bytes(4, byteorder='big')
+
+        decoder = FrameDecoder()
+        with self.assertRaises(FrameTooLarge):
+            decoder.feed(header)
+
+        (reader, writer) = socket.socketpair()
+        try:
+            writer.sendall(header)
+            decoder = FrameDecoder()
+            decoder.recv_into(reader)
+            with self.assertRaises(FrameTooLarge):
+                list(decoder.frames())
+            with self.assertRaises(FrameTooLarge):
+                decoder.recv_into(reader)
+        finally:
+            reader.close()
+            writer.close()
+
+    def testGrowWithReceivedData(self):
+        # a request below the limit only grows the buffer with the data 
+        # that has been received
+        header = bytearray(HEADER_SIZE)
+        header[0] = COMMAND_READ
+        header[1:5] = (0x06000000).to_bytes(4, byteorder='big')
+        (reader, writer) = socket.socketpair()
+        try:
+            writer.sendall(header + bytes(100))
+            decoder = FrameDecoder(max_frame_size=0x10000000)
+            decoder.recv_into(reader)
+            self.assertEqual(list(decoder.frames()), [])
+            writer.sendall(bytes(100))
+            decoder.recv_into(reader)
+            self.assertLessEqual(len(decoder.buffer), 2 * BUFFER_SIZE)
+        finally:
+            reader.close()
+            writer.close()
+
+    def testSkipUnknown(self):
+        filename_request = SigmaTCPClient.write_eeprom_file_request("/a.xml")
+        checksum_request = SigmaTCPClient.generic_request(COMMAND_CHECKSUM)
+
+        decoder = FrameDecoder()
+        frames = decoder.feed(filename_request + checksum_request)
+        # the 0 byte after the file name is not part of a request
+        self.assertEqual(frames, [filename_request[:-1], checksum_request])
+        self.assertEqual(decoder.skipped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,15 +22,17 @@ SOFTWARE.
 
 import socket
 import time
+import json
 import os
 import sys
 import logging
 import hashlib
 import argparse
 
-from threading import Thread
+from threading import Thread, Lock, current_thread
 
-from socketserver import BaseRequestHandler, TCPServer, ThreadingMixIn
+from socketserver import BaseRequestHandler, TCPServer, ThreadingMixIn, \
+    UnixStreamServer
 
 # from zeroconf import ServiceInfo, Zeroconf
 import xmltodict
@@ -47,6 +49,14 @@ from hifiberrydsp.alsa.alsasync import AlsaSync
 from hifiberrydsp.lg.soundsync import SoundSync
 from hifiberrydsp import datatools
 
+from hifiberrydsp.parser.profilecatalog import get_profile_catalog, \
+    read_profile_metadata
+from hifiberrydsp.server.framing import FrameDecoder, FrameTooLarge
+from hifiberrydsp.server.asyncserver import remove_stale_socket
+from hifiberrydsp.server.watch import RegisterWatcher, NotificationQueue
+from hifiberrydsp.server.clients import ClientRegistry, \
+    DEFAULT_MAX_CONNECTIONS, DEFAULT_IDLE_TIMEOUT, DEFAULT_READ_TIMEOUT, \
+    DEFAULT_MAX_SPI_QUEUE
 from hifiberrydsp.server.constants import \
     COMMAND_READ, COMMAND_READRESPONSE, COMMAND_WRITE, \
     COMMAND_EEPROM_FILE, COMMAND_CHECKSUM, COMMAND_CHECKSUM_RESPONSE, \
@@ -54,9 +64,14 @@ from hifiberrydsp.server.constants import \
     COMMAND_STORE_DATA, COMMAND_RESTORE_DATA, COMMAND_GET_META, \
     COMMAND_META_RESPONSE, COMMAND_PROGMEM, COMMAND_PROGMEM_RESPONSE, \
     COMMAND_DATAMEM, COMMAND_DATAMEM_RESPONSE, \
+    COMMAND_PROGMEM_BINARY, COMMAND_PROGMEM_BINARY_RESPONSE, \
+    COMMAND_DATAMEM_BINARY, COMMAND_DATAMEM_BINARY_RESPONSE, \
+    COMMAND_BATCH, COMMAND_BATCH_RESPONSE, BATCH_OPERATION_SIZE, \
+    COMMAND_SUBSCRIBE, COMMAND_SUBSCRIBE_RESPONSE, COMMAND_NOTIFY, \
+    COMMAND_UNSUBSCRIBE, COMMAND_STATS, COMMAND_STATS_RESPONSE, \
     COMMAND_GPIO, \
     HEADER_SIZE, \
-    DEFAULT_PORT
+    DEFAULT_PORT, DEFAULT_UNIX_SOCKET
 from hifiberrydsp.api.restapi import run_api  # Import the REST API server
 from hifiberrydsp.api.settings_store import SettingsStore
 from hifiberrydsp.filtering.biquad import Biquad
@@ -117,6 +132,16 @@ def find_and_restore_dsp_profile():
     """
     try:
         current_profile_path = dspprogramfile()
+
+        # A single snapshot of the program memory provides the checksums
+        # for the validation and the profile search
+        snapshot = adau145x.Adau145x.get_program_snapshot(refresh=True)
+        if snapshot is not None:
+            dsp_checksum_md5_sig = snapshot.checksum("signature", "md5")
+            dsp_checksum_sha1_len = snapshot.checksum("length", "sha1")
+        else:
+            dsp_checksum_md5_sig = None
+            dsp_checksum_sha1_len = None
         
         # Check if current profile exists and has correct checksum
         profile_valid = False
@@ -127,21 +152,15 @@ def find_and_restore_dsp_profile():
                 # XML metadata uses two different algorithms:
                 #   "checksum"      → signature-mode MD5
                 #   "checksum_sha1" → length-mode  SHA-1
-                # Compute both modes from the live DSP and compare each
-                # against the matching XML field.
-                sig_checksums = adau145x.Adau145x.calculate_program_checksums(
-                    mode="signature", algorithms=["md5"], cached=False) or {}
-                len_checksums = adau145x.Adau145x.calculate_program_checksums(
-                    mode="length", algorithms=["sha1"], cached=False) or {}
-
-                dsp_checksum_md5_sig = sig_checksums.get("md5")
-                dsp_checksum_sha1_len = len_checksums.get("sha1")
-
+                # Compare both modes from the live DSP against the matching
+                # XML field.
                 if dsp_checksum_md5_sig or dsp_checksum_sha1_len:
                     try:
-                        xml_profile = XmlProfile(current_profile_path)
+                        # only the metadata is needed
+                        xml_profile = read_profile_metadata(
+                            current_profile_path)
 
-                        profile_checksum_sha1 = xml_profile.get_meta("checksum_sha1")
+                        profile_checksum_sha1 = xml_profile.get("checksum_sha1")
                         if profile_checksum_sha1 and dsp_checksum_sha1_len:
                             if profile_checksum_sha1.upper() == dsp_checksum_sha1_len.upper():
                                 profile_valid = True
@@ -150,7 +169,7 @@ def find_and_restore_dsp_profile():
                                 )
 
                         if not profile_valid:
-                            profile_checksum_md5 = xml_profile.get_meta("checksum")
+                            profile_checksum_md5 = xml_profile.get("checksum")
                             if profile_checksum_md5 and dsp_checksum_md5_sig:
                                 if profile_checksum_md5.upper() == dsp_checksum_md5_sig.upper():
                                     profile_valid = True
@@ -188,15 +207,10 @@ def find_and_restore_dsp_profile():
             logging.warning(f"DSP profiles directory not found: {DSP_PROFILES_DIRECTORY}")
             return False
             
-        # Compute both modes from the DSP so we can match either of the
+        # Use both modes from the DSP so we can match either of the
         # two algorithms the XMLs may carry.
-        sig_checksums = adau145x.Adau145x.calculate_program_checksums(
-            mode="signature", algorithms=["md5"], cached=False) or {}
-        len_checksums = adau145x.Adau145x.calculate_program_checksums(
-            mode="length", algorithms=["sha1"], cached=False) or {}
-
-        target_checksum_md5 = sig_checksums.get("md5")    # XML: "checksum"
-        target_checksum_sha1 = len_checksums.get("sha1")  # XML: "checksum_sha1"
+        target_checksum_md5 = dsp_checksum_md5_sig     # XML: "checksum"
+        target_checksum_sha1 = dsp_checksum_sha1_len   # XML: "checksum_sha1"
 
         if target_checksum_sha1:
             logging.info(f"Searching for DSP profile with length-mode SHA-1: {target_checksum_sha1}")
@@ -206,34 +220,14 @@ def find_and_restore_dsp_profile():
             logging.warning("No valid checksums available for profile search")
             return False
 
-        # Search for matching profile in profiles directory
-        found_profile = None
+        # Search for matching profile in the catalog of the profiles 
+        # directory, only new or changed profiles are read
         try:
-            for filename in os.listdir(DSP_PROFILES_DIRECTORY):
-                if filename.endswith('.xml'):
-                    profile_path = os.path.join(DSP_PROFILES_DIRECTORY, filename)
-                    try:
-                        xml_profile = XmlProfile(profile_path)
-
-                        # XML "checksum_sha1" is length-mode SHA-1
-                        profile_checksum_sha1 = xml_profile.get_meta("checksum_sha1")
-                        if profile_checksum_sha1 and target_checksum_sha1:
-                            if profile_checksum_sha1.upper() == target_checksum_sha1.upper():
-                                found_profile = profile_path
-                                logging.info(f"Found matching DSP profile (length-mode SHA-1): {filename}")
-                                break
-
-                        # XML "checksum" is signature-mode MD5
-                        profile_checksum_md5 = xml_profile.get_meta("checksum")
-                        if profile_checksum_md5 and target_checksum_md5:
-                            if profile_checksum_md5.upper() == target_checksum_md5.upper():
-                                found_profile = profile_path
-                                logging.info(f"Found matching DSP profile (signature-mode MD5): {filename}")
-                                break
-
-                    except Exception as e:
-                        logging.debug(f"Error checking profile {filename}: {str(e)}")
-                        continue
+            catalog = get_profile_catalog(DSP_PROFILES_DIRECTORY)
+            found_profile = catalog.find(checksum=target_checksum_md5,
+                                         checksum_sha1=target_checksum_sha1)
+            if found_profile:
+                logging.info(f"Found matching DSP profile: {os.path.basename(found_profile)}")
         except Exception as e:
             logging.error(f"Error searching profiles directory: {str(e)}")
             return False
@@ -276,9 +270,19 @@ class SigmaTCPHandler(BaseRequestHandler):
     lgsoundsync = None
     updating = False
     xml = None
+    # program generation the XML profile has been checked against
+    xml_generation = None
     checksum_error = False
     autoload_filters = True  # Default to True, can be disabled via command line
     debug_memory_writes = False  # Debug logging for memory writes
+    watcher = None
+    watcher_lock = Lock()
+    meta_responses = {}
+    # program generation of the cached responses
+    meta_generation = None
+    meta_lock = Lock()
+    capture = None
+    clients = ClientRegistry()
 
     def __init__(self, request, client_address, server):
         logging.debug("__init__")
@@ -292,196 +296,233 @@ class SigmaTCPHandler(BaseRequestHandler):
 
     def handle(self):
         logging.debug('handle')
-        finished = False
-        data = None
-        read_more = False
-
-        while not(finished):
-            # Read dara
-            try:
-                buffer = None
-                result = None
+        clients = SigmaTCPHandler.clients
+        if isinstance(self.client_address, tuple):
+            client = clients.register(self.client_address, "tcp")
+        else:
+            client = clients.register("local", "unix")
+        if client is None:
+            return
 
-                if data is None:
-                    data = self.request.recv(65536)
-                    if len(data) == 0:
-                        finished = True
-                        continue
+        decoder = FrameDecoder()
 
-                if read_more:
-                    logging.debug("waiting for more data")
-                    d2 = self.request.recv(65536)
-                    if (len(d2) == 0):
-                        time.sleep(0.1)
-                    data = data + d2
-                    read_more = False
-
-                # Not an expected header?
-                if len(data) > 0 and len(data) < 14:
-                    read_more = True
-                    continue
-
-                logging.debug("received request type %s", data[0])
-
-                if data[0] == COMMAND_READ:
-                    command_length = int.from_bytes(
-                        data[1:5], byteorder='big')
-                    if (command_length > 0) and (len(data) < command_length):
-                        read_more = True
-                        logging.debug(
-                            "Expect %s bytes from header information (read), but have only %s",
-                            command_length, len(data))
-                        continue
+        send_lock = Lock()
 
-                    result = self.handle_read(data)
+        def send(data):
+            with send_lock:
+                self.request.sendall(data)
 
-                elif data[0] == COMMAND_WRITE:
-                    command_length = int.from_bytes(
-                        data[3:7], byteorder='big')
+        # notifications from the watcher thread are queued, a client that
+        # doesn't read must not block the watcher
+        handler_thread = current_thread()
+        notifications = NotificationQueue(send)
 
-                    logging.debug("Len (data, header info): %s %s",
-                                  len(data), command_length)
+        def push(data):
+            if current_thread() is handler_thread:
+                send(data)
+            else:
+                notifications.push(data)
 
-                    if command_length < len(data):
-                        buffer = data[command_length:]
-                        data = data[0:command_length]
+        try:
+            while True:
+                try:
+                    clients.throttle(client)
+                    self.request.settimeout(
+                        clients.timeout(client, decoder.pending()))
+                    received = decoder.recv_into(self.request)
+                    if received == 0:
+                        break
+                    client.received(received)
+
+                    for frame in decoder.frames():
+                        result = client.process(self.process_frame, frame,
+                                                push)
+                        if (result is not None) and (len(result) > 0):
+                            logging.debug(
+                                "Sending %s bytes answer to client",
+                                len(result))
+                            push(result)
+
+                except socket.timeout:
+                    clients.timed_out(client, decoder.pending())
+                    break
+                except ConnectionResetError:
+                    break
+                except BrokenPipeError:
+                    break
+                except FrameTooLarge as e:
+                    logging.warning("closing connection from %s: %s",
+                                    client.address, e)
+                    break
+                except Exception as e:
+                    logging.error("closing connection from %s after "
+                                  "error: %s", client.address, e)
+                    break
+        finally:
+            clients.unregister(client)
+            SigmaTCPHandler.connection_closed(push)
+            notifications.close()
 
-                    if (command_length > 0) and (len(data) < command_length):
-                        read_more = True
-                        logging.debug(
-                            "Expect %s bytes from header information (write), but have only %s",
-                            command_length, len(data))
-                        continue
+    @staticmethod
+    def connection_closed(push):
+        '''
+        Remove the subscriptions of a connection
+        '''
+        if SigmaTCPHandler.capture is not None:
+            SigmaTCPHandler.capture.connection_closed(push)
+        if SigmaTCPHandler.watcher is not None:
+            SigmaTCPHandler.watcher.remove_owner(push)
 
-                    self.handle_write(data)
-                    result = None
+    @staticmethod
+    def get_watcher():
+        with SigmaTCPHandler.watcher_lock:
+            if SigmaTCPHandler.watcher is None:
+                watcher = RegisterWatcher()
+                watcher.start()
+                SigmaTCPHandler.watcher = watcher
+        return SigmaTCPHandler.watcher
 
-                elif data[0] == COMMAND_EEPROM_FILE:
-                    filename_length = data[1]
-                    filename = "".join(map(chr, data[14:14 + filename_length]))
-                    result = self.write_eeprom_file(filename)
+    @staticmethod
+    def process_frame(data, push=None):
+        '''
+        Process a single complete request
 
-                elif data[0] == COMMAND_STORE_DATA:
-                    self.save_data_memory()
+        Args:
+            data: request including the header, usually a memoryview of 
+                the receive buffer, see FrameDecoder
+            push: thread-safe function that sends data to the client, 
+                used for notifications of subscriptions
 
-                elif data[0] == COMMAND_RESTORE_DATA:
-                    self.restore_data_memory()
+        Returns:
+            bytes: response to send to the client or None
+        '''
+        logging.debug("received request type %s", data[0])
+        if SigmaTCPHandler.capture is not None:
+            SigmaTCPHandler.capture.record(data, push)
+        result = None
 
-                elif data[0] == COMMAND_CHECKSUM:
-                    result = self._response_packet(
-                        COMMAND_CHECKSUM_RESPONSE, 0, 16) + \
-                        self.program_checksum(cached=False)
+        if data[0] == COMMAND_READ:
+            result = SigmaTCPHandler.handle_read(data)
 
-                elif data[0] == COMMAND_XML:
-                    try:
-                        data = self.get_and_check_xml()
+        elif data[0] == COMMAND_WRITE:
+            SigmaTCPHandler.handle_write(data)
 
-                    except IOError as e:
-                        logging.debug("IOerror when reading XML file: %s", e)
-                        data = None
-                    except Exception as e:
-                        logging.debug("Unexpected error when reading XML file: %s", e)
-                        logging.exception(e)
-                        data = None
-
-                    if data is not None:
-                        xml_bytes = data.encode()
-                        result = self._response_packet(
-                            COMMAND_XML_RESPONSE, 0, len(data)) + xml_bytes
-                    else:
-                        result = self._response_packet(
-                            COMMAND_XML_RESPONSE, 0, 0)
-
-                elif data[0] == COMMAND_PROGMEM:
-                    try:
-                        data = self.get_program_memory()
-                    except IOError:
-                        data = []  # empty response
+        elif data[0] == COMMAND_BATCH:
+            result = SigmaTCPHandler.handle_batch(data)
 
-                    # format program memory dump
-                    dump = ""
-                    for i in range(0, len(data), 4):
-                        dump += "{:02X}{:02X}{:02X}{:02X}\n".format(
-                            data[i], data[i + 1], data[i + 2], data[i + 3])
+        elif data[0] == COMMAND_SUBSCRIBE:
+            result = SigmaTCPHandler.handle_subscribe(data, push)
 
-                    result = self._response_packet(
-                        COMMAND_PROGMEM_RESPONSE, 0, len(dump)) + \
-                        dump.encode('ascii')
+        elif data[0] == COMMAND_STATS:
+            stats = json.dumps(SigmaTCPHandler.clients.stats()).encode()
+            result = SigmaTCPHandler._response_packet(
+                COMMAND_STATS_RESPONSE, 0, len(stats)) + stats
 
-                elif data[0] == COMMAND_GPIO:
-                    logging.error("GPIO command not yet implemented")
+        elif data[0] == COMMAND_UNSUBSCRIBE:
+            sid = int.from_bytes(data[10:12], byteorder='big')
+            if SigmaTCPHandler.watcher is not None:
+                SigmaTCPHandler.watcher.unsubscribe(sid, push)
 
-                elif data[0] == COMMAND_DATAMEM:
-                    try:
-                        data = self.get_data_memory()
-                    except IOError:
-                        data = []  # empty response
+        elif data[0] == COMMAND_EEPROM_FILE:
+            filename_length = data[1]
+            filename = "".join(map(chr, data[14:14 + filename_length]))
+            result = SigmaTCPHandler.write_eeprom_file(filename)
 
-                    # format program memory dump
-                    dump = ""
-                    for i in range(0, len(data), 4):
-                        dump += "{:02X}{:02X}{:02X}{:02X}\n".format(
-                            data[i], data[i + 1], data[i + 2], data[i + 3])
+        elif data[0] == COMMAND_STORE_DATA:
+            SigmaTCPHandler.save_data_memory()
 
-                    result = self._response_packet(
-                        COMMAND_DATAMEM_RESPONSE, 0, len(dump)) + \
-                        dump.encode('ascii')
+        elif data[0] == COMMAND_RESTORE_DATA:
+            SigmaTCPHandler.restore_data_memory()
 
-                elif data[0] == COMMAND_GET_META:
-                    length = int.from_bytes(data[1:5], byteorder='big')
+        elif data[0] == COMMAND_CHECKSUM:
+            result = SigmaTCPHandler._response_packet(
+                COMMAND_CHECKSUM_RESPONSE, 0, 16) + \
+                SigmaTCPHandler.program_checksum(cached=False)
 
-                    if length < len(data):
-                        buffer = data[command_length:]
-                        data = data[0:command_length]
+        elif data[0] == COMMAND_XML:
+            try:
+                xml = SigmaTCPHandler.get_and_check_xml()
 
-                    attribute = data[14:length].decode("utf-8")
-                    value = self.get_meta(attribute)
-                    logging.debug("metadata request for %s = %s",
-                                  attribute, value)
+            except IOError as e:
+                logging.debug("IOerror when reading XML file: %s", e)
+                xml = None
+            except Exception as e:
+                logging.debug("Unexpected error when reading XML file: %s", e)
+                logging.exception(e)
+                xml = None
 
-                    if value is None:
-                        value = ""
+            if xml is not None:
+                xml_bytes = xml.encode()
+                result = SigmaTCPHandler._response_packet(
+                    COMMAND_XML_RESPONSE, 0, len(xml)) + xml_bytes
+            else:
+                result = SigmaTCPHandler._response_packet(
+                    COMMAND_XML_RESPONSE, 0, 0)
 
-                    value = value.encode('utf-8')
+        elif data[0] == COMMAND_PROGMEM:
+            try:
+                memory = SigmaTCPHandler.get_program_memory()
+            except IOError:
+                memory = []  # empty response
 
-                    result = self._response_packet(
-                        COMMAND_META_RESPONSE, 0, len(value))
-                    result += value
+            dump = SigmaTCPHandler.format_memory_dump(memory)
+            result = SigmaTCPHandler._response_packet(
+                COMMAND_PROGMEM_RESPONSE, 0, len(dump)) + dump
 
-                elif data[0] == COMMAND_WRITE_EEPROM_CONTENT:
-                    command_length = int.from_bytes(
-                        data[3:7], byteorder='big')
+        elif data[0] == COMMAND_GPIO:
+            logging.error("GPIO command not yet implemented")
 
-                    logging.debug("Len (data, header info): %s %s",
-                                  len(data), command_length)
+        elif data[0] == COMMAND_DATAMEM:
+            try:
+                memory = SigmaTCPHandler.get_data_memory()
+            except IOError:
+                memory = []  # empty response
+
+            dump = SigmaTCPHandler.format_memory_dump(memory)
+            result = SigmaTCPHandler._response_packet(
+                COMMAND_DATAMEM_RESPONSE, 0, len(dump)) + dump
+
+        elif data[0] in [COMMAND_PROGMEM_BINARY, COMMAND_DATAMEM_BINARY]:
+            start = int.from_bytes(data[10:12], byteorder='big')
+            length = int.from_bytes(data[6:10], byteorder='big')
+            if data[0] == COMMAND_PROGMEM_BINARY:
+                response_code = COMMAND_PROGMEM_BINARY_RESPONSE
+                program = True
+            else:
+                response_code = COMMAND_DATAMEM_BINARY_RESPONSE
+                program = False
 
-                    if command_length < len(data):
-                        buffer = data[command_length:]
-                        data = data[0:command_length]
+            try:
+                memory = SigmaTCPHandler.get_memory_range(program,
+                                                          start, length)
+            except IOError:
+                memory = None
 
-                    if (command_length > 0) and (len(data) < command_length):
-                        read_more = True
-                        logging.debug(
-                            "Expect %s bytes from header information (write), but have only %s", command_length, len(data))
-                        continue
+            if memory is None:
+                memory = b''  # empty response
+            result = SigmaTCPHandler._response_packet(
+                response_code, start, len(memory)) + bytes(memory)
 
-                    result = self.write_eeprom_content(data[14:command_length])
+        elif data[0] == COMMAND_GET_META:
+            length = int.from_bytes(data[1:5], byteorder='big')
+            attribute = bytes(data[14:length]).decode("utf-8")
+            result = SigmaTCPHandler.meta_response(attribute)
 
-                if (result is not None) and (len(result) > 0):
-                    logging.debug(
-                        "Sending %s bytes answer to client", len(result))
-                    self.request.send(result)
+        elif data[0] == COMMAND_WRITE_EEPROM_CONTENT:
+            command_length = int.from_bytes(data[3:7], byteorder='big')
+            result = SigmaTCPHandler.write_eeprom_content(
+                bytes(data[14:command_length]))
 
-                # Still got data that hasn't been processed?
-                if buffer is not None:
-                    data = buffer
-                else:
-                    data = None
+        return result
 
-            except ConnectionResetError:
-                finished = True
-            except BrokenPipeError:
-                finished = True
+    @staticmethod
+    def format_memory_dump(data):
+        '''
+        Format a memory dump as one hex encoded 32 bit word per line
+        '''
+        if data is None:
+            data = []
+        return datatools.memory_dump(data).encode('ascii')
 
     @staticmethod
     def read_xml_profile():
@@ -504,15 +545,17 @@ class SigmaTCPHandler(BaseRequestHandler):
         # only carry one of the two metadata entries (older profile files
         # that pre-date the dual-checksum scheme will only have "checksum",
         # which still works).
-        try:
-            sig_checksums = adau145x.Adau145x.calculate_program_checksums(mode="signature", algorithms=["md5"], cached=True)
-        except Exception as e:
-            logging.error(f"Error calculating signature-mode checksum: {str(e)}")
+        # Both modes come from the same program snapshot, which is shared
+        # with the checksum commands
+        snapshot = adau145x.Adau145x.get_program_snapshot()
+        SigmaTCPHandler.xml_generation = \
+            adau145x.Adau145x.program_generation()
+        if snapshot is not None:
+            sig_checksums = snapshot.checksums.get("signature", {})
+            len_checksums = snapshot.checksums.get("length", {})
+        else:
+            logging.error("Error calculating program checksums")
             sig_checksums = {}
-        try:
-            len_checksums = adau145x.Adau145x.calculate_program_checksums(mode="length", algorithms=["sha1"], cached=True)
-        except Exception as e:
-            logging.error(f"Error calculating length-mode checksum: {str(e)}")
             len_checksums = {}
 
         memory_checksum_md5 = sig_checksums.get("md5") if sig_checksums else None
@@ -562,10 +605,12 @@ class SigmaTCPHandler(BaseRequestHandler):
 
     @staticmethod
     def get_checked_xml():
-        if not(SigmaTCPHandler.checksum_error):
-            if SigmaTCPHandler.xml is None:
-                SigmaTCPHandler.read_xml_profile()
+        if SigmaTCPHandler.xml is None or SigmaTCPHandler.xml_generation != \
+                adau145x.Adau145x.program_generation():
+            # the program changed, check the profile again
+            SigmaTCPHandler.read_xml_profile()
 
+        if not(SigmaTCPHandler.checksum_error):
             return SigmaTCPHandler.xml
         else:
             logging.debug("XML checksum error, ignoring XML file")
@@ -575,6 +620,44 @@ class SigmaTCPHandler(BaseRequestHandler):
     def get_and_check_xml():
         return str(SigmaTCPHandler.get_checked_xml())
 
+    @staticmethod
+    def meta_response(attribute):
+        '''
+        Response to a metadata request. Responses are cached until the
+        DSP program changes.
+        '''
+        generation = adau145x.Adau145x.program_generation()
+        with SigmaTCPHandler.meta_lock:
+            if SigmaTCPHandler.meta_generation != generation:
+                SigmaTCPHandler.meta_responses = {}
+                SigmaTCPHandler.meta_generation = generation
+            result = SigmaTCPHandler.meta_responses.get(attribute)
+        if result is not None:
+            return result
+
+        value = SigmaTCPHandler.get_meta(attribute)
+        logging.debug("metadata request for %s = %s", attribute, value)
+
+        if value is None:
+            value = ""
+
+        value = value.encode('utf-8')
+
+        result = SigmaTCPHandler._response_packet(
+            COMMAND_META_RESPONSE, 0, len(value)) + value
+
+        with SigmaTCPHandler.meta_lock:
+            # don't cache values read before the program changed
+            if generation == SigmaTCPHandler.meta_generation and \
+                    generation == adau145x.Adau145x.program_generation():
+                SigmaTCPHandler.meta_responses[attribute] = result
+        return result
+
+    @staticmethod
+    def clear_meta_cache():
+        with SigmaTCPHandler.meta_lock:
+            SigmaTCPHandler.meta_responses = {}
+
     @staticmethod
     def get_meta(attribute):
         if attribute=="detected_dsp":
@@ -617,13 +700,11 @@ class SigmaTCPHandler(BaseRequestHandler):
             return None
 
         addr = int.from_bytes(data[12:14], byteorder='big')
-        length = int.from_bytes(data[8:12], byteorder='big')
-        if (length == 0):
-            # Client might not implement length correctly and leave
-            # it empty
-            length = len(data) - 14
+        return SigmaTCPHandler.write_data(addr, data[14:], data[1])
 
-        _safeload = data[1]  # TODO: use this
+    @staticmethod
+    def write_data(addr, memdata, safeload=False):
+        length = len(memdata)
 
         if addr == SigmaTCPHandler.dsp.KILLCORE_REGISTER and not(SigmaTCPHandler.updating):
             logging.debug(
@@ -632,9 +713,6 @@ class SigmaTCPHandler(BaseRequestHandler):
 
         logging.debug("writing {} bytes to {}".format(length, addr))
         
-        # Extract memory data first
-        memdata = data[14:]
-        
         # Debug logging for memory writes if enabled
         if SigmaTCPHandler.debug_memory_writes:
             logging.info(f"DEBUG: Memory write to address 0x{addr:04X} ({addr}), length: {length} bytes")
@@ -645,7 +723,10 @@ class SigmaTCPHandler(BaseRequestHandler):
                 hex_data = ' '.join(f'{b:02X}' for b in memdata[:16])
                 logging.info(f"DEBUG: Write data (first 16 bytes): {hex_data}...")
         
-        res = adau145x.Adau145x.write_memory(addr, memdata)
+        if safeload:
+            res = adau145x.Adau145x.safeload_write(addr, memdata)
+        else:
+            res = adau145x.Adau145x.write_memory(addr, memdata)
 
         if addr == SigmaTCPHandler.dsp.HIBERNATE_REGISTER and \
                 SigmaTCPHandler.updating and memdata == b'\00\00':
@@ -655,6 +736,124 @@ class SigmaTCPHandler(BaseRequestHandler):
 
         return res
 
+    @staticmethod
+    def parse_batch(data):
+        '''
+        Split a batch request into its operations
+
+        Returns:
+            list: (command, safeload, addr, length, data) tuples or None if
+            the request is malformed
+        '''
+        total_length = int.from_bytes(data[1:5], byteorder='big')
+        count = int.from_bytes(data[6:10], byteorder='big')
+        operations = []
+        pos = HEADER_SIZE
+        for _i in range(count):
+            if pos + BATCH_OPERATION_SIZE > total_length:
+                return None
+            command = data[pos]
+            safeload = data[pos + 1] != 0
+            addr = int.from_bytes(data[pos + 2:pos + 4], byteorder='big')
+            length = int.from_bytes(data[pos + 4:pos + 8], byteorder='big')
+            pos += BATCH_OPERATION_SIZE
+
+            if command == COMMAND_WRITE:
+                if pos + length > total_length:
+                    return None
+                operations.append((command, safeload, addr, length,
+                                   bytes(data[pos:pos + length])))
+                pos += length
+            elif command == COMMAND_READ:
+                operations.append((command, safeload, addr, length, None))
+            else:
+                return None
+
+        return operations
+
+    @staticmethod
+    def handle_batch(data):
+        '''
+        Execute the reads and writes of a batch request in order. Memory 
+        writes are coalesced to as few SPI bursts as possible, they are
+        written before the next read or register write. If any write 
+        requests safeload, all memory writes of the batch use safeload.
+
+        Returns:
+            bytes: response with the data of all reads
+        '''
+        operations = SigmaTCPHandler.parse_batch(data)
+        if operations is None:
+            logging.error("got malformed batch request, ignoring it")
+            return SigmaTCPHandler._response_packet(COMMAND_BATCH_RESPONSE,
+                                                    0, 0)
+
+        safeload = any(op[1] for op in operations if op[0] == COMMAND_WRITE)
+        logging.debug("batch with %s operations", len(operations))
+
+        result = bytearray()
+        with adau145x.Adau145x.batch(safeload=safeload):
+            for (command, _safeload, addr, length, memdata) in operations:
+                if command == COMMAND_WRITE:
+                    SigmaTCPHandler.write_data(addr, memdata)
+                else:
+                    result += adau145x.Adau145x.read_memory(addr, length)
+
+        return SigmaTCPHandler._response_packet(
+            COMMAND_BATCH_RESPONSE, 0, len(result)) + result
+
+    @staticmethod
+    def handle_subscribe(data, push):
+        '''
+        Subscribe to changes of a list of cells. The response is sent 
+        directly, it has to arrive at the client before the first
+        notification.
+
+        Returns:
+            bytes: response if the subscription failed, None otherwise
+        '''
+        total_length = int.from_bytes(data[1:5], byteorder='big')
+        interval = int.from_bytes(data[6:10], byteorder='big') / 1000
+        threshold = int.from_bytes(data[10:14], byteorder='big')
+        cells = []
+        for pos in range(HEADER_SIZE, total_length - 3, 4):
+            cells.append((int.from_bytes(data[pos:pos + 2], byteorder='big'),
+                          int.from_bytes(data[pos + 2:pos + 4],
+                                         byteorder='big')))
+
+        if push is None or len(cells) == 0:
+            logging.error("can't subscribe, no cells or connection")
+            return SigmaTCPHandler._response_packet(
+                COMMAND_SUBSCRIBE_RESPONSE, 0, 0)
+
+        def notify(subscription, changes):
+            push(SigmaTCPHandler.notification_packet(subscription.id,
+                                                     changes))
+
+        def send_response(subscription):
+            values = b''.join(subscription.values[cell]
+                              for cell in subscription.cells)
+            push(SigmaTCPHandler._response_packet(
+                COMMAND_SUBSCRIBE_RESPONSE, subscription.id,
+                len(values)) + values)
+
+        try:
+            SigmaTCPHandler.get_watcher().subscribe(
+                cells, interval, threshold, notify, owner=push,
+                before_start=send_response)
+        except IOError as e:
+            logging.error("can't subscribe: %s", e)
+            return SigmaTCPHandler._response_packet(
+                COMMAND_SUBSCRIBE_RESPONSE, 0, 0)
+
+    @staticmethod
+    def notification_packet(sid, changes):
+        data = bytearray()
+        for (addr, value) in changes:
+            data += int_data(addr, 2) + int_data(len(value), 2) + value
+        return SigmaTCPHandler._response_packet(COMMAND_NOTIFY, sid,
+                                                len(data)) + data
+
     @staticmethod
     def write_eeprom_content(xmldata):
         logging.info("writing XML file through Adau145x implementation")
@@ -728,6 +927,42 @@ class SigmaTCPHandler(BaseRequestHandler):
         '''
         return adau145x.Adau145x.get_data_memory()
 
+    @staticmethod
+    def get_memory_range(program, start=0, length=0):
+        '''
+        Get raw program or data memory
+
+        Args:
+            program: read program memory if True, data memory otherwise
+            start: start address, ignored if length is 0
+            length: number of words, 0 reads the same memory as the
+                text dump
+
+        Returns:
+            bytearray: memory content or None if the range is invalid
+        '''
+        dsp = adau145x.Adau145x
+        if program:
+            first = dsp.PROGRAM_ADDR
+            last = dsp.PROGRAM_ADDR + dsp.PROGRAM_LENGTH
+        else:
+            first = dsp.DATA_ADDR
+            last = dsp.DATA_ADDR + dsp.DATA_LENGTH
+
+        if length == 0:
+            if program:
+                return SigmaTCPHandler.get_program_memory()
+            else:
+                return SigmaTCPHandler.get_data_memory()
+
+        if start < first or start + length > last:
+            logging.error("memory range %s-%s outside of %s-%s",
+                          start, start + length, first, last)
+            return None
+
+        # program memory can only be read while the core is stopped
+        return dsp.get_memory_block(start, length, halt=program)
+
     @staticmethod
     def program_checksum(cached=True):
         return adau145x.Adau145x.calculate_program_checksum(cached=cached)
@@ -784,17 +1019,12 @@ class SigmaTCPHandler(BaseRequestHandler):
         Call this method if the DSP program might change soon
         '''
         logging.info("preparing for memory update")
+        # starts a new program generation, this also invalidates the 
+        # caches of the REST API
         adau145x.Adau145x.clear_checksum_cache()
-        
-        # Also clear REST API checksum cache
-        try:
-            from hifiberrydsp.api.restapi import clear_checksum_cache
-            clear_checksum_cache()
-        except ImportError:
-            # REST API might not be available
-            pass
-            
         SigmaTCPHandler.checksum = None
+        SigmaTCPHandler.clear_meta_cache()
+        adau145x.Adau145x.invalidate_shadow()
         SigmaTCPHandler.update_alsasync(clear=True)
         SigmaTCPHandler.update_lgsoundsync(clear=True)
         SigmaTCPHandler.updating = True
@@ -805,9 +1035,27 @@ class SigmaTCPHandler(BaseRequestHandler):
         Call this method after the DSP program has been refreshed
         '''
         logging.info("finished memory update")
+        # snapshots taken during the update don't show the new program
+        adau145x.Adau145x.clear_checksum_cache()
         SigmaTCPHandler.xml = None
+        SigmaTCPHandler.clear_meta_cache()
         ProgramRefresher().start()
 
+    @staticmethod
+    def update_shadow_memory():
+        '''
+        Reload the shadow copy of the data memory (if enabled) using the
+        volatile cells of the current profile
+        '''
+        if not adau145x.Adau145x.shadow_enabled():
+            return
+
+        volatile_cells = set()
+        xml = SigmaTCPHandler.get_checked_xml()
+        if xml is not None:
+            volatile_cells = xml.get_volatile_cells()
+        adau145x.Adau145x.load_shadow(volatile_cells)
+
     @staticmethod
     def update_alsasync(clear=False):
         if SigmaTCPHandler.alsasync is None:
@@ -898,88 +1146,91 @@ class SigmaTCPHandler(BaseRequestHandler):
             
             settings_applied = 0
             
-            # First apply memory settings
-            for memory_address, memory_data in memory_settings.items():
-                try:
-                    success = SigmaTCPHandler._apply_memory_setting_new(memory_address, memory_data)
-                    if success:
-                        settings_applied += 1
-                        logging.debug(f"Applied memory setting at {memory_address}")
-                    else:
-                        logging.warning(f"Failed to apply memory setting at {memory_address}")
-                except Exception as e:
-                    logging.error(f"Error applying memory setting {memory_address}: {str(e)}")
-                    continue
+            # Collect all writes and send them as a few SPI bursts, the
+            # program is already running, so update it with safeload
+            with adau145x.Adau145x.batch(safeload=True):
+                # First apply memory settings
+                for memory_address, memory_data in memory_settings.items():
+                    try:
+                        success = SigmaTCPHandler._apply_memory_setting_new(memory_address, memory_data)
+                        if success:
+                            settings_applied += 1
+                            logging.debug(f"Applied memory setting at {memory_address}")
+                        else:
+                            logging.warning(f"Failed to apply memory setting at {memory_address}")
+                    except Exception as e:
+                        logging.error(f"Error applying memory setting {memory_address}: {str(e)}")
+                        continue
             
-            # Then apply filter settings
-            for filter_key, filter_data in filters.items():
-                try:
-                    # This is a regular filter
-                    address = filter_data.get("address")
-                    offset = filter_data.get("offset", 0)
-                    is_bypassed = filter_data.get("bypassed", False)
-                    filter_spec = filter_data.get("filter", {})
+                # Then apply filter settings
+                for filter_key, filter_data in filters.items():
+                    try:
+                        # This is a regular filter
+                        address = filter_data.get("address")
+                        offset = filter_data.get("offset", 0)
+                        is_bypassed = filter_data.get("bypassed", False)
+                        filter_spec = filter_data.get("filter", {})
                     
-                    if not address or not filter_spec:
-                        logging.warning(f"Skipping invalid filter {filter_key}: missing address or filter data")
-                        continue
+                        if not address or not filter_spec:
+                            logging.warning(f"Skipping invalid filter {filter_key}: missing address or filter data")
+                            continue
                     
-                    # Resolve address from metadata if it's a string key
-                    base_address = None
-                    if isinstance(address, str) and not address.startswith('0x') and not address.isdigit():
-                        # Try to resolve from metadata
-                        if xml_profile:
-                            metadata_value = xml_profile.get_meta(address)
-                            if metadata_value and '/' in str(metadata_value):
-                                # Parse biquad format like "addr/offset"
-                                parts = str(metadata_value).split('/')
-                                try:
-                                    base_address = int(parts[0])
-                                except ValueError:
-                                    logging.warning(f"Could not parse address from metadata key {address}: {metadata_value}")
+                        # Resolve address from metadata if it's a string key
+                        base_address = None
+                        if isinstance(address, str) and not address.startswith('0x') and not address.isdigit():
+                            # Try to resolve from metadata
+                            if xml_profile:
+                                metadata_value = xml_profile.get_meta(address)
+                                if metadata_value and '/' in str(metadata_value):
+                                    # Parse biquad format like "addr/offset"
+                                    parts = str(metadata_value).split('/')
+                                    try:
+                                        base_address = int(parts[0])
+                                    except ValueError:
+                                        logging.warning(f"Could not parse address from metadata key {address}: {metadata_value}")
+                                        continue
+                                else:
+                                    logging.warning(f"Could not resolve address from metadata key {address}")
                                     continue
                             else:
-                                logging.warning(f"Could not resolve address from metadata key {address}")
+                                logging.warning(f"No XML profile available to resolve metadata key {address}")
                                 continue
                         else:
-                            logging.warning(f"No XML profile available to resolve metadata key {address}")
-                            continue
-                    else:
-                        # Direct address
-                        try:
-                            base_address = int(address, 0)  # Supports hex and decimal
-                        except ValueError:
-                            logging.warning(f"Could not parse direct address {address}")
-                            continue
+                            # Direct address
+                            try:
+                                base_address = int(address, 0)  # Supports hex and decimal
+                            except ValueError:
+                                logging.warning(f"Could not parse direct address {address}")
+                                continue
                     
-                    # Calculate actual address with offset
-                    actual_address = base_address + (offset * 5)
+                        # Calculate actual address with offset
+                        actual_address = base_address + (offset * 5)
                     
-                    # Check if address is valid
-                    if not adau145x.Adau145x.is_valid_memory_address(actual_address) or \
-                       not adau145x.Adau145x.is_valid_memory_address(actual_address + 4):
-                        logging.warning(f"Skipping filter {filter_key}: invalid memory address range {hex(actual_address)}")
-                        continue
+                        # Check if address is valid
+                        if not adau145x.Adau145x.is_valid_memory_address(actual_address) or \
+                           not adau145x.Adau145x.is_valid_memory_address(actual_address + 4):
+                            logging.warning(f"Skipping filter {filter_key}: invalid memory address range {hex(actual_address)}")
+                            continue
                     
-                    # Apply the filter (original or bypass based on state)
-                    if is_bypassed:
-                        # Apply bypass filter
-                        success = SigmaTCPHandler._apply_bypass_filter(actual_address)
-                        filter_type = "bypassed"
-                    else:
-                        # Apply original filter
-                        success = SigmaTCPHandler._apply_filter(actual_address, filter_spec)
-                        filter_type = "active"
+                        # Apply the filter (original or bypass based on state)
+                        if is_bypassed:
+                            # Apply bypass filter
+                            success = SigmaTCPHandler._apply_bypass_filter(actual_address)
+                            filter_type = "bypassed"
+                        else:
+                            # Apply original filter
+                            success = SigmaTCPHandler._apply_filter(actual_address, filter_spec)
+                            filter_type = "active"
                     
-                    if success:
-                        settings_applied += 1
-                        logging.debug(f"Applied {filter_type} filter {filter_key} at address {hex(actual_address)}")
-                    else:
-                        logging.warning(f"Failed to apply filter {filter_key} at address {hex(actual_address)}")
+                        if success:
+                            settings_applied += 1
+                            logging.debug(f"Applied {filter_type} filter {filter_key} at address {hex(actual_address)}")
+                        else:
+                            logging.warning(f"Failed to apply filter {filter_key} at address {hex(actual_address)}")
                         
-                except Exception as e:
-                    logging.error(f"Error applying filter {filter_key}: {str(e)}")
-                    continue
+                    except Exception as e:
+                        logging.error(f"Error applying filter {filter_key}: {str(e)}")
+                        continue
             
             logging.info(f"Successfully applied {settings_applied} out of {total_settings} stored settings ({len(memory_settings)} memory + {len(filters)} filters)")
             return settings_applied > 0
@@ -1027,34 +1278,36 @@ class SigmaTCPHandler(BaseRequestHandler):
             
             # Apply each value
             success_count = 0
-            for i, value in enumerate(values):
-                current_addr = address + i
+            with adau145x.Adau145x.batch():
+                for i, value in enumerate(values):
+                    current_addr = address + i
                 
-                if not adau145x.Adau145x.is_valid_memory_address(current_addr):
-                    logging.warning(f"Invalid address {hex(current_addr)} in memory setting {setting_key}")
-                    continue
+                    if not adau145x.Adau145x.is_valid_memory_address(current_addr):
+                        logging.warning(f"Invalid address {hex(current_addr)} in memory setting {setting_key}")
+                        continue
                 
-                try:
-                    # Convert value to int (same logic as REST API)
-                    if isinstance(value, str) and value.startswith("0x"):
-                        int_value = int(value, 16)  # Hexadecimal
-                    elif isinstance(value, (float, int)):
-                        if isinstance(value, float):
-                            int_value = adau145x.Adau145x.decimal_repr(value)  # Convert float to fixed-point
+                    try:
+                        # Convert value to int (same logic as REST API)
+                        if isinstance(value, str) and value.startswith("0x"):
+                            int_value = int(value, 16)  # Hexadecimal
+                        elif isinstance(value, (float, int)):
+                            if isinstance(value, float):
+                                int_value = adau145x.Adau145x.decimal_repr(value)  # Convert float to fixed-point
+                            else:
+                                int_value = value
                         else:
-                            int_value = value
-                    else:
-                        logging.warning(f"Unsupported value type {type(value)} in memory setting {setting_key}")
-                        continue
+                            logging.warning(f"Unsupported value type {type(value)} in memory setting {setting_key}")
+                            continue
                     
-                    # Write to DSP memory
-                    byte_data = adau145x.Adau145x.int_data(int_value, 4)
-                    adau145x.Adau145x.write_memory(current_addr, byte_data)
-                    success_count += 1
+                        # Write to DSP memory
+                        byte_data = adau145x.Adau145x.int_data(int_value, 4)
+                        adau145x.Adau145x.write_memory(current_addr, byte_data)
+                        success_count += 1
                     
-                except Exception as e:
-                    logging.warning(f"Error writing value {value} to address {hex(current_addr)}: {str(e)}")
-                    continue
+                    except Exception as e:
+                        logging.warning(f"Error writing value {value} to address {hex(current_addr)}: {str(e)}")
+                        continue
+            
             
             if success_count > 0:
                 logging.debug(f"Applied memory setting {setting_key}: {success_count}/{len(values)} values written to address {hex(address)}")
@@ -1102,34 +1355,36 @@ class SigmaTCPHandler(BaseRequestHandler):
             
             # Apply each value
             success_count = 0
-            for i, value in enumerate(values):
-                current_addr = address + i
+            with adau145x.Adau145x.batch():
+                for i, value in enumerate(values):
+                    current_addr = address + i
                 
-                if not adau145x.Adau145x.is_valid_memory_address(current_addr):
-                    logging.warning(f"Invalid address {hex(current_addr)} in memory setting at {memory_address}")
-                    continue
+                    if not adau145x.Adau145x.is_valid_memory_address(current_addr):
+                        logging.warning(f"Invalid address {hex(current_addr)} in memory setting at {memory_address}")
+                        continue
                 
-                try:
-                    # Convert value to int (same logic as REST API)
-                    if isinstance(value, str) and value.startswith("0x"):
-                        int_value = int(value, 16)  # Hexadecimal
-                    elif isinstance(value, (float, int)):
-                        if isinstance(value, float):
-                            int_value = adau145x.Adau145x.decimal_repr(value)  # Convert float to fixed-point
+                    try:
+                        # Convert value to int (same logic as REST API)
+                        if isinstance(value, str) and value.startswith("0x"):
+                            int_value = int(value, 16)  # Hexadecimal
+                        elif isinstance(value, (float, int)):
+                            if isinstance(value, float):
+                                int_value = adau145x.Adau145x.decimal_repr(value)  # Convert float to fixed-point
+                            else:
+                                int_value = value
                         else:
-                            int_value = value
-                    else:
-                        logging.warning(f"Unsupported value type {type(value)} in memory setting at {memory_address}")
-                        continue
+                            logging.warning(f"Unsupported value type {type(value)} in memory setting at {memory_address}")
+                            continue
                     
-                    # Write to DSP memory
-                    byte_data = adau145x.Adau145x.int_data(int_value, 4)
-                    adau145x.Adau145x.write_memory(current_addr, byte_data)
-                    success_count += 1
+                        # Write to DSP memory
+                        byte_data = adau145x.Adau145x.int_data(int_value, 4)
+                        adau145x.Adau145x.write_memory(current_addr, byte_data)
+                        success_count += 1
                     
-                except Exception as e:
-                    logging.warning(f"Error writing value {value} to address {hex(current_addr)}: {str(e)}")
-                    continue
+                    except Exception as e:
+                        logging.warning(f"Error writing value {value} to address {hex(current_addr)}: {str(e)}")
+                        continue
+            
             
             if success_count > 0:
                 logging.debug(f"Applied memory setting at {memory_address}: {success_count}/{len(values)} values written to address {hex(address)}")
@@ -1258,6 +1513,7 @@ class ProgramRefresher(Thread):
         time.sleep(0)
         # calculate cecksum
         SigmaTCPHandler.program_checksum(cached=False)
+        SigmaTCPHandler.update_shadow_memory()
         # update volume register for ALSA control
         SigmaTCPHandler.update_alsasync()
         SigmaTCPHandler.update_lgsoundsync()
@@ -1296,6 +1552,26 @@ class SigmaTCPServer(ThreadingMixIn, TCPServer):
         TCPServer.server_close(self)
 
 
+class SigmaTCPUnixServer(ThreadingMixIn, UnixStreamServer):
+    '''
+    Serves the SigmaTCP protocol on a Unix domain socket for local clients
+    '''
+
+    daemon_threads = True
+
+    def __init__(self,
+                 path=DEFAULT_UNIX_SOCKET,
+                 RequestHandlerClass=SigmaTCPHandler):
+        remove_stale_socket(path)
+        UnixStreamServer.__init__(self, path, RequestHandlerClass)
+        # same access as the TCP server on localhost
+        os.chmod(path, 0o666)
+
+    def server_close(self):
+        UnixStreamServer.server_close(self)
+        remove_stale_socket(self.server_address)
+
+
 class SigmaTCPServerMain():
 
     def __init__(self, alsa_mixer_name="DSPVolume"):
@@ -1305,6 +1581,9 @@ class SigmaTCPServerMain():
 
         params = self.parse_config()
 
+        if params["emulator"] is not None:
+            self.setup_emulator(params["emulator"])
+
         # Determine the host to bind to
         if params["bind_address"]:
             bind_host = params["bind_address"]
@@ -1314,7 +1593,33 @@ class SigmaTCPServerMain():
             bind_host = "0.0.0.0"
 
         logging.info(f"Starting SigmaTCP server on {bind_host}:{DEFAULT_PORT}")
-        self.server = SigmaTCPServer(server_address=(bind_host, DEFAULT_PORT))
+        clients = SigmaTCPHandler.clients
+        clients.max_connections = params["max_connections"]
+        clients.idle_timeout = params["idle_timeout"]
+        clients.read_timeout = params["read_timeout"]
+        clients.max_spi_queue = params["max_spi_queue"]
+
+        unix_socket = params["unix_socket"]
+        if params["disable_tcp"]:
+            unix_socket = None
+        self.unix_server = None
+        if params["asyncio"]:
+            from hifiberrydsp.server.asyncserver import AsyncSigmaTCPServer
+            self.server = AsyncSigmaTCPServer(
+                server_address=(bind_host, DEFAULT_PORT),
+                unix_path=unix_socket,
+                clients=clients)
+        else:
+            self.server = SigmaTCPServer(
+                server_address=(bind_host, DEFAULT_PORT))
+            if unix_socket:
+                try:
+                    self.unix_server = SigmaTCPUnixServer(unix_socket)
+                    logging.info("SigmaTCP server listening on %s",
+                                 unix_socket)
+                except OSError as e:
+                    logging.warning("can't listen on %s: %s",
+                                    unix_socket, e)
 
         if params["alsa"]:
             logging.info("initializing ALSA mixer control %s", alsa_mixer_name)
@@ -1354,12 +1659,41 @@ class SigmaTCPServerMain():
         # Set the autoload filters flag
         SigmaTCPHandler.autoload_filters = not params.get("no_autoload_filters", False)
         
+        if params["capture"]:
+            from hifiberrydsp.server.capture import CaptureWriter
+            logging.info("capturing requests to %s", params["capture"])
+            SigmaTCPHandler.capture = CaptureWriter(params["capture"])
+
+        if params["shadow_memory"]:
+            logging.info("serving data memory reads from a shadow copy")
+            adau145x.Adau145x.enable_shadow()
+
         # Set the debug memory writes flag
         SigmaTCPHandler.debug_memory_writes = params.get("debug", False)
         if SigmaTCPHandler.debug_memory_writes:
             logging.info("Debug mode enabled: will log all DSP memory writes")
 
         self.params = params
+
+    def setup_emulator(self, profile_file):
+        '''
+        Replace the SPI bus by an emulated DSP. The emulator is loaded with 
+        the given profile or the default DSP profile if available.
+        '''
+        from hifiberrydsp.hardware.emulator import Adau145xEmulator
+
+        emulator = Adau145xEmulator.with_spi_timing()
+        if not profile_file:
+            profile_file = get_default_dspprofile_path()
+
+        if os.path.exists(profile_file):
+            logging.info("loading %s into DSP emulator", profile_file)
+            emulator.install_profile(XmlProfile(profile_file))
+        else:
+            logging.warning("DSP profile %s not found, emulator memory is empty",
+                            profile_file)
+
+        SpiHandler.set_backend(emulator)
         
     def parse_config(self):
         config = configparser.ConfigParser()
@@ -1381,6 +1715,16 @@ class SigmaTCPServerMain():
         parser.add_argument("--bind-address", type=str, default=None, help="Specify IP address to bind to")
         parser.add_argument("--no-autoload-filters", action="store_true", help="Disable automatic loading of stored filters on startup")
         parser.add_argument("--debug", action="store_true", help="Enable debug logging for all DSP memory writes")
+        parser.add_argument("--shadow-memory", action="store_true", help="Serve data memory reads from a write-through shadow copy")
+        parser.add_argument("--emulator", nargs="?", const="", default=None, metavar="PROFILE", help="Use an emulated DSP instead of the SPI bus, optionally loaded with the given XML profile")
+        parser.add_argument("--asyncio", action="store_true", help="Serve all SigmaTCP connections from a single asyncio event loop instead of a thread per connection")
+        parser.add_argument("--unix-socket", type=str, default=DEFAULT_UNIX_SOCKET, metavar="PATH", help="Also serve local clients on this Unix domain socket (default: %(default)s)")
+        parser.add_argument("--no-unix-socket", action="store_true", help="Don't listen on a Unix domain socket")
+        parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS, metavar="N", help="Maximum number of SigmaTCP clients, 0 for no limit (default: %(default)s)")
+        parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT, metavar="SECONDS", help="Close connections without requests for this time, 0 to keep them open (default: %(default)s)")
+        parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT, metavar="SECONDS", help="Close connections that don't complete a request within this time, 0 to wait forever (default: %(default)s)")
+        parser.add_argument("--max-spi-queue", type=int, default=DEFAULT_MAX_SPI_QUEUE, metavar="N", help="Stop reading requests while more SPI jobs are queued, 0 for no limit (default: %(default)s)")
+        parser.add_argument("--capture", type=str, default=None, metavar="FILE", help="Record all SigmaTCP requests with timestamps to FILE for replay with hifiberrydsp.server.capture")
         parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
         args = parser.parse_args()
 
@@ -1395,6 +1739,18 @@ class SigmaTCPServerMain():
         params["bind_address"] = args.bind_address
         params["no_autoload_filters"] = args.no_autoload_filters
         params["debug"] = args.debug
+        params["emulator"] = args.emulator
+        params["shadow_memory"] = args.shadow_memory
+        params["asyncio"] = args.asyncio
+        params["capture"] = args.capture
+        params["max_connections"] = args.max_connections
+        params["idle_timeout"] = args.idle_timeout
+        params["read_timeout"] = args.read_timeout
+        params["max_spi_queue"] = args.max_spi_queue
+        if args.no_unix_socket:
+            params["unix_socket"] = None
+        else:
+            params["unix_socket"] = args.unix_socket
 
         try:
             this.command_after_startup = config.get("server", "command_after_startup")
@@ -1427,6 +1783,9 @@ class SigmaTCPServerMain():
             logging.info("Checking DSP profile integrity...")
             find_and_restore_dsp_profile()
             
+        if dsp_detected:
+            SigmaTCPHandler.update_shadow_memory()
+
         if (self.restore):
             try:
                 logging.info("restoring saved data memory")
@@ -1468,6 +1827,10 @@ class SigmaTCPServerMain():
         try:
             if not(self.abort) and not(self.params.get("disable_tcp")):
                 logging.info("starting TCP server")
+                if self.unix_server is not None:
+                    unix_thread = Thread(target=self.unix_server.serve_forever)
+                    unix_thread.daemon = True
+                    unix_thread.start()
                 self.server.serve_forever()
             elif self.params.get("disable_tcp") and self.params.get("enable_rest"):
                 logging.info("TCP server disabled, running REST API only")
@@ -1480,6 +1843,11 @@ class SigmaTCPServerMain():
             logging.info("aborting ")
             if not self.params.get("disable_tcp"):
                 self.server.server_close()
+            if self.unix_server is not None:
+                self.unix_server.server_close()
+
+        if SigmaTCPHandler.capture is not None:
+            SigmaTCPHandler.capture.close()
 
         if SigmaTCPHandler.alsasync is not None:
             SigmaTCPHandler.alsasync.finish()
@@ -0,0 +1,172 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import os
+import threading
+import unittest
+
+from hifiberrydsp.client.sigmatcp import SigmaTCPClient
+from hifiberrydsp.hardware.adau145x import Adau145x
+from hifiberrydsp.hardware.emulator import Adau145xEmulator
+from hifiberrydsp.hardware.spi import SpiHandler
+from hifiberrydsp.parser.xmlprofile import XmlProfile
+from hifiberrydsp.server.framing import frame_length
+from hifiberrydsp.server.sigmatcp import SigmaTCPHandler, SigmaTCPServer
+from hifiberrydsp.server.constants import \
+    COMMAND_PROGMEM_BINARY, COMMAND_PROGMEM_BINARY_RESPONSE, \
+    COMMAND_DATAMEM_BINARY, COMMAND_DATAMEM_BINARY_RESPONSE, \
+    COMMAND_BATCH_RESPONSE, COMMAND_READ, COMMAND_WRITE, \
+    COMMAND_META_RESPONSE, HEADER_SIZE
+
+SAMPLE_PROFILE = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                              "sample_files", "xml", "dacdsp-default.xml")
+
+
+class Test(unittest.TestCase):
+
+    def testBinaryMemoryDump(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator()
+        SpiHandler.set_backend(emulator)
+        try:
+            data = bytes(range(1, 17))
+            emulator.write(0x100, data)
+            emulator.write(Adau145x.PROGRAM_ADDR + 2, data)
+
+            request = SigmaTCPClient.memory_request(COMMAND_DATAMEM_BINARY,
+                                                    0x100, 4)
+            self.assertEqual(frame_length(request), HEADER_SIZE)
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[0], COMMAND_DATAMEM_BINARY_RESPONSE)
+            self.assertEqual(
+                int.from_bytes(response[6:10], byteorder="big"), 16)
+            self.assertEqual(response[HEADER_SIZE:], data)
+
+            request = SigmaTCPClient.memory_request(
+                COMMAND_PROGMEM_BINARY, Adau145x.PROGRAM_ADDR + 2, 4)
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[0], COMMAND_PROGMEM_BINARY_RESPONSE)
+            self.assertEqual(response[HEADER_SIZE:], data)
+
+            # ranges outside of the memory return no data
+            request = SigmaTCPClient.memory_request(COMMAND_PROGMEM_BINARY,
+                                                    0x100, 4)
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(len(response), HEADER_SIZE)
+        finally:
+            SpiHandler.spi = saved_spi
+
+    def testBatch(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator()
+        SpiHandler.set_backend(emulator)
+        try:
+            emulator.write(0x10, bytes([1, 2, 3, 4]))
+            request = SigmaTCPClient.batch_request([
+                (COMMAND_WRITE, False, 0x20, 8, bytes(range(8))),
+                (COMMAND_READ, False, 0x10, 4, None),
+                (COMMAND_WRITE, False, 0x22, 4, bytes([9] * 4)),
+                (COMMAND_WRITE, False, 0x21, 4, bytes([8] * 4)),
+                (COMMAND_READ, False, 0x20, 12, None),
+            ])
+            self.assertEqual(frame_length(request), len(request))
+
+            transactions = emulator.transactions
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[0], COMMAND_BATCH_RESPONSE)
+            self.assertEqual(response[HEADER_SIZE:],
+                             bytes([1, 2, 3, 4, 0, 1, 2, 3]) +
+                             bytes([8] * 4) + bytes([9] * 4))
+            # 2 reads, the 2 writes before the last read are coalesced
+            self.assertEqual(emulator.transactions, transactions + 4)
+
+            # truncated requests are rejected
+            request[HEADER_SIZE + 7] = 100
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(len(response), HEADER_SIZE)
+        finally:
+            SpiHandler.spi = saved_spi
+
+    def testSubscribe(self):
+        saved_spi = SpiHandler.spi
+        emulator = Adau145xEmulator()
+        SpiHandler.set_backend(emulator)
+        server = SigmaTCPServer(server_address=("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        try:
+            emulator.write(0x10, bytes([0, 0, 0, 1]))
+            watcher = SigmaTCPClient(Adau145x(), "127.0.0.1", port=port)
+            (sid, values) = watcher.subscribe([(0x10, 4), (0xf405, 2)],
+                                              0.01)
+            self.assertEqual(values[0x10], bytes([0, 0, 0, 1]))
+            self.assertIsNone(watcher.receive_notification(timeout=0.05))
+
+            writer = SigmaTCPClient(Adau145x(), "127.0.0.1", port=port)
+            writer.write_memory(0x10, bytes([0, 0, 0, 2]))
+            # requests and notifications can be mixed
+            self.assertEqual(writer.read_memory(0x10, 4), bytes([0, 0, 0, 2]))
+            self.assertEqual(watcher.read_memory(0xf405, 2), values[0xf405])
+            self.assertEqual(watcher.receive_notification(timeout=2),
+                             (sid, {0x10: bytes([0, 0, 0, 2])}))
+
+            watcher.unsubscribe(sid)
+            writer.write_memory(0x10, bytes([0, 0, 0, 3]))
+            self.assertIsNone(watcher.receive_notification(timeout=0.05))
+            watcher.disconnect()
+            writer.disconnect()
+        finally:
+            server.shutdown()
+            server.server_close()
+            SpiHandler.spi = saved_spi
+
+    def testMetaCache(self):
+        saved_xml = SigmaTCPHandler.xml
+        SigmaTCPHandler.xml = XmlProfile(SAMPLE_PROFILE)
+        SigmaTCPHandler.xml_generation = Adau145x.program_generation()
+        SigmaTCPHandler.checksum_error = False
+        SigmaTCPHandler.clear_meta_cache()
+        try:
+            request = SigmaTCPClient.metadata_request("IIR_L")
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[0], COMMAND_META_RESPONSE)
+            self.assertEqual(response[HEADER_SIZE:], b"42/80")
+
+            # responses are cached until the program changes
+            SigmaTCPHandler.xml.update_metadata({"IIR_L": "100/10"})
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[HEADER_SIZE:], b"42/80")
+
+            SigmaTCPHandler.clear_meta_cache()
+            response = SigmaTCPHandler.process_frame(request)
+            self.assertEqual(response[HEADER_SIZE:], b"100/10")
+        finally:
+            SigmaTCPHandler.xml = saved_xml
+            SigmaTCPHandler.clear_meta_cache()
+
+    def testMemoryDumpFormat(self):
+        self.assertEqual(SigmaTCPHandler.format_memory_dump(
+            bytes([0, 1, 2, 0xab, 0xff, 0, 0, 1])), b"000102AB\nFF000001\n")
+        self.assertEqual(SigmaTCPHandler.format_memory_dump(None), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
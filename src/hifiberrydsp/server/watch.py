@@ -0,0 +1,331 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import logging
+import queue
+import threading
+import time
+
+from hifiberrydsp.hardware.spi import SpiHandler, PRIORITY_POLL
+
+# Addresses from here on are 16 bit registers, values below are signed
+# memory cells
+MIN_REGISTER = 0xf000
+
+# Limits for the polling interval in seconds
+MIN_INTERVAL = 0.01
+MAX_INTERVAL = 3600
+
+# Notifications waiting to be sent to a client. If a client doesn't read 
+# them, its subscriptions are removed when this limit is reached.
+MAX_PENDING_NOTIFICATIONS = 64
+
+
+class SubscriberStalled(Exception):
+    '''
+    Raised by a notification callback if the client doesn't read its 
+    notifications
+    '''
+    pass
+
+
+def read_cells(cells):
+    '''
+    Read all cells with a single SPI scheduler job. Reads directly from 
+    the DSP, the shadow memory might not contain values changed by the 
+    DSP program itself.
+
+    Args:
+        cells: list of (addr, length) tuples, length in bytes
+
+    Returns:
+        dict: {(addr, length): bytes}
+    '''
+    def read_all():
+        return {(addr, length): bytes(SpiHandler._read(addr, length))
+                for (addr, length) in cells}
+
+    return SpiHandler.submit(read_all, priority=PRIORITY_POLL)
+
+
+class Subscription():
+    '''
+    A set of cells watched by a client
+    '''
+
+    def __init__(self, sid, cells, interval, threshold, callback, owner):
+        '''
+        Args:
+            sid: subscription id
+            cells: list of (addr, length) tuples, length in bytes
+            interval: polling interval in seconds
+            threshold: minimum change of the integer value of a cell that 
+                is reported, 0 reports every change
+            callback: function(subscription, changes) called with a list
+                of (addr, data) tuples of changed cells
+            owner: identifies the client, e.g. its connection
+        '''
+        self.id = sid
+        self.cells = list(cells)
+        self.interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        self.threshold = threshold
+        self.callback = callback
+        self.owner = owner
+        self.values = {}
+        self.next_poll = 0
+
+    def changes(self, values):
+        '''
+        Compare new values with the last reported values. Only reported
+        values are remembered, slow drifts are reported as soon as the 
+        sum of changes exceeds the threshold.
+
+        Returns:
+            list: (addr, data) tuples of changed cells
+        '''
+        changes = []
+        for cell in self.cells:
+            data = values[cell]
+            if self.changed(cell, self.values.get(cell), data):
+                self.values[cell] = data
+                changes.append((cell[0], data))
+        return changes
+
+    def changed(self, cell, old, new):
+        if old is None:
+            return True
+        if old == new:
+            return False
+        if self.threshold == 0:
+            return True
+
+        signed = cell[0] < MIN_REGISTER
+        old_value = int.from_bytes(old, byteorder="big", signed=signed)
+        new_value = int.from_bytes(new, byteorder="big", signed=signed)
+        return abs(new_value - old_value) > self.threshold
+
+
+class NotificationQueue():
+    '''
+    Sends the notifications of a connection from its own thread, so the 
+    watcher thread never waits for a client. The thread is started with 
+    the first notification.
+
+    If the client doesn't read and max_pending notifications are waiting,
+    push() raises SubscriberStalled and the watcher removes the 
+    subscriptions of the client.
+    '''
+
+    def __init__(self, send, max_pending=MAX_PENDING_NOTIFICATIONS):
+        '''
+        Args:
+            send: function(data) that sends data to the client, may block
+            max_pending: maximum number of notifications waiting
+        '''
+        self.send = send
+        self.queue = queue.Queue(max_pending)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stalled = False
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, data):
+        if self.closed:
+            return
+        if self.stalled:
+            self.dropped += 1
+            raise SubscriberStalled("client doesn't read notifications")
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run,
+                                               name="NotificationQueue",
+                                               daemon=True)
+                self.thread.start()
+
+        try:
+            self.queue.put_nowait(bytes(data))
+        except queue.Full:
+            self.stalled = True
+            self.dropped += 1
+            raise SubscriberStalled("{} notifications waiting".format(
+                self.queue.maxsize))
+
+    def run(self):
+        while not self.closed:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.send(data)
+            except Exception as e:
+                logging.debug("can't send notification: %s", e)
+                self.stalled = True
+                break
+
+    def close(self):
+        '''
+        Stop the sender thread. A thread that is blocked in send() ends 
+        when the connection is closed.
+        '''
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class RegisterWatcher(threading.Thread):
+    '''
+    Polls the cells of all subscriptions centrally. Cells that are 
+    watched by multiple subscriptions are only read once per poll, all 
+    cells that are due are read with a single SPI scheduler job at poll 
+    priority. Subscribers are notified only if a value changed.
+    '''
+
+    def __init__(self, read_function=read_cells):
+        threading.Thread.__init__(self, name="RegisterWatcher", daemon=True)
+        self.read_function = read_function
+        self.subscriptions = {}
+        self.lock = threading.Condition()
+        self.last_id = 0
+        self.polls = 0
+        self.cells_read = 0
+        self.notifications = 0
+
+    def subscribe(self, cells, interval, threshold, callback, owner=None,
+                  before_start=None):
+        '''
+        Add a subscription. The current values are read immediately, 
+        before_start(subscription) is called before the subscription is
+        polled for the first time, e.g. to send a response that has to 
+        arrive before the first notification.
+
+        Returns:
+            Subscription: the new subscription
+        '''
+        with self.lock:
+            self.last_id = self.last_id % 0xffff + 1
+            while self.last_id in self.subscriptions:
+                self.last_id = self.last_id % 0xffff + 1
+            sid = self.last_id
+
+        subscription = Subscription(sid, cells, interval, threshold,
+                                    callback, owner)
+        subscription.changes(self.read_function(subscription.cells))
+        if before_start is not None:
+            before_start(subscription)
+
+        with self.lock:
+            subscription.next_poll = time.monotonic() + subscription.interval
+            self.subscriptions[sid] = subscription
+            self.lock.notify()
+        logging.debug("subscription %s: %s cells every %ss", sid,
+                      len(subscription.cells), subscription.interval)
+        return subscription
+
+    def unsubscribe(self, sid, owner=None):
+        '''
+        Remove a subscription, only the owner can remove it
+        '''
+        with self.lock:
+            subscription = self.subscriptions.get(sid)
+            if subscription is None or subscription.owner != owner:
+                return False
+            del self.subscriptions[sid]
+            return True
+
+    def remove_owner(self, owner):
+        '''
+        Remove all subscriptions of a client, e.g. if it disconnected
+        '''
+        with self.lock:
+            for sid in [s.id for s in self.subscriptions.values()
+                        if s.owner == owner]:
+                del self.subscriptions[sid]
+
+    def poll(self, now=None):
+        '''
+        Poll all subscriptions that are due
+        '''
+        if now is None:
+            now = time.monotonic()
+
+        with self.lock:
+            due = [s for s in self.subscriptions.values()
+                   if s.next_poll <= now]
+        if len(due) == 0:
+            return
+
+        cells = set()
+        for subscription in due:
+            cells.update(subscription.cells)
+
+        try:
+            values = self.read_function(sorted(cells))
+        except Exception as e:
+            logging.error("can't read watched cells: %s", e)
+            values = None
+
+        self.polls += 1
+        self.cells_read += len(cells)
+
+        for subscription in due:
+            subscription.next_poll = now + subscription.interval
+            if values is None:
+                continue
+            changes = subscription.changes(values)
+            if len(changes) > 0:
+                self.notify(subscription, changes)
+
+    def notify(self, subscription, changes):
+        self.notifications += 1
+        try:
+            subscription.callback(subscription, changes)
+        except SubscriberStalled as e:
+            logging.warning("removing subscriptions of a stalled client: "
+                            "%s", e)
+            self.remove_owner(subscription.owner)
+        except Exception as e:
+            logging.info("removing subscription %s: %s", subscription.id, e)
+            self.unsubscribe(subscription.id, subscription.owner)
+
+    def run(self):
+        while True:
+            self.poll()
+            with self.lock:
+                if len(self.subscriptions) == 0:
+                    self.lock.wait()
+                    continue
+                delay = min(s.next_poll for s in self.subscriptions.values()) \
+                    - time.monotonic()
+                if delay > 0:
+                    self.lock.wait(delay)
+
+    def stats(self):
+        return {
+            "subscriptions": len(self.subscriptions),
+            "polls": self.polls,
+            "cells_read": self.cells_read,
+            "notifications": self.notifications,
+        }
@@ -0,0 +1,152 @@
+'''
+Copyright (c) 2026 Modul 9/HiFiBerry
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+import threading
+import unittest
+
+from hifiberrydsp.server.watch import RegisterWatcher, NotificationQueue
+
+
+class FakeMemory():
+
+    def __init__(self):
+        self.values = {}
+        self.reads = []
+
+    def read(self, cells):
+        self.reads.append(cells)
+        return {(addr, length): self.values.get(addr, 0).to_bytes(
+            length, byteorder="big", signed=True)
+            for (addr, length) in cells}
+
+
+class Test(unittest.TestCase):
+
+    def testSharedPoll(self):
+        memory = FakeMemory()
+        watcher = RegisterWatcher(read_function=memory.read)
+        notifications = []
+
+        def callback(subscription, changes):
+            notifications.append((subscription.id, changes))
+
+        s1 = watcher.subscribe([(0x10, 4), (0xf600, 2)], 0.1, 0, callback,
+                               owner="a")
+        s2 = watcher.subscribe([(0x10, 4)], 0.1, 0, callback, owner="b")
+        s3 = watcher.subscribe([(0x20, 4)], 1, 0, callback, owner="b")
+        self.assertEqual(len(memory.reads), 3)
+
+        # due subscriptions are polled together, shared cells once
+        now = s2.next_poll
+        watcher.poll(now)
+        self.assertEqual(memory.reads[-1], [(0x10, 4), (0xf600, 2)])
+        self.assertEqual(notifications, [])
+
+        memory.values[0x10] = 5
+        watcher.poll(now + 0.1)
+        self.assertEqual(len(memory.reads), 5)
+        self.assertEqual(notifications,
+                         [(s1.id, [(0x10, bytes([0, 0, 0, 5]))]),
+                          (s2.id, [(0x10, bytes([0, 0, 0, 5]))])])
+
+        # nothing due
+        watcher.poll(now + 0.15)
+        self.assertEqual(len(memory.reads), 5)
+
+        watcher.remove_owner("b")
+        self.assertEqual(list(watcher.subscriptions.keys()), [s1.id])
+        self.assertFalse(watcher.unsubscribe(s3.id, "b"))
+        self.assertFalse(watcher.unsubscribe(s1.id, "b"))
+        self.assertTrue(watcher.unsubscribe(s1.id, "a"))
+
+    def testThreshold(self):
+        memory = FakeMemory()
+        watcher = RegisterWatcher(read_function=memory.read)
+        notifications = []
+        subscription = watcher.subscribe(
+            [(0x10, 4)], 0.1, 100,
+            lambda s, changes: notifications.append(changes))
+
+        now = subscription.next_poll
+        for (i, value) in enumerate([-50, -100, -101, -150, -250]):
+            memory.values[0x10] = value
+            watcher.poll(now + i)
+
+        # changes are relative to the last reported value
+        self.assertEqual([int.from_bytes(c[0][1], byteorder="big",
+                                         signed=True)
+                          for c in notifications], [-101, -250])
+
+    def testFailingCallback(self):
+        memory = FakeMemory()
+        watcher = RegisterWatcher(read_function=memory.read)
+
+        def callback(subscription, changes):
+            raise BrokenPipeError()
+
+        subscription = watcher.subscribe([(0x10, 4)], 0.1, 0, callback)
+        memory.values[0x10] = 1
+        watcher.poll(subscription.next_poll)
+        self.assertEqual(watcher.subscriptions, {})
+
+    def testStalledClient(self):
+        memory = FakeMemory()
+        watcher = RegisterWatcher(read_function=memory.read)
+        blocked = threading.Event()
+        sent = []
+
+        def blocking_send(data):
+            # a client that doesn't read
+            blocked.wait(5)
+
+        stalled = NotificationQueue(blocking_send, max_pending=2)
+        fast = NotificationQueue(sent.append)
+
+        def callback(subscription, changes):
+            subscription.owner.push(bytes([changes[0][1][-1]]))
+
+        watcher.subscribe([(0x10, 4)], 0.1, 0, callback, owner=stalled)
+        watcher.subscribe([(0x20, 4)], 0.1, 0, callback, owner=stalled)
+        subscription = watcher.subscribe([(0x10, 4)], 0.1, 0, callback,
+                                         owner=fast)
+        now = subscription.next_poll
+        try:
+            for value in range(1, 6):
+                memory.values[0x10] = value
+                memory.values[0x20] = value
+                watcher.poll(now + value)
+
+            # the watcher isn't blocked, the stalled client is removed
+            self.assertEqual([s.owner for s in
+                              watcher.subscriptions.values()], [fast])
+            for _i in range(100):
+                if len(sent) == 5:
+                    break
+                threading.Event().wait(0.01)
+            self.assertEqual(sent, [bytes([v]) for v in range(1, 6)])
+        finally:
+            blocked.set()
+            stalled.close()
+            fast.close()
+
+
+if __name__ == "__main__":
+    unittest.main()